@@ -0,0 +1,25 @@
+# JYXT/api_urls.py
+"""只读JSON接口（/api/v1/）"""
+from django.urls import path
+
+from apps.skill_assessment.api import AssessmentPlanApiView, SkillStandardApiView
+from enterprises.api import DepartmentApiView, EnterpriseApiView
+from staff.api import StaffApiView
+
+app_name = 'api'
+
+RESOURCES = [
+    ('enterprises', EnterpriseApiView),
+    ('departments', DepartmentApiView),
+    ('staff', StaffApiView),
+    ('skill-standards', SkillStandardApiView),
+    ('assessment-plans', AssessmentPlanApiView),
+]
+
+urlpatterns = []
+for resource, view_class in RESOURCES:
+    view = view_class.as_view()
+    urlpatterns += [
+        path(f'{resource}/', view, name=resource),
+        path(f'{resource}/<int:pk>/', view, name=f'{resource}-detail'),
+    ]
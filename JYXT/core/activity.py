@@ -0,0 +1,107 @@
+# JYXT/core/activity.py
+"""用户最后活跃时间
+
+每次请求都写用户表代价太高，这里分两层限制写入量：
+- 节流：同一用户在 ACTIVITY_THROTTLE_SECONDS 秒内只记录一次（节流标记放在共享缓存中，所有进程共用）；
+- 缓冲：记录先放在进程内缓冲区，每隔 ACTIVITY_FLUSH_INTERVAL 秒或缓冲区达到 ACTIVITY_BUFFER_SIZE 条时，
+  以每批一条 UPDATE ... CASE 语句写入数据库。
+
+因此无论请求量多大，每个用户每个节流窗口最多写一次，每个进程每个写入周期最多执行
+（活跃用户数 / 批次大小）条 UPDATE。进程异常退出时最多丢失一个写入周期的活跃时间。
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# 同一用户两次记录的最短间隔（秒）
+ACTIVITY_THROTTLE_SECONDS = 300
+# 缓冲区写入数据库的间隔（秒）
+ACTIVITY_FLUSH_INTERVAL = 60
+# 缓冲区达到该数量时立即写入
+ACTIVITY_BUFFER_SIZE = 1000
+# 每条 UPDATE 语句更新的用户数
+FLUSH_BATCH_SIZE = 500
+
+_THROTTLE_KEY = 'activity:{user_id}'
+
+
+class ActivityBuffer:
+    """进程内的活跃时间缓冲区（线程安全）"""
+
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, user_id, when):
+        with self._lock:
+            self._pending[user_id] = when
+
+    def is_due(self):
+        interval = getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', ACTIVITY_FLUSH_INTERVAL)
+        buffer_size = getattr(settings, 'ACTIVITY_BUFFER_SIZE', ACTIVITY_BUFFER_SIZE)
+        return bool(self._pending) and (
+            len(self._pending) >= buffer_size or time.monotonic() - self._last_flush >= interval
+        )
+
+    def flush(self):
+        """将缓冲的活跃时间写入数据库，返回写入的用户数"""
+        from accounts.models import User
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        items = sorted(pending.items())
+        for start in range(0, len(items), FLUSH_BATCH_SIZE):
+            batch = items[start:start + FLUSH_BATCH_SIZE]
+            try:
+                User.objects.filter(pk__in=[user_id for user_id, _ in batch]).update(
+                    last_active=Case(
+                        *[When(pk=user_id, then=Value(when)) for user_id, when in batch],
+                        output_field=DateTimeField(),
+                    )
+                )
+            except DatabaseError:
+                # 写入失败的记录放回缓冲区，下个周期重试（保留较新的时间）
+                logger.exception('用户活跃时间写入失败，%d 条记录将在下次重试', len(items) - start)
+                with self._lock:
+                    for user_id, when in items[start:]:
+                        if self._pending.get(user_id, when) <= when:
+                            self._pending[user_id] = when
+                return start
+        return len(items)
+
+
+_buffer = ActivityBuffer()
+
+
+def touch(user_id, now=None):
+    """记录用户活跃，返回本次是否被记录（节流窗口内的重复活跃不记录）"""
+    throttle = getattr(settings, 'ACTIVITY_THROTTLE_SECONDS', ACTIVITY_THROTTLE_SECONDS)
+    if throttle and not cache.add(_THROTTLE_KEY.format(user_id=user_id), 1, throttle):
+        return False
+    _buffer.record(user_id, now or timezone.now())
+    return True
+
+
+def flush():
+    """立即将缓冲的活跃时间写入数据库"""
+    return _buffer.flush()
+
+
+def flush_if_due():
+    """到达写入周期或缓冲区已满时写入数据库"""
+    if _buffer.is_due():
+        return _buffer.flush()
+    return 0
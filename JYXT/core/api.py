@@ -0,0 +1,183 @@
+# JYXT/core/api.py
+"""只读JSON接口
+
+供小程序等客户端同步数据使用，各应用在自己的 api.py 中声明资源：
+
+    class DepartmentApiView(ApiView):
+        model = Department
+        fields = {'id': 'id', 'name': 'name', 'parent': 'parent_id', 'updated_at': 'updated_at'}
+
+        def get_queryset(self):
+            return Department.objects.filter(enterprise=self.request.enterprise)
+
+- 字段选择：?fields=id,name 只查询所选字段（values()），不实例化模型；未指定时返回全部字段，id 总是返回；
+- 增量同步：?updated_since=<ISO时间> 只返回此后更新的记录；
+- 分页：键集分页（?cursor=，每页 ?page_size= 条），响应中的 next/previous 为相邻页的游标；
+- 条件请求：ETag 由查询范围内记录的最大 updated_at、记录数和请求参数计算（记录删除也会改变），
+  Last-Modified 为最大 updated_at；未变化时返回 304。列表接口请使用 If-None-Match，
+  If-Modified-Since 无法感知删除。跨关联的字段（如 'user__first_name'）不在 ETag 的计算范围内，
+  关联记录变更时（包括批量更新）必须同时更新本表记录的 updated_at，否则客户端会拿到304；
+- 压缩：客户端支持时以 gzip 返回。
+
+登录使用现有的会话认证，未登录返回401，无权限返回403。
+"""
+import hashlib
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date, quote_etag
+from django.views import View
+from django.views.decorators.gzip import gzip_page
+
+from . import authz
+from .pagination import InvalidCursor, KeysetPaginator
+
+# 默认每页记录数
+API_PAGE_SIZE = 50
+
+# 每页最大记录数
+API_MAX_PAGE_SIZE = 200
+
+
+class ApiError(Exception):
+    """请求参数错误，返回400"""
+
+
+@method_decorator(gzip_page, name='dispatch')
+class ApiView(View):
+    """只读资源接口基类：/资源/ 为列表，/资源/<pk>/ 为单条记录"""
+    http_method_names = ['get', 'head', 'options']
+    replica_reads = True
+    model = None
+    # 可返回的字段 {接口字段名: 查询路径}，查询路径可跨关联（如 'user__username'，见模块说明中的 ETag）
+    fields = {}
+    # 使用该资源需要在当前企业中拥有的角色，为None时不需要企业上下文
+    required_role = authz.MEMBER
+    # 依赖的应用（当前企业订阅该应用才能访问）
+    app_code = ''
+    # 记录更新时间字段，用于 ETag/Last-Modified 和增量同步
+    updated_field = 'updated_at'
+    # 排序字段，最后一个字段必须唯一
+    ordering = ('id',)
+    page_size = API_PAGE_SIZE
+    max_page_size = API_MAX_PAGE_SIZE
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def has_permission(self):
+        request = self.request
+        if self.required_role is None:
+            return True
+        if not request.enterprise or not authz.has_role(request, self.required_role):
+            return False
+        if self.app_code and not request.user.is_superuser:
+            from .subscriptions import get_active_app_codes
+
+            return self.app_code in get_active_app_codes(request.enterprise.pk)
+        return True
+
+    def dispatch(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'error': '请先登录'}, status=401)
+        if not self.has_permission():
+            return JsonResponse({'error': '您没有权限访问该数据'}, status=403)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+
+    def get_fields(self):
+        """本次请求返回的 {接口字段名: 查询路径}"""
+        requested = self.request.GET.get('fields', '')
+        if not requested:
+            return dict(self.fields)
+        names = [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(f'未知字段：{", ".join(unknown)}，可选字段：{", ".join(self.fields)}')
+        selected = {name: self.fields[name] for name in names}
+        for name in self.ordering:
+            selected.setdefault(name, self.fields[name])
+        return selected
+
+    def filter_queryset(self, queryset):
+        updated_since = self.request.GET.get('updated_since')
+        if updated_since:
+            value = parse_datetime(updated_since)
+            if value is None:
+                raise ApiError('updated_since 应为ISO格式的时间')
+            queryset = queryset.filter(**{f'{self.updated_field}__gt': value})
+        return queryset
+
+    def get_page_size(self):
+        try:
+            page_size = int(self.request.GET.get('page_size', self.page_size))
+        except ValueError:
+            raise ApiError('page_size 应为整数')
+        return max(1, min(page_size, self.max_page_size))
+
+    def serialize(self, row, fields):
+        """把 values() 的一行转换为接口字段（子类可重写以转换字段值，如文件URL）"""
+        return {name: row[path] for name, path in fields.items()}
+
+    def _etag(self, *parts):
+        digest = hashlib.sha1(repr((self.model._meta.label, parts)).encode()).hexdigest()
+        return quote_etag(digest)
+
+    def _conditional(self, etag, last_modified):
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return get_conditional_response(self.request, etag=etag, last_modified=timestamp)
+
+    def _respond(self, data, etag, last_modified):
+        response = JsonResponse(data, json_dumps_params={'ensure_ascii': False})
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    def get(self, request, pk=None):
+        if pk is not None:
+            return self.get_detail(pk)
+        return self.get_list()
+
+    def get_list(self):
+        fields = self.get_fields()
+        queryset = self.filter_queryset(self.get_queryset())
+        page_size = self.get_page_size()
+        cursor = self.request.GET.get('cursor', '')
+
+        stats = queryset.aggregate(last_modified=Max(self.updated_field), count=Count('pk'))
+        etag = self._etag(stats['last_modified'], stats['count'], sorted(fields), cursor, page_size,
+                          self.request.GET.get('updated_since', ''))
+        not_modified = self._conditional(etag, stats['last_modified'])
+        if not_modified is not None:
+            return not_modified
+
+        paginator = KeysetPaginator(queryset.values(*fields.values()), page_size, ordering=self.ordering, count=False)
+        try:
+            page = paginator.page(cursor)
+        except InvalidCursor:
+            raise ApiError('无效的分页游标')
+        data = {
+            'results': [self.serialize(row, fields) for row in page],
+            'next': page.next_cursor or None,
+            'previous': page.previous_cursor or None,
+        }
+        return self._respond(data, etag, stats['last_modified'])
+
+    def get_detail(self, pk):
+        fields = self.get_fields()
+        paths = list(dict.fromkeys([*fields.values(), self.updated_field]))
+        row = self.get_queryset().filter(pk=pk).values(*paths).first()
+        if row is None:
+            return JsonResponse({'error': '记录不存在'}, status=404)
+        last_modified = row[self.updated_field]
+        etag = self._etag(pk, last_modified, sorted(fields))
+        not_modified = self._conditional(etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+        return self._respond(self.serialize(row, fields), etag, last_modified)
@@ -0,0 +1,114 @@
+# JYXT/core/app_permissions.py
+"""应用管理权限矩阵
+
+各应用在配置类中声明管理员角色（admin_roles）和企业扩展信息模型上表示机构角色的字段
+（admin_role_field，如职业技能认定的 org_type）。这里按应用汇总 {企业ID: 该企业拥有的管理员角色}：
+
+    职业技能认定: {3: {'management'}, 8: {'management'}}
+
+矩阵只包含拥有管理员角色的企业，按应用缓存在共享缓存中，并在进程内保留一份；
+企业扩展信息保存或删除时递增该应用的版本号，所有进程下次使用时重新生成。
+判断某企业在某应用中的角色只需一次字典查找。
+
+失效信号不按模型连接（那需要在启动时加载应用注册表），而是接收所有模型的保存/删除信号，
+第一次收到信号时才由注册表生成 {扩展信息模型: [应用代码]}，此后每次信号只是一次字典查找。
+"""
+import threading
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+
+from .db_router import read_from_primary
+from .registry import app_registry
+from .versions import bump_version, get_version
+
+# 共享缓存有效期（秒）
+MATRIX_CACHE_TIMEOUT = 3600
+
+_VERSION_KEY = 'app_permissions:{app_code}:version'
+_MATRIX_KEY = 'app_permissions:{app_code}:{version}'
+
+# 进程内的矩阵：{应用代码: (版本号, 矩阵)}
+_matrices = {}
+_lock = threading.Lock()
+
+
+def invalidate(app_code):
+    """使某个应用的权限矩阵失效（企业扩展信息变更时调用）"""
+    bump_version(_VERSION_KEY.format(app_code=app_code))
+
+
+def _build_matrix(app_config):
+    model = app_config.get_enterprise_profile_model()
+    field = app_config.admin_role_field
+    role_codes = [role.code for role in app_config.get_admin_roles()]
+    if model is None or not field or not role_codes:
+        return {}
+    matrix = {}
+    rows = model.objects.filter(**{f'{field}__in': role_codes}).values_list('enterprise_id', field)
+    for enterprise_id, role in rows:
+        matrix.setdefault(enterprise_id, set()).add(role)
+    return {enterprise_id: frozenset(roles) for enterprise_id, roles in matrix.items()}
+
+
+def get_matrix(app_code):
+    """应用的权限矩阵 {企业ID: 管理员角色集合}，未注册的应用为空"""
+    app_config = app_registry.get_app_config(app_code)
+    if app_config is None:
+        return {}
+    version = get_version(_VERSION_KEY.format(app_code=app_code))
+    cached = _matrices.get(app_code)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    key = _MATRIX_KEY.format(app_code=app_code, version=version)
+    matrix = cache.get(key)
+    if matrix is None:
+        with read_from_primary():
+            matrix = _build_matrix(app_config)
+        cache.set(key, matrix, MATRIX_CACHE_TIMEOUT)
+    with _lock:
+        _matrices[app_code] = (version, matrix)
+    return matrix
+
+
+def get_app_roles(enterprise, app_code):
+    """企业在应用中拥有的管理员角色"""
+    if not enterprise:
+        return frozenset()
+    return get_matrix(app_code).get(enterprise.pk, frozenset())
+
+
+def has_app_role(enterprise, app_code, roles=None):
+    """企业在应用中是否拥有管理员角色（roles 为空时拥有任一管理员角色即可）"""
+    granted = get_app_roles(enterprise, app_code)
+    if roles is None:
+        return bool(granted)
+    return not granted.isdisjoint(roles)
+
+
+# 企业扩展信息模型 → 应用代码，第一次收到保存/删除信号时生成
+_profile_models = None
+
+
+def _get_profile_models():
+    global _profile_models
+    if _profile_models is None:
+        profile_models = {}
+        for app_code, app_config in app_registry.get_all_apps():
+            model = app_config.get_enterprise_profile_model()
+            if model is not None and app_config.admin_role_field:
+                profile_models.setdefault(model, []).append(app_code)
+        _profile_models = profile_models
+    return _profile_models
+
+
+def _invalidate_profile(sender, **kwargs):
+    for app_code in _get_profile_models().get(sender, ()):
+        invalidate(app_code)
+
+
+def connect_signals():
+    """连接企业扩展信息的失效信号（CoreConfig.ready 中调用，不加载应用注册表）"""
+    post_save.connect(_invalidate_profile, dispatch_uid='app_permissions:save')
+    post_delete.connect(_invalidate_profile, dispatch_uid='app_permissions:delete')
@@ -1,5 +1,6 @@
 # JYXT/core/apps.py
 from django.apps import AppConfig
+from django.core import checks
 
 
 class CoreConfig(AppConfig):
@@ -10,4 +11,18 @@ class CoreConfig(AppConfig):
     def ready(self):
         # 应用启动时的初始化代码
         # 导入templatetags以确保标签库被注册
-        import JYXT.core.templatetags.app_tags
\ No newline at end of file
+        import JYXT.core.templatetags.app_tags
+        # 注册缓存失效信号
+        import JYXT.core.signals
+        # 部署检查：多进程部署需要共享缓存
+        from JYXT.core.caches import check_shared_cache
+        checks.register(check_shared_cache, checks.Tags.caches, deploy=True)
+        # 发现各应用的仪表盘小部件
+        from JYXT.core import widgets
+        widgets.autodiscover()
+        # 发现各应用的自动补全来源
+        from JYXT.core import autocomplete
+        autocomplete.autodiscover()
+        # 应用权限矩阵随企业扩展信息变更失效
+        from JYXT.core import app_permissions
+        app_permissions.connect_signals()
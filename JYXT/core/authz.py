@@ -0,0 +1,91 @@
+# JYXT/core/authz.py
+"""企业内角色解析
+
+所有管理员权限混入类都通过这里判断用户在当前企业中的角色：
+- 用户在企业中的角色 = 该企业在职员工记录上的有效员工角色（StaffRole），一次关联查询得到；
+  在职即带有 MEMBER 角色；
+- 用户类型为企业管理员（User.user_type）的用户，在其任职的企业中同样视为企业管理员；
+- 结果按企业缓存在session中，带有版本号：员工记录变更（tenant 的用户版本号）或员工角色变更
+  （本模块的角色版本号）后自动重新查询，其余请求的权限判断不查询数据库。
+"""
+from . import tenant
+from .db_router import read_from_primary
+from .versions import bump_version, get_version
+
+ROLES_SESSION_KEY = 'enterprise_roles'
+
+# 在企业中有在职记录
+MEMBER = 'member'
+ENTERPRISE_ADMIN = 'enterprise_admin'
+
+_ROLE_VERSION_KEY = 'authz:user:{user_id}:version'
+
+
+def invalidate_user(user_id):
+    """使某个用户的角色缓存失效（员工角色变更时调用）"""
+    bump_version(_ROLE_VERSION_KEY.format(user_id=user_id))
+
+
+def _query_roles(user, enterprise_id):
+    """查询用户在企业中的角色（员工记录关联员工角色，一次查询）"""
+    from staff.models import Staff
+
+    rows = Staff.objects.filter(
+        user=user, enterprise_id=enterprise_id, employment_status=Staff.EMPLOYED
+    ).values_list('role__role_type', 'role__is_active')
+    roles = set()
+    for role_type, is_active in rows:
+        roles.add(MEMBER)
+        if role_type and is_active:
+            roles.add(role_type)
+    return sorted(roles)
+
+
+def _session_roles(request, enterprise_id):
+    user = request.user
+    version = [
+        user.pk,
+        get_version(tenant._USER_VERSION_KEY.format(user_id=user.pk)),
+        get_version(_ROLE_VERSION_KEY.format(user_id=user.pk)),
+    ]
+    stored = request.session.get(ROLES_SESSION_KEY)
+    if not stored or stored.get('version') != version:
+        stored = {'version': version, 'roles': {}}
+    key = str(enterprise_id)
+    if key not in stored['roles']:
+        # 以当前版本号存入session，读主库
+        with read_from_primary():
+            stored['roles'][key] = _query_roles(user, enterprise_id)
+        request.session[ROLES_SESSION_KEY] = stored
+    return stored['roles'][key]
+
+
+def get_roles(request, enterprise=None):
+    """用户在企业（默认为当前企业）中的角色集合"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return frozenset()
+    if enterprise is None:
+        enterprise = getattr(request, 'enterprise', None)
+    if not enterprise:
+        return frozenset()
+
+    resolved = request.__dict__.setdefault('_enterprise_roles', {})
+    if enterprise.pk not in resolved:
+        roles = set(_session_roles(request, enterprise.pk))
+        if MEMBER in roles and user.user_type == user.ENTERPRISE_ADMIN:
+            roles.add(ENTERPRISE_ADMIN)
+        resolved[enterprise.pk] = frozenset(roles)
+    return resolved[enterprise.pk]
+
+
+def has_role(request, role, enterprise=None):
+    """用户在企业中是否有某个角色（系统管理员拥有所有角色）"""
+    if request.user.is_authenticated and request.user.is_superuser:
+        return True
+    return role in get_roles(request, enterprise)
+
+
+def is_enterprise_admin(request, enterprise=None):
+    """是否为当前企业（或指定企业）的企业管理员"""
+    return has_role(request, ENTERPRISE_ADMIN, enterprise)
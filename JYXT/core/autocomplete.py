@@ -0,0 +1,253 @@
+# JYXT/core/autocomplete.py
+"""表单选择框的自动补全
+
+企业的部门、员工可能有成千上万个，表单中的选择框不再输出全部 <option>，只渲染已选中的值，
+用户输入关键词后由浏览器请求自动补全接口（/autocomplete/<来源>/?q=关键词&page=页码）。
+
+各应用在自己的 autocomplete.py 中声明数据来源（启动时自动发现）：
+
+    @autocomplete_registry.register
+    class DepartmentSource(AutocompleteSource):
+        name = 'enterprises.departments'
+        search_fields = ['name', 'code']
+        depends_on = ['enterprises.Department']
+
+        def get_queryset(self, enterprise):
+            return Department.objects.filter(enterprise=enterprise, is_active=True)
+
+        def get_results(self, queryset):
+            for pk, name, full_name in queryset.values_list('id', 'name', 'full_name'):
+                yield {'id': pk, 'text': full_name or name}
+
+- 查询：按关键词前缀匹配（范围条件，可以使用 (enterprise, 字段) 复合索引），按同一排序规则排序，
+  只取 values()，每页 page_size 条；PostgreSQL 下范围和排序都按 "C" 排序规则，
+  需要 (enterprise, 字段 COLLATE "C") 表达式索引（见 enterprises、staff 的迁移）；
+- 缓存：结果按 (来源, 企业, 关键词, 页码) 缓存，depends_on 中的模型保存或删除时
+  按记录所属企业递增版本号，只使该企业的结果失效（depends_on_fields 可限定只有哪些字段的保存才失效）；
+  绕过信号的批量写入须自行调用 invalidate()；
+- 表单：AutocompleteModelChoiceField 的选择框只查询已选中的值，校验时按主键查询一条记录。
+"""
+import hashlib
+
+from django import forms
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.functions import Collate
+from django.db.models.lookups import GreaterThanOrEqual, LessThan
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+from django.utils.module_loading import autodiscover_modules
+
+from . import authz
+from .db_router import read_from_primary
+from .versions import bump_version, get_version
+
+# 每页结果数
+AUTOCOMPLETE_PAGE_SIZE = 20
+
+# 结果缓存有效期（秒）
+AUTOCOMPLETE_CACHE_TIMEOUT = 300
+
+# 关键词最大长度
+MAX_QUERY_LENGTH = 50
+
+_VERSION_KEY = 'autocomplete:version:{source}:{enterprise_id}'
+_RESULT_KEY = 'autocomplete:{source}:{enterprise_id}:{version}:{query}:{page}'
+
+# 字符串范围查询的上界后缀（码位最大的字符）
+_PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def prefix_order(field):
+    """与 prefix_q 的范围条件一致的排序表达式（PostgreSQL 下为 "C" 排序规则，可以使用同一个索引）"""
+    if connection.vendor == 'postgresql':
+        return Collate(F(field), 'C')
+    return F(field)
+
+
+def prefix_q(field, prefix):
+    """字段以 prefix 开头的条件
+
+    LIKE 'x%' 在 SQLite（默认不区分大小写）和 PostgreSQL（非C排序规则）下都不能使用普通B树索引，
+    这里加上等价的范围条件，让数据库按索引范围扫描，再由 startswith 精确过滤。
+
+    范围条件只在按码位（字节序）比较时才覆盖所有以 prefix 开头的值：SQLite 的默认排序规则 BINARY
+    即是如此；PostgreSQL 的语言排序规则会忽略标点、U+10FFFF 的位置也不确定，因此按 "C" 排序规则比较。
+    """
+    if connection.vendor == 'postgresql':
+        value = prefix_order(field)
+        return Q(
+            GreaterThanOrEqual(value, prefix),
+            LessThan(value, prefix + _PREFIX_UPPER_BOUND),
+            **{f'{field}__startswith': prefix},
+        )
+    return Q(**{
+        f'{field}__gte': prefix,
+        f'{field}__lt': prefix + _PREFIX_UPPER_BOUND,
+        f'{field}__startswith': prefix,
+    })
+
+
+def invalidate(source_name, enterprise_id):
+    """使某个企业在该来源下的自动补全结果失效"""
+    bump_version(_VERSION_KEY.format(source=source_name, enterprise_id=enterprise_id))
+
+
+class AutocompleteSource:
+    """自动补全数据来源基类"""
+    # 唯一名称，建议使用 '应用.名称'，也是接口URL的一部分
+    name = ''
+    # 按前缀匹配的字段（任一字段匹配即可），查询集按第一个字段排序
+    search_fields = []
+    # 使用该来源需要在当前企业中拥有的角色
+    required_role = authz.MEMBER
+    page_size = AUTOCOMPLETE_PAGE_SIZE
+    cache_timeout = AUTOCOMPLETE_CACHE_TIMEOUT
+    # 依赖的模型（'app_label.ModelName'），默认按记录的 enterprise_id 使缓存失效
+    depends_on = []
+    # 依赖模型中影响结果的字段 {'app_label.ModelName': {字段}}：指定了 update_fields 的保存
+    # （如登录时只保存 last_login）不涉及这些字段时不失效；未列出的模型任何保存都失效
+    depends_on_fields = {}
+
+    def get_queryset(self, enterprise):
+        """企业内可选的记录"""
+        raise NotImplementedError
+
+    def get_results(self, queryset):
+        """把一页查询集转换为 [{'id':, 'text':}]（应使用 values()/values_list()，不实例化模型）"""
+        raise NotImplementedError
+
+    def filter_query(self, queryset, query):
+        if not query:
+            return queryset
+        condition = Q()
+        for field in self.search_fields:
+            condition |= prefix_q(field, query)
+        return queryset.filter(condition)
+
+    def get_enterprise_ids(self, sender, instance):
+        """记录变更时需要失效的企业ID"""
+        enterprise_id = getattr(instance, 'enterprise_id', None)
+        return [enterprise_id] if enterprise_id else []
+
+    def has_permission(self, request):
+        return authz.has_role(request, self.required_role)
+
+    def _cache_key(self, enterprise, query, page):
+        version = get_version(_VERSION_KEY.format(source=self.name, enterprise_id=enterprise.pk))
+        return _RESULT_KEY.format(
+            source=self.name,
+            enterprise_id=enterprise.pk,
+            version=version,
+            query=hashlib.sha1(query.encode()).hexdigest()[:16],
+            page=page,
+        )
+
+    def search(self, enterprise, query='', page=1):
+        """返回一页结果 {'results': [{'id':, 'text':}], 'pagination': {'more': bool}}（按企业缓存）"""
+        query = query.strip()[:MAX_QUERY_LENGTH]
+        key = self._cache_key(enterprise, query, page)
+        data = cache.get(key)
+        if data is None:
+            queryset = self.filter_query(self.get_queryset(enterprise), query)
+            if self.search_fields:
+                queryset = queryset.order_by(prefix_order(self.search_fields[0]), 'pk')
+            offset = (page - 1) * self.page_size
+            # 多取一条判断是否还有下一页（结果以当前版本号缓存，读主库）
+            with read_from_primary():
+                results = list(self.get_results(queryset[offset:offset + self.page_size + 1]))
+            data = {'results': results[:self.page_size], 'pagination': {'more': len(results) > self.page_size}}
+            cache.set(key, data, self.cache_timeout)
+        return data
+
+
+class AutocompleteRegistry:
+    """自动补全来源注册表"""
+
+    def __init__(self):
+        self._sources = {}
+        self._connected = set()
+
+    def register(self, source_class):
+        """注册来源（可用作类装饰器）"""
+        self._sources[source_class.name] = source_class()
+        return source_class
+
+    def get(self, name):
+        return self._sources.get(name)
+
+    def connect_signals(self):
+        """为来源依赖的模型连接缓存失效信号"""
+        for source in self._sources.values():
+            for label in source.depends_on:
+                key = (source.name, label)
+                if key in self._connected:
+                    continue
+                model = django_apps.get_model(label)
+                receiver = _Invalidator(source, source.depends_on_fields.get(label))
+                post_save.connect(receiver, sender=model, weak=False, dispatch_uid=f'autocomplete:{source.name}:{label}:save')
+                post_delete.connect(receiver, sender=model, weak=False, dispatch_uid=f'autocomplete:{source.name}:{label}:delete')
+                self._connected.add(key)
+
+
+class _Invalidator:
+    def __init__(self, source, fields=None):
+        self.source = source
+        self.fields = frozenset(fields or ())
+
+    def __call__(self, sender, instance, update_fields=None, **kwargs):
+        if self.fields and update_fields is not None and self.fields.isdisjoint(update_fields):
+            return
+        for enterprise_id in self.source.get_enterprise_ids(sender, instance):
+            invalidate(self.source.name, enterprise_id)
+
+
+# 全局自动补全来源注册表
+autocomplete_registry = AutocompleteRegistry()
+
+
+def autodiscover():
+    """导入各应用的 autocomplete 模块并连接失效信号（CoreConfig.ready 中调用）"""
+    autodiscover_modules('autocomplete')
+    autocomplete_registry.connect_signals()
+
+
+class AutocompleteSelect(forms.Select):
+    """自动补全选择框：只渲染已选中的选项，输入关键词后从自动补全接口加载"""
+    template_name = 'core/widgets/autocomplete_select.html'
+
+    def __init__(self, source, attrs=None):
+        self.source = source
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        attrs = context['widget']['attrs']
+        attrs['data-autocomplete-url'] = reverse('autocomplete', args=[self.source])
+        attrs['class'] = f"{attrs.get('class', 'form-control')} autocomplete-select".strip()
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        """只查询已选中的值（默认实现会遍历整个查询集）"""
+        selected = [str(v) for v in value if v not in (None, '')]
+        choices = self.choices
+        options = []
+        if not self.is_required or not selected:
+            options.append(self.create_option(name, '', choices.field.empty_label or '', not selected, 0))
+        if selected:
+            for index, obj in enumerate(choices.queryset.filter(pk__in=selected), start=1):
+                option_value = choices.choice(obj)[0]
+                options.append(self.create_option(
+                    name, option_value, choices.field.label_from_instance(obj), True, index,
+                ))
+        return [(None, options, 0)]
+
+
+class AutocompleteModelChoiceField(forms.ModelChoiceField):
+    """使用自动补全接口选择记录的 ModelChoiceField（source 为来源名称）"""
+
+    def __init__(self, source, queryset, **kwargs):
+        kwargs.setdefault('widget', AutocompleteSelect(source))
+        super().__init__(queryset, **kwargs)
@@ -0,0 +1,97 @@
+# JYXT/core/benchmarks.py
+"""基准测试的合成数据
+
+各基准测试命令（benchmark_tenant_indexes、benchmark_asgi）使用同一份数据分布：
+员工均匀分布到各企业、各部门，每10名员工中有1名离职；取中间的企业作为测试企业，
+它的第一名在职员工作为企业管理员登录（密码为 PASSWORD）。
+"""
+import time
+
+from accounts.models import User
+from apps.skill_assessment.models import AssessmentPlan, SkillStandard
+from enterprises.models import Department, Enterprise, EnterpriseSubscription
+from staff.models import Staff
+
+PASSWORD = 'benchmark'
+
+
+def build_dataset(enterprise_count=1000, staff_count=1000000, department_count=20, batch_size=5000, stdout=None):
+    """生成合成数据，返回 (企业管理员用户, 测试企业)"""
+    started = time.perf_counter()
+    prefix = f'BENCH{int(started * 1000) % 10 ** 8:08d}'
+
+    enterprises = Enterprise.objects.bulk_create(
+        [
+            Enterprise(name=f'基准测试企业{prefix}_{i}', unified_social_credit_code=f'{prefix}{i:010d}')
+            for i in range(enterprise_count)
+        ],
+        batch_size=batch_size,
+    )
+    if enterprises and enterprises[0].pk is None:
+        enterprises = list(Enterprise.objects.filter(name__startswith=f'基准测试企业{prefix}_').order_by('pk'))
+
+    # 每个企业一个根部门，其余部门挂在根部门下
+    roots = Department.objects.bulk_create(
+        [Department(name='总部', enterprise=enterprise) for enterprise in enterprises], batch_size=batch_size
+    )
+    if roots and roots[0].pk is None:
+        roots = list(Department.objects.filter(enterprise__in=enterprises, parent__isnull=True).order_by('pk'))
+    Department.objects.bulk_create(
+        [
+            Department(name=f'部门{j}', enterprise=root.enterprise, parent=root)
+            for root in roots for j in range(1, department_count)
+        ],
+        batch_size=batch_size,
+    )
+    Department.rebuild_paths(Department.objects.filter(enterprise__in=enterprises))
+    departments = {}
+    for department in Department.objects.filter(enterprise__in=enterprises).only('id', 'enterprise_id'):
+        departments.setdefault(department.enterprise_id, []).append(department)
+
+    EnterpriseSubscription.objects.bulk_create(
+        [
+            EnterpriseSubscription(enterprise=enterprise, app_code='skill_assessment', status='active')
+            for enterprise in enterprises
+        ],
+        batch_size=batch_size,
+    )
+
+    # 每批先创建用户再创建员工，控制内存占用
+    for offset in range(0, staff_count, batch_size):
+        users = User.objects.bulk_create(
+            [User(username=f'{prefix}_{i}', password='!') for i in range(offset, min(offset + batch_size, staff_count))]
+        )
+        if users and users[0].pk is None:
+            users = list(
+                User.objects.filter(username__in=[user.username for user in users]).order_by('pk')
+            )
+        staff = []
+        for i, user in enumerate(users, start=offset):
+            enterprise = enterprises[i % len(enterprises)]
+            enterprise_departments = departments[enterprise.pk]
+            staff.append(Staff(
+                user=user,
+                enterprise=enterprise,
+                department=enterprise_departments[(i // len(enterprises)) % len(enterprise_departments)],
+                employment_status=Staff.RESIGNED if i % 10 == 9 else Staff.EMPLOYED,
+            ))
+        Staff.objects.bulk_create(staff)
+
+    enterprise = enterprises[len(enterprises) // 2]
+    admin = Staff.objects.filter(
+        enterprise=enterprise, employment_status=Staff.EMPLOYED
+    ).select_related('user').order_by('pk').first().user
+    admin.user_type = User.ENTERPRISE_ADMIN
+    admin.set_password(PASSWORD)
+    admin.save()
+    standard = SkillStandard.objects.create(enterprise=enterprise, name='基准测试标准', code='BENCH', level='一级')
+    AssessmentPlan.objects.create(
+        enterprise=enterprise, title='基准测试计划', skill_standard=standard, plan_date=time.strftime('%Y-%m-%d')
+    )
+
+    if stdout is not None:
+        stdout.write(
+            f'生成数据：{len(enterprises)} 家企业，{staff_count} 名员工，'
+            f'耗时 {time.perf_counter() - started:.1f}s'
+        )
+    return admin, enterprise
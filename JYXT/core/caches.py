@@ -0,0 +1,83 @@
+# JYXT/core/caches.py
+"""缓存配置
+
+从环境变量中的连接字符串生成 Django 的 CACHES 配置项（settings 中调用，不依赖 Django 应用加载）：
+
+    redis://主机:6379/0                     Redis（rediss:// 为TLS连接），需要安装 redis
+    memcached://主机1:11211,主机2:11211      Memcached，需要安装 pymemcache
+    locmem://                               进程内缓存（默认，仅用于开发和测试）
+
+企业列表、角色、订阅、小部件、自动补全等缓存按版本号失效，用户活跃时间的写入节流也在缓存中计数，
+这些版本号和计数必须在所有工作进程之间共享：多进程（gunicorn -w / uvicorn --workers）
+或多台服务器部署时必须配置 Redis 或 Memcached，否则一个进程中的修改不会使其他进程的缓存失效。
+"""
+from urllib.parse import urlsplit
+
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+REDIS_SCHEMES = {'redis', 'rediss'}
+MEMCACHED_SCHEMES = {'memcached', 'pymemcache'}
+
+# 进程内缓存的后端（不能在进程之间共享）
+LOCAL_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+}
+
+# 缓存键前缀，多个项目共用一个Redis/Memcached时避免冲突
+DEFAULT_KEY_PREFIX = 'jyxt'
+
+
+def cache_from_url(url, key_prefix=DEFAULT_KEY_PREFIX):
+    """根据连接字符串生成单个缓存的配置"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    if scheme == 'locmem':
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': parts.netloc or 'jyxt',
+        }
+
+    if scheme in REDIS_SCHEMES:
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': url,
+            'KEY_PREFIX': key_prefix,
+        }
+
+    if scheme in MEMCACHED_SCHEMES:
+        if not parts.netloc:
+            raise ImproperlyConfigured(f'Memcached连接字符串缺少服务器地址：{url}')
+        return {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': parts.netloc.split(','),
+            'KEY_PREFIX': key_prefix,
+        }
+
+    raise ImproperlyConfigured(f'不支持的缓存类型：{scheme or url}')
+
+
+def caches_from_env(environ):
+    """根据环境变量生成 CACHES 配置
+
+    CACHE_URL          缓存连接字符串（默认 locmem://，多进程部署必须配置 Redis 或 Memcached）
+    CACHE_KEY_PREFIX   缓存键前缀（默认 jyxt）
+    """
+    url = environ.get('CACHE_URL') or 'locmem://'
+    return {'default': cache_from_url(url, environ.get('CACHE_KEY_PREFIX') or DEFAULT_KEY_PREFIX)}
+
+
+def check_shared_cache(app_configs=None, **kwargs):
+    """部署检查（manage.py check --deploy）：默认缓存不能是进程内缓存"""
+    from django.conf import settings
+
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend in LOCAL_BACKENDS:
+        return [checks.Warning(
+            f'默认缓存使用进程内缓存（{backend.rsplit(".", 1)[-1]}），缓存失效和活跃时间节流不会在工作进程之间共享',
+            hint='多进程或多台服务器部署时请通过 CACHE_URL 配置 Redis 或 Memcached',
+            id='jyxt.W001',
+        )]
+    return []
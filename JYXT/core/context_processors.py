@@ -1,16 +1,30 @@
 # JYXT/core/context_processors.py
 from .registry import app_registry
+from .tenant import get_enterprise_choices
 from django.conf import settings
 
 def app_registry_processor(request):
     """将应用注册表和系统设置添加到模板上下文"""
     current_enterprise = getattr(request, 'enterprise', None)
-    available_apps = app_registry.get_available_apps(current_enterprise)
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_superuser:
+        # 系统管理员可以访问所有应用
+        available_apps = dict(app_registry.get_all_apps())
+    else:
+        available_apps = app_registry.get_available_apps(current_enterprise)
+    
+    # 当前企业中的任职信息（部门、职位），取自session中的在职企业列表
+    current_employment = None
+    if current_enterprise and user is not None and user.is_authenticated and not user.is_superuser:
+        current_employment = next(
+            (choice for choice in get_enterprise_choices(request) if choice['id'] == current_enterprise.pk), None
+        )
     
     return {
         'app_registry': app_registry,
         'available_apps': available_apps,
         'current_enterprise': current_enterprise,
+        'current_employment': current_employment,
         # 系统信息设置
         'SYSTEM_NAME': getattr(settings, 'SYSTEM_NAME', '景云系统'),
         'DEFAULT_PAGE_TITLE': getattr(settings, 'DEFAULT_PAGE_TITLE', '景云系统'),
@@ -0,0 +1,107 @@
+# JYXT/core/database.py
+"""数据库连接配置
+
+从环境变量中的连接字符串生成 Django 的 DATABASES 配置项（settings 中调用，不依赖 Django 应用加载）：
+
+    sqlite:///db.sqlite3                   相对项目根目录的SQLite文件
+    sqlite:////var/lib/jyxt/db.sqlite3      绝对路径
+    postgres://用户:密码@主机:端口/库名?sslmode=require
+
+PostgreSQL 需要安装 psycopg（启用连接池时为 psycopg[pool]）。
+SQLite 默认开启WAL日志、写事务立即加锁并设置锁等待超时，减少并发写入时的"database is locked"。
+"""
+from pathlib import Path
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+POSTGRES_SCHEMES = {'postgres', 'postgresql', 'pgsql'}
+
+# SQLite 并发写入配置
+SQLITE_OPTIONS = {
+    # 等待写锁的秒数
+    'timeout': 20,
+    # 事务开始即获取写锁，避免读事务升级为写事务时的锁冲突
+    'transaction_mode': 'IMMEDIATE',
+    # WAL 模式下读写互不阻塞
+    'init_command': 'PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL;',
+}
+
+
+def _env_flag(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_from_url(url, base_dir=None, conn_max_age=60, pool=False, pool_min_size=None, pool_max_size=None):
+    """根据连接字符串生成单个数据库的配置
+
+    conn_max_age：持久连接的最长保持时间（秒，None为不限）；
+    pool：PostgreSQL 使用 psycopg 连接池（此时不使用持久连接）。
+    """
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    if scheme == 'sqlite':
+        # sqlite:///相对路径、sqlite:////绝对路径
+        name = unquote(parts.path[1:] if parts.path.startswith('/') else parts.path)
+        if not name:
+            raise ImproperlyConfigured(f'SQLite连接字符串缺少数据库文件：{url}')
+        if name != ':memory:' and base_dir is not None and not Path(name).is_absolute():
+            name = Path(base_dir) / name
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name,
+            'OPTIONS': dict(SQLITE_OPTIONS),
+        }
+
+    if scheme in POSTGRES_SCHEMES:
+        options = dict(parse_qsl(parts.query))
+        config = {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': unquote(parts.path.lstrip('/')),
+            'USER': unquote(parts.username or ''),
+            'PASSWORD': unquote(parts.password or ''),
+            'HOST': parts.hostname or '',
+            'PORT': str(parts.port or ''),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': options,
+        }
+        if pool:
+            # 连接池与持久连接不能同时使用
+            sizes = {'min_size': pool_min_size, 'max_size': pool_max_size}
+            options['pool'] = {key: value for key, value in sizes.items() if value is not None} or True
+            config['CONN_MAX_AGE'] = 0
+        else:
+            config['CONN_MAX_AGE'] = conn_max_age
+        return config
+
+    raise ImproperlyConfigured(f'不支持的数据库类型：{scheme or url}')
+
+
+def databases_from_env(environ, base_dir):
+    """根据环境变量生成 DATABASES 配置
+
+    DATABASE_URL               主库连接字符串（默认项目根目录下的 db.sqlite3）
+    DATABASE_REPLICA_URL       只读副本连接字符串（可选，配置后只读页面从副本读取）
+    DATABASE_CONN_MAX_AGE      持久连接保持时间（秒，默认60）
+    DATABASE_POOL              PostgreSQL 是否使用连接池（默认否）
+    DATABASE_POOL_MIN_SIZE / DATABASE_POOL_MAX_SIZE  连接池大小
+    """
+    def optional_int(name):
+        value = environ.get(name)
+        return int(value) if value not in (None, '') else None
+
+    options = {
+        'base_dir': base_dir,
+        'conn_max_age': optional_int('DATABASE_CONN_MAX_AGE') if 'DATABASE_CONN_MAX_AGE' in environ else 60,
+        'pool': _env_flag(environ.get('DATABASE_POOL', '')),
+        'pool_min_size': optional_int('DATABASE_POOL_MIN_SIZE'),
+        'pool_max_size': optional_int('DATABASE_POOL_MAX_SIZE'),
+    }
+    databases = {'default': database_from_url(environ.get('DATABASE_URL', 'sqlite:///db.sqlite3'), **options)}
+    replica_url = environ.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        databases['replica'] = database_from_url(replica_url, **options)
+        # 测试时副本指向主库的测试数据库
+        databases['replica']['TEST'] = {'MIRROR': 'default'}
+    return databases
@@ -0,0 +1,123 @@
+# JYXT/core/db_router.py
+"""读写分离
+
+写操作一律发往主库；只读页面（列表、详情、仪表盘）的读操作发往只读副本（settings.DATABASE_REPLICAS）。
+
+- 视图是否从副本读取：列表视图、详情视图默认从副本读取，其他视图设置类属性 replica_reads = True
+  （函数视图使用 @replica_reads 装饰器）开启，设置为 False 关闭；
+- 读己之写：会话发出写请求（POST等）后，在 DATABASE_REPLICA_STICKY_SECONDS 秒内该会话的所有读取都走主库，
+  避免副本复制延迟导致刚保存的数据"消失"；
+- 会话等必须读到最新数据的应用始终读主库；
+- 填充带版本号的共享缓存（企业解析、角色、订阅、小部件等）时用 read_from_primary() 读主库：
+  否则副本复制延迟会让旧数据以当前版本号写入缓存，在下次失效之前所有进程都读到旧数据。
+
+未配置副本时路由和中间件不起任何作用。
+"""
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.deprecation import MiddlewareMixin
+from django.views.generic.detail import BaseDetailView
+from django.views.generic.edit import BaseDeleteView
+from django.views.generic.list import BaseListView
+
+# 会话写请求之后读主库的秒数（应大于副本的复制延迟）
+DEFAULT_STICKY_SECONDS = 10
+
+# 始终读主库的应用
+PRIMARY_ONLY_APPS = {'sessions', 'contenttypes', 'migrations'}
+
+SESSION_KEY = '_db_primary_until'
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def get_replicas():
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    """在代码块内从副本读取（后台任务、报表等可直接使用）"""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_primary():
+    """在代码块内从主库读取（填充带版本号的缓存时使用）"""
+    return read_from_replica(False)
+
+
+def replica_reads(view):
+    """函数视图装饰器：该视图的读操作从副本读取"""
+    view.replica_reads = True
+    return view
+
+
+class PrimaryReplicaRouter:
+    """主从读写分离路由"""
+
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or model._meta.app_label in PRIMARY_ONLY_APPS:
+            return DEFAULT_DB_ALIAS
+        replicas = get_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # 副本与主库数据相同，跨库关联视为同一个库
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return None
+
+
+def _view_reads_from_replica(view_func):
+    view = getattr(view_func, 'view_class', view_func)
+    flag = getattr(view, 'replica_reads', None)
+    if flag is not None:
+        return flag
+    # 删除视图继承自详情视图，但确认页面应读主库
+    return (
+        isinstance(view, type)
+        and issubclass(view, (BaseListView, BaseDetailView))
+        and not issubclass(view, BaseDeleteView)
+    )
+
+
+class ReplicaRoutingMiddleware(MiddlewareMixin):
+    """按请求决定读操作是否发往副本，并记录会话的最近写请求（需放在 SessionMiddleware 之后）"""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not get_replicas() or request.method not in SAFE_METHODS:
+            return None
+        if not _view_reads_from_replica(view_func):
+            return None
+        session = getattr(request, 'session', None)
+        if session is not None and session.get(SESSION_KEY, 0) > time.time():
+            return None
+        # 记录原值而不是 Token：ASGI 下各中间件钩子在不同的上下文副本中执行，Token 无法跨上下文重置
+        request._replica_previous = _replica_reads.get()
+        _replica_reads.set(True)
+        return None
+
+    def process_response(self, request, response):
+        if hasattr(request, '_replica_previous'):
+            _replica_reads.set(request._replica_previous)
+            del request._replica_previous
+        user = getattr(request, 'user', None)
+        if get_replicas() and request.method not in SAFE_METHODS and user is not None and user.is_authenticated:
+            sticky = getattr(settings, 'DATABASE_REPLICA_STICKY_SECONDS', DEFAULT_STICKY_SECONDS)
+            request.session[SESSION_KEY] = time.time() + sticky
+        return response
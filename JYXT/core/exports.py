@@ -0,0 +1,101 @@
+# JYXT/core/exports.py
+"""列表数据导出
+
+以生成器逐行写出导出文件，配合 queryset.iterator(chunk_size=...) 使用，
+导出十万行级别的数据时内存占用保持平稳：
+- CSV：直接以 StreamingHttpResponse 边生成边发送；
+- XLSX：openpyxl（可选依赖）只写模式写入临时文件，再以 FileResponse 分块发送。
+
+单元格内容多由企业管理员录入或导入，以 = + - @ 制表符、回车开头的文本在 Excel/WPS 中会被当作公式执行，
+两种格式写出前都经过 sanitize_row()，在这类文本前加单引号。
+"""
+import csv
+import tempfile
+from urllib.parse import quote
+
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+
+# queryset.iterator() 每次从数据库读取的行数
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+# 电子表格软件会当作公式解析的文本开头
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class ExportError(Exception):
+    """导出格式不支持或缺少依赖"""
+
+
+class _Echo:
+    """csv.writer 需要的类文件对象，write() 直接返回写入的内容"""
+
+    def write(self, value):
+        return value
+
+
+def sanitize_cell(value):
+    """防止公式注入：可能被当作公式的文本前加单引号，其他值原样返回"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+def sanitize_row(row):
+    return [sanitize_cell(value) for value in row]
+
+
+def _content_disposition(filename):
+    # 中文文件名按 RFC 5987 编码
+    return f"attachment; filename*=UTF-8''{quote(filename)}"
+
+
+def csv_response(filename, header, rows):
+    """流式CSV响应（带BOM，Excel可直接打开）"""
+    writer = csv.writer(_Echo())
+
+    def stream():
+        yield '\ufeff' + writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(sanitize_row(row))
+
+    response = StreamingHttpResponse(stream(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = _content_disposition(f'{filename}.csv')
+    return response
+
+
+def xlsx_response(filename, header, rows):
+    """XLSX响应：只写模式逐行写入临时文件，避免在内存中保留整个工作簿"""
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportError('导出XLSX文件需要安装openpyxl，请改用CSV格式或执行 pip install openpyxl')
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(header)
+    for row in rows:
+        worksheet.append(sanitize_row(row))
+
+    # 临时文件在响应关闭时由 FileResponse 关闭并删除
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return FileResponse(
+        output,
+        as_attachment=True,
+        filename=f'{filename}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
+def export_response(export_format, filename, header, rows):
+    """按格式生成导出响应，文件名自动追加导出时间"""
+    filename = f'{filename}_{timezone.localtime():%Y%m%d%H%M%S}'
+    if export_format == 'csv':
+        return csv_response(filename, header, rows)
+    if export_format == 'xlsx':
+        return xlsx_response(filename, header, rows)
+    raise ExportError('仅支持导出CSV或XLSX格式')
@@ -0,0 +1,189 @@
+# JYXT/core/management/commands/benchmark_asgi.py
+import http.client
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from JYXT.core.benchmarks import PASSWORD, build_dataset
+from staff import search
+from staff.models import Staff
+
+LOGIN_PATH = '/accounts/login/'
+
+_CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+class _Connection:
+    """保持连接的HTTP客户端（每个压测线程一个），带上登录后的Cookie"""
+
+    def __init__(self, base_url, cookies=None):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.cookies = dict(cookies or {})
+        self._connection = None
+
+    def request(self, method, path, body=None, headers=None):
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{name}={value}' for name, value in self.cookies.items())
+        # 服务器关闭了空闲连接时重连一次
+        for attempt in (1, 2):
+            if self._connection is None:
+                self._connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                content = response.read()
+                break
+            except (http.client.HTTPException, ConnectionError):
+                self._connection.close()
+                self._connection = None
+                if attempt == 2:
+                    raise
+        for header, value in response.getheaders():
+            if header.lower() == 'set-cookie':
+                name, _, rest = value.partition('=')
+                self.cookies[name.strip()] = rest.split(';', 1)[0]
+        return response.status, content
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+
+
+def _login(base_url, username, password):
+    """登录并返回会话Cookie"""
+    client = _Connection(base_url)
+    try:
+        status, content = client.request('GET', LOGIN_PATH)
+        match = _CSRF_INPUT.search(content.decode('utf-8', 'ignore'))
+        if status != 200 or match is None:
+            raise CommandError(f'{base_url} 无法打开登录页面（状态码 {status}）')
+        body = urlencode({'username': username, 'password': password, 'csrfmiddlewaretoken': match.group(1)})
+        status, _ = client.request('POST', LOGIN_PATH, body=body, headers={
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Referer': base_url.rstrip('/') + LOGIN_PATH,
+        })
+        if status != 302 or 'sessionid' not in client.cookies:
+            raise CommandError(f'{base_url} 登录失败（状态码 {status}），请先运行 --setup 或检查用户名密码')
+        return client.cookies
+    finally:
+        client.close()
+
+
+def _percentile(timings, percent):
+    return timings[min(len(timings) - 1, int(len(timings) * percent / 100))]
+
+
+class Command(BaseCommand):
+    help = (
+        '同步（WSGI）与异步（ASGI）部署的吞吐量对比：先用 --setup 生成持久的合成数据，'
+        '再分别用 gunicorn 和 uvicorn 启动服务，并发请求仪表盘小部件、员工搜索和企业选择接口'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--setup', action='store_true', help='生成合成数据（不回滚）并建立测试企业的员工搜索索引')
+        parser.add_argument('--enterprises', type=int, default=100, help='--setup 的企业数量（默认100）')
+        parser.add_argument('--staff', type=int, default=100000, help='--setup 的员工总数（默认100000）')
+        parser.add_argument('--departments', type=int, default=20, help='--setup 每个企业的部门数量（默认20）')
+        parser.add_argument('--batch-size', type=int, default=5000, help='--setup 批量写入的批次大小（默认5000）')
+        parser.add_argument('--wsgi-url', help='同步部署地址，如 http://127.0.0.1:8000')
+        parser.add_argument('--asgi-url', help='异步部署地址，如 http://127.0.0.1:8001')
+        parser.add_argument('--username', help='登录用户名（--setup 时输出）')
+        parser.add_argument('--password', default=PASSWORD, help='登录密码（默认为合成数据的密码）')
+        parser.add_argument('--query', help='员工搜索关键词（默认为用户名前缀，匹配测试企业的全部员工）')
+        parser.add_argument('--concurrency', type=int, default=16, help='并发请求数（默认16）')
+        parser.add_argument('--requests', type=int, default=500, help='每个接口的请求数（默认500）')
+
+    def handle(self, *args, **options):
+        if options['setup']:
+            self._setup(options)
+            return
+        targets = [(label, options[key]) for label, key in (('WSGI', 'wsgi_url'), ('ASGI', 'asgi_url')) if options[key]]
+        if not targets:
+            raise CommandError('请指定 --wsgi-url 和/或 --asgi-url，或使用 --setup 生成数据')
+        if not options['username']:
+            raise CommandError('请指定 --username')
+
+        query = options['query'] or options['username'].rsplit('_', 1)[0]
+        cases = [
+            ('仪表盘小部件', '/dashboard/widgets/?' + urlencode({'dashboard': 'home'})),
+            ('员工搜索', '/staff/search/?' + urlencode({'q': query})),
+            ('企业选择', '/accounts/select-enterprise/'),
+        ]
+        results = {}
+        for label, base_url in targets:
+            self.stdout.write(f'\n{label}（{base_url}）：')
+            cookies = _login(base_url, options['username'], options['password'])
+            for name, path in cases:
+                result = self._load(base_url, cookies, path, options['concurrency'], options['requests'])
+                results[label, name] = result
+                self.stdout.write(
+                    f'  {name:<8} {result["throughput"]:8.1f} req/s  '
+                    f'p50={result["p50"] * 1000:.1f}ms p95={result["p95"] * 1000:.1f}ms 失败={result["errors"]}'
+                )
+        if len(targets) == 2:
+            self._report(results, cases)
+
+    def _setup(self, options):
+        with transaction.atomic():
+            admin, enterprise = build_dataset(
+                options['enterprises'], options['staff'], options['departments'], options['batch_size'],
+                stdout=self.stdout,
+            )
+        # 批量写入的员工没有触发信号，为测试企业补建搜索索引
+        search.rebuild_index(Staff.objects.filter(enterprise=enterprise))
+        self.stdout.write(self.style.SUCCESS(
+            f'合成数据已生成：测试企业 {enterprise.name}，登录用户名 {admin.username}，密码 {PASSWORD}'
+        ))
+
+    def _load(self, base_url, cookies, path, concurrency, total):
+        """并发发送 total 个请求，返回吞吐量和延迟分位数"""
+        local = threading.local()
+        connections = []
+        lock = threading.Lock()
+
+        def call(_):
+            client = getattr(local, 'client', None)
+            if client is None:
+                client = local.client = _Connection(base_url, cookies)
+                with lock:
+                    connections.append(client)
+            started = time.perf_counter()
+            try:
+                status, _ = client.request('GET', path)
+            except (OSError, http.client.HTTPException):
+                status = None
+            return time.perf_counter() - started, status is None or status >= 400
+
+        # 预热：每个并发连接先请求一次，不计入结果
+        with ThreadPoolExecutor(concurrency) as executor:
+            list(executor.map(call, range(concurrency)))
+            started = time.perf_counter()
+            outcomes = list(executor.map(call, range(total)))
+            elapsed = time.perf_counter() - started
+        for client in connections:
+            client.close()
+
+        timings = sorted(timing for timing, _ in outcomes)
+        return {
+            'throughput': total / elapsed,
+            'p50': _percentile(timings, 50),
+            'p95': _percentile(timings, 95),
+            'errors': sum(failed for _, failed in outcomes),
+        }
+
+    def _report(self, results, cases):
+        self.stdout.write('\n对比（WSGI → ASGI）：')
+        for name, _ in cases:
+            sync, async_ = results['WSGI', name], results['ASGI', name]
+            self.stdout.write(
+                f'  {name:<8} {sync["throughput"]:.1f} → {async_["throughput"]:.1f} req/s  '
+                f'p95 {sync["p95"] * 1000:.1f}ms → {async_["p95"] * 1000:.1f}ms'
+            )
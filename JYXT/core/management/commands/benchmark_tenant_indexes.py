@@ -0,0 +1,138 @@
+# JYXT/core/management/commands/benchmark_tenant_indexes.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import override_settings
+
+from enterprises.models import Department, EnterpriseSubscription
+from JYXT.core.benchmarks import PASSWORD, build_dataset
+from staff.models import Staff
+
+# 参与对比的复合索引（模型 Meta.indexes 中声明）
+BENCHMARK_MODELS = [Staff, Department, EnterpriseSubscription]
+
+# 基准测试不使用缓存，每次请求都走数据库查询；密码使用快速哈希，避免哈希耗时掩盖查询耗时
+BENCHMARK_SETTINGS = {
+    'CACHES': {'default': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}},
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+}
+
+
+class _SQLTimer:
+    """统计请求中SQL的执行次数和耗时"""
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.elapsed += time.perf_counter() - started
+
+
+class _Rollback(Exception):
+    """用于在基准测试结束后回滚全部合成数据"""
+
+
+class Command(BaseCommand):
+    help = (
+        '多租户复合索引基准测试：在事务中生成合成数据，分别在有、无复合索引时测量登录、列表和仪表盘页面的耗时，'
+        '结束后回滚全部数据和索引变更'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enterprises', type=int, default=1000, help='企业数量（默认1000）')
+        parser.add_argument('--staff', type=int, default=1000000, help='员工总数（默认1000000）')
+        parser.add_argument('--departments', type=int, default=20, help='每个企业的部门数量（默认20）')
+        parser.add_argument('--repeat', type=int, default=5, help='每项测试重复次数（默认5）')
+        parser.add_argument('--batch-size', type=int, default=5000, help='批量写入的批次大小（默认5000）')
+
+    def handle(self, *args, **options):
+        try:
+            with override_settings(**BENCHMARK_SETTINGS), transaction.atomic():
+                admin, enterprise = build_dataset(
+                    options['enterprises'], options['staff'], options['departments'], options['batch_size'],
+                    stdout=self.stdout,
+                )
+                self._analyze()
+                after = self._run('有复合索引', admin, enterprise, options['repeat'])
+                self._drop_indexes()
+                self._analyze()
+                before = self._run('无复合索引', admin, enterprise, options['repeat'])
+                self._report(before, after)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('基准测试完成，合成数据和索引变更已回滚'))
+
+    def _analyze(self):
+        # 更新统计信息，让查询规划器看到真实的数据分布
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+
+    def _drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in BENCHMARK_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f'DROP INDEX {connection.ops.quote_name(index.name)}')
+
+    def _measure(self, func, repeat):
+        # 预热一次（模板加载、数据页进入内存），不计入结果
+        func()
+        timings = []
+        sql_timings = []
+        for _ in range(repeat):
+            sql = _SQLTimer()
+            with connection.execute_wrapper(sql):
+                started = time.perf_counter()
+                response = func()
+                timings.append(time.perf_counter() - started)
+            if response.status_code >= 400:
+                raise RuntimeError(f'请求失败：{response.status_code}')
+            sql_timings.append(sql.elapsed)
+        timings.sort()
+        sql_timings.sort()
+        return timings[len(timings) // 2], sql_timings[len(sql_timings) // 2], sql.count
+
+    def _run(self, label, admin, enterprise, repeat):
+        self.stdout.write(f'\n{label}：')
+        client = Client()
+        client.force_login(admin)
+        session = client.session
+        session['current_enterprise_id'] = enterprise.pk
+        session.save()
+
+        def login():
+            return Client().post('/accounts/login/', {'username': admin.username, 'password': PASSWORD})
+
+        cases = [
+            ('登录', login),
+            ('员工列表', lambda: client.get('/staff/')),
+            ('用户列表', lambda: client.get('/accounts/users/')),
+            ('部门列表', lambda: client.get('/enterprises/departments/')),
+            ('系统仪表盘', lambda: client.get('/dashboard/')),
+            ('技能认定仪表盘', lambda: client.get('/apps/skill-assessment/')),
+        ]
+        results = {}
+        for name, func in cases:
+            median, sql_median, queries = self._measure(func, repeat)
+            results[name] = (median, sql_median)
+            self.stdout.write(
+                f'  {name:<12} SQL数={queries:<4} 中位数={median * 1000:.1f}ms SQL耗时={sql_median * 1000:.1f}ms'
+            )
+        return results
+
+    def _report(self, before, after):
+        self.stdout.write('\n对比（无复合索引 → 有复合索引，请求耗时 / 其中SQL耗时）：')
+        for name, (total_before, sql_before) in before.items():
+            total_after, sql_after = after[name]
+            self.stdout.write(
+                f'  {name:<12} {total_before * 1000:.1f}ms → {total_after * 1000:.1f}ms  '
+                f'SQL {sql_before * 1000:.1f}ms → {sql_after * 1000:.1f}ms'
+            )
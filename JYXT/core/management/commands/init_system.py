@@ -36,22 +36,17 @@ class Command(BaseCommand):
     
     def init_skill_assessment_configs(self):
         """初始化职业技能等级认定配置"""
+        from apps.skill_assessment.conf import CONFIG_OPTIONS, to_text
         from apps.skill_assessment.models import SkillAssessmentConfig
         
-        default_configs = [
-            ('max_assessment_duration', '30', '最大认定时长（天）', False),
-            ('certificate_template', 'default', '证书模板', False),
-            ('min_participants', '10', '最小参与人数', False),
-            ('system_version', '1.0.0', '系统版本', True),
-        ]
-        
-        for key, value, description, is_system in default_configs:
+        # 默认配置与配置读取共用同一份声明
+        for option in CONFIG_OPTIONS.values():
             SkillAssessmentConfig.objects.get_or_create(
-                key=key,
+                key=option.key,
                 defaults={
-                    'value': value,
-                    'description': description,
-                    'is_system': is_system
+                    'value': to_text(option.key, option.default),
+                    'description': option.description,
+                    'is_system': option.is_system
                 }
             )
         
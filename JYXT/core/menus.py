@@ -0,0 +1,122 @@
+# JYXT/core/menus.py
+"""侧边栏应用菜单
+
+每个应用的菜单配置只编译一次（反向解析URL），渲染后的菜单HTML片段按
+（可用应用及其版本, 用户拥有的菜单权限和角色）缓存。同一组应用、同样菜单权限和角色的用户共用一份缓存，
+预热后渲染侧边栏不再需要反向解析URL、遍历菜单配置或查询数据库。
+
+菜单项可以声明 permission（Django权限）和/或 role（用户在当前企业中的角色，见 authz），
+拥有其中之一即显示；都未声明的菜单项对所有用户显示。
+
+用户权限集合同样缓存，用户/用户组权限变更时（m2m_changed信号）递增版本号使其失效。
+"""
+import hashlib
+import logging
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse
+
+from .db_router import read_from_primary
+from .versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+# 菜单片段缓存有效期（秒）；菜单只随应用版本和权限变化，可以缓存较长时间
+MENU_CACHE_TIMEOUT = 24 * 60 * 60
+
+# 用户权限集合缓存有效期（秒）
+PERMISSION_CACHE_TIMEOUT = 300
+
+MENU_TEMPLATE = 'includes/app_menu.html'
+
+_PERMISSION_VERSION_KEY = 'menu:permissions:version'
+_PERMISSION_KEY = 'menu:permissions:{version}:{user_id}'
+_MENU_KEY = 'menu:{apps}:{permissions}'
+
+
+def compile_menu(menu_items):
+    """编译菜单配置：反向解析每个菜单项的URL，无法解析的菜单项会被跳过"""
+    compiled = []
+    for group in menu_items:
+        items = []
+        for item in group.get('items', []):
+            try:
+                url = reverse(item['url'])
+            except NoReverseMatch:
+                logger.warning('菜单项"%s"的URL无法解析：%s', item.get('name'), item['url'])
+                continue
+            items.append({
+                'name': item['name'],
+                'url': url,
+                'permission': item.get('permission', ''),
+                'role': item.get('role', ''),
+            })
+        compiled.append({'name': group.get('name', ''), 'icon': group.get('icon', ''), 'items': items})
+    return compiled
+
+
+def invalidate_permissions():
+    """使所有用户的权限集合缓存失效（用户或用户组权限变更时调用）"""
+    bump_version(_PERMISSION_VERSION_KEY)
+
+
+def get_user_permissions(user):
+    """用户拥有的全部权限（'app_label.codename' 集合），按用户缓存"""
+    key = _PERMISSION_KEY.format(version=get_version(_PERMISSION_VERSION_KEY), user_id=user.pk)
+    permissions = cache.get(key)
+    if permissions is None:
+        with read_from_primary():
+            permissions = frozenset(user.get_all_permissions())
+        cache.set(key, permissions, PERMISSION_CACHE_TIMEOUT)
+    return permissions
+
+
+def _digest(values):
+    return hashlib.sha1(','.join(values).encode()).hexdigest()[:16]
+
+
+def _is_visible(item, granted, granted_roles):
+    if not item['permission'] and not item['role']:
+        return True
+    return item['permission'] in granted or item['role'] in granted_roles
+
+
+def render_app_menu(user, apps, roles=frozenset()):
+    """渲染可用应用的侧边栏菜单HTML
+
+    apps 为 {应用代码: 应用配置}，roles 为用户在当前企业中的角色（authz.get_roles()）。
+    """
+    if not apps:
+        return ''
+    menus = [(code, config, config.get_menu()) for code, config in sorted(apps.items())]
+    items = [item for _, _, menu in menus for group in menu for item in group['items']]
+
+    # 只按菜单涉及的权限和角色区分缓存，与菜单无关的差异不会产生新的缓存
+    required = {item['permission'] for item in items if item['permission']}
+    required_roles = {item['role'] for item in items if item['role']}
+    if not user.is_authenticated:
+        granted, granted_roles = set(), set()
+    elif user.is_superuser:
+        granted, granted_roles = required, required_roles
+    else:
+        granted = required & get_user_permissions(user) if required else set()
+        granted_roles = required_roles & set(roles)
+
+    key = _MENU_KEY.format(
+        apps=_digest(f'{code}@{config.version}' for code, config, _ in menus),
+        permissions=_digest([*sorted(granted), *(f'role:{role}' for role in sorted(granted_roles))]),
+    )
+    html = cache.get(key)
+    if html is None:
+        visible_apps = []
+        for code, config, menu in menus:
+            items = [
+                item for group in menu for item in group['items']
+                if _is_visible(item, granted, granted_roles)
+            ]
+            if items:
+                visible_apps.append({'code': code, 'name': config.name, 'items': items})
+        html = render_to_string(MENU_TEMPLATE, {'apps': visible_apps})
+        cache.set(key, html, MENU_CACHE_TIMEOUT)
+    return html
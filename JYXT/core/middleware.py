@@ -1,30 +1,24 @@
-# JYXT/core/middleware.py
 from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+
+from . import activity
+from .tenant import resolve_enterprise
 
 class TenantMiddleware(MiddlewareMixin):
     """多租户中间件"""
-    
+
     def process_request(self, request):
-        """处理请求，设置当前企业上下文"""
-        if request.user.is_authenticated:
-            # 系统管理员可以从session中选择企业
-            if request.user.is_superuser:
-                enterprise_id = request.session.get('current_enterprise_id')
-                if enterprise_id:
-                    try:
-                        from enterprises.models import Enterprise
-                        request.enterprise = Enterprise.objects.get(id=enterprise_id)
-                    except Enterprise.DoesNotExist:
-                        request.enterprise = None
-                else:
-                    request.enterprise = None
-            # 企业用户使用其关联的企业
-            elif hasattr(request.user, 'enterprise') and request.user.enterprise:
-                request.enterprise = request.user.enterprise
-            # 独立用户没有企业上下文
-            else:
-                request.enterprise = None
-        else:
-            request.enterprise = None
-        
-        return None
\ No newline at end of file
+        """处理请求，设置当前企业上下文（首次访问request.enterprise时才解析）"""
+        request.enterprise = SimpleLazyObject(lambda: resolve_enterprise(request))
+        return None
+
+
+class ActivityMiddleware(MiddlewareMixin):
+    """记录登录用户的最后活跃时间（节流并批量写入，见 JYXT/core/activity.py）"""
+
+    def process_response(self, request, response):
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            activity.touch(user.pk)
+        activity.flush_if_due()
+        return response
@@ -0,0 +1,197 @@
+# JYXT/core/pagination.py
+"""键集（游标）分页
+
+偏移分页（OFFSET n）需要数据库先扫描并丢弃前n行，越往后翻页越慢，每页还要额外执行 COUNT(*)。
+键集分页记录当前页最后一行的排序键，下一页直接查询"排序键大于该值"的行，
+配合 (企业, 排序字段, id) 上的索引，任意一页的代价都与第一页相同。
+
+排序字段必须非空，且最后一个字段唯一（通常为id），保证排序稳定；
+字段名前加 '-' 表示降序。总数统计可以关闭（paginate_count = False）。
+"""
+import base64
+import binascii
+import datetime
+import json
+from collections.abc import Sequence
+from functools import cached_property, reduce
+from operator import or_
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import Http404
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class _CursorEncoder(DjangoJSONEncoder):
+    """日期时间保留完整的微秒精度（DjangoJSONEncoder 会截断到毫秒，导致游标无法越过同一毫秒内的行）"""
+
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super().default(o)
+
+
+class InvalidCursor(Exception):
+    """游标无法解析"""
+
+
+class KeysetPage(Sequence):
+    """键集分页的一页，接口与 django.core.paginator.Page 的常用部分保持一致"""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f'<KeysetPage {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if not self._has_next:
+            return ''
+        return self.paginator.encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if not self._has_previous:
+            return ''
+        return self.paginator.encode_cursor(PREVIOUS, self.object_list[0])
+
+
+class KeysetPaginator:
+    """键集分页器
+
+    paginator = KeysetPaginator(queryset, 20, ordering=('created_at', 'id'))
+    page = paginator.page(request.GET.get('cursor'))
+    """
+
+    def __init__(self, queryset, per_page, ordering=('id',), count=True):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.count_enabled = count
+
+    @cached_property
+    def count(self):
+        """总行数（关闭统计时为None）"""
+        if not self.count_enabled:
+            return None
+        return self.queryset.order_by().count()
+
+    @staticmethod
+    def _field_name(field):
+        return field.lstrip('-')
+
+    def _values(self, obj):
+        # 模型实例，或 values() 查询集返回的字典
+        if isinstance(obj, dict):
+            return [obj[self._field_name(field)] for field in self.ordering]
+        return [getattr(obj, self._field_name(field)) for field in self.ordering]
+
+    def encode_cursor(self, direction, obj):
+        payload = json.dumps([direction, self._values(obj)], cls=_CursorEncoder, separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """解析游标，返回 (方向, 排序键值列表)"""
+        try:
+            payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(payload)
+        except (ValueError, TypeError, binascii.Error):
+            raise InvalidCursor(cursor)
+        if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor(cursor)
+        return direction, [self._to_python(field, value) for field, value in zip(self.ordering, values)]
+
+    def _to_python(self, field, value):
+        # 模型字段按字段类型还原（如日期时间）；注解字段保持JSON中的值
+        try:
+            model_field = self.queryset.model._meta.get_field(self._field_name(field))
+        except FieldDoesNotExist:
+            return value
+        try:
+            return model_field.to_python(value)
+        except ValidationError:
+            raise InvalidCursor(value)
+
+    def _after(self, values, reverse=False):
+        """排序键在 values 之后（reverse为True时为之前）的行的查询条件
+
+        (a, b) > (x, y) 展开为 a > x OR (a = x AND b > y)，各数据库都能使用索引。
+        """
+        conditions = []
+        for i, field in enumerate(self.ordering):
+            descending = field.startswith('-') != reverse
+            name = self._field_name(field)
+            equal = {self._field_name(f): v for f, v in zip(self.ordering[:i], values[:i])}
+            conditions.append(Q(**equal, **{f'{name}__{"lt" if descending else "gt"}': values[i]}))
+        return reduce(or_, conditions)
+
+    def _order_by(self, reverse=False):
+        return [
+            self._field_name(field) if field.startswith('-') == reverse else f'-{self._field_name(field)}'
+            for field in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        """返回游标指向的一页；游标为空时返回第一页"""
+        if not cursor:
+            rows = list(self.queryset.order_by(*self._order_by())[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page, False)
+
+        direction, values = self.decode_cursor(cursor)
+        if direction == NEXT:
+            queryset = self.queryset.filter(self._after(values)).order_by(*self._order_by())
+            rows = list(queryset[:self.per_page + 1])
+            return KeysetPage(rows[:self.per_page], self, len(rows) > self.per_page, True)
+
+        # 向前翻页：反向排序取上一页的行，再恢复正常顺序
+        queryset = self.queryset.filter(self._after(values, reverse=True)).order_by(*self._order_by(reverse=True))
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        return KeysetPage(rows[:self.per_page][::-1], self, True, has_previous)
+
+
+class KeysetPaginationMixin:
+    """列表视图使用键集分页（替代 ListView 的偏移分页）
+
+    模板中仍使用 page_obj / is_paginated，翻页链接使用 page_obj.next_cursor / previous_cursor。
+    """
+    # 排序字段，最后一个字段必须唯一
+    keyset_ordering = ('created_at', 'id')
+    # 是否统计总数（大表可关闭以省去 COUNT(*)）
+    paginate_count = True
+    cursor_kwarg = 'cursor'
+
+    def get_keyset_ordering(self):
+        return self.keyset_ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, ordering=self.get_keyset_ordering(), count=self.paginate_count
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404('无效的分页参数')
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -1,6 +1,8 @@
 # JYXT/core/permissions.py
 from django.contrib.auth.mixins import UserPassesTestMixin
 
+from . import authz
+
 class SuperUserRequiredMixin(UserPassesTestMixin):
     """需要系统管理员权限（Django的is_superuser）"""
     
@@ -18,19 +20,13 @@ class SuperUserRequiredMixin(UserPassesTestMixin):
             return redirect('accounts:login')
 
 class EnterpriseAdminRequiredMixin(UserPassesTestMixin):
-    """需要企业管理员权限"""
+    """需要当前企业的企业管理员权限（系统管理员有所有权限）
+    
+    角色由 authz 解析并缓存在session中，已缓存时不查询数据库。
+    """
     
     def test_func(self):
-        user = self.request.user
-        if not user.is_authenticated:
-            return False
-        
-        # 系统管理员有所有权限
-        if user.is_superuser:
-            return True
-        
-        # 企业管理员需要有企业关联
-        return user.is_authenticated and user.is_enterprise_admin
+        return authz.is_enterprise_admin(self.request)
     
     def handle_no_permission(self):
         from django.contrib import messages
@@ -46,7 +42,7 @@ class EnterpriseRequiredMixin(UserPassesTestMixin):
     """需要企业上下文"""
     
     def test_func(self):
-        return hasattr(self.request, 'enterprise') and self.request.enterprise is not None
+        return bool(getattr(self.request, 'enterprise', None))
     
     def handle_no_permission(self):
         from django.contrib import messages
@@ -56,13 +52,18 @@ class EnterpriseRequiredMixin(UserPassesTestMixin):
         return redirect('enterprises:select_enterprise')
 
 class AppAdminRequiredMixin(UserPassesTestMixin):
-    """需要应用管理员权限"""
+    """需要应用管理员权限
     
-    def __init__(self, app_code=None, *args, **kwargs):
-        self.app_code = app_code
-        super().__init__(*args, **kwargs)
+    当前企业订阅了该应用，且在应用的权限矩阵中拥有管理员角色（如职业技能认定中的管理机构）。
+    视图设置 app_code，可用 app_admin_roles 限定角色（默认为应用声明的任一管理员角色）。
+    """
+    app_code = None
+    app_admin_roles = None
     
     def test_func(self):
+        from .app_permissions import has_app_role
+        from .subscriptions import get_active_app_codes
+        
         user = self.request.user
         if not user.is_authenticated:
             return False
@@ -71,20 +72,17 @@ class AppAdminRequiredMixin(UserPassesTestMixin):
         if user.is_superuser:
             return True
         
-        # 检查用户是否有特定应用的管理权限
-        # 这里可以根据应用特定逻辑来判断
-        if self.app_code == 'skill_assessment':
-            # 例如，职业技能等级认定应用中，管理机构有管理权限
-            enterprise = getattr(self.request, 'enterprise', None)
-            if enterprise:
-                from enterprises.models import EnterpriseAppProfile
-                try:
-                    profile = EnterpriseAppProfile.objects.get(
-                        enterprise=enterprise,
-                        app_code=self.app_code
-                    )
-                    return profile.org_type == 'management'
-                except EnterpriseAppProfile.DoesNotExist:
-                    return False
+        enterprise = getattr(self.request, 'enterprise', None)
+        if not enterprise or self.app_code not in get_active_app_codes(enterprise.pk):
+            return False
+        return has_app_role(enterprise, self.app_code, self.app_admin_roles)
+    
+    def handle_no_permission(self):
+        from django.contrib import messages
+        from django.shortcuts import redirect
         
-        return False
\ No newline at end of file
+        if self.request.user.is_authenticated:
+            messages.error(self.request, "需要应用管理员权限才能访问此页面")
+            return redirect('dashboard')
+        else:
+            return redirect('accounts:login')
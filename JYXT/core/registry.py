@@ -1,35 +1,166 @@
 # JYXT/core/registry.py
+"""业务应用注册表
+
+业务应用有两种声明方式：
+- INSTALLED_APPS 中的 Django 应用配置类设置 business_app 属性，值为业务应用配置类的导入路径；
+- 独立安装包在 jyxt.apps 入口点组中声明业务应用配置类（对应的 Django 应用仍需加入 INSTALLED_APPS）。
+
+注册表在第一次访问时才发现并导入业务应用配置，进程启动时不导入任何业务应用模块；
+应用配置中的模型以 'app_label.ModelName' 字符串声明，第一次使用时才通过 Django 应用注册表解析。
+新增应用只需编写应用配置类并声明 business_app，无需修改注册表。
+"""
+import logging
+import threading
+from dataclasses import dataclass
+from importlib.metadata import entry_points
+
+from django.apps import apps as django_apps
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+# 第三方业务应用的入口点组名
+ENTRY_POINT_GROUP = 'jyxt.apps'
+
+
+@dataclass(frozen=True)
+class AdminRole:
+    """应用管理员角色"""
+    code: str
+    name: str
+
+
+@dataclass(frozen=True)
+class AppPermission:
+    """应用权限，codename 为 'app_label.codename'"""
+    codename: str
+    name: str
+
+
 class AppRegistry:
     def __init__(self):
         self._apps = {}
-    
-    def register(self, app_code, config_class):
-        """注册应用"""
-        self._apps[app_code] = config_class
-    
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    def register(self, config_class):
+        """注册应用（同一应用代码只能对应一个配置类）"""
+        with self._lock:
+            registered = self._apps.get(config_class.code)
+            if registered is not None and registered is not config_class:
+                raise ImproperlyConfigured(
+                    f'应用代码"{config_class.code}"重复注册：{registered.__qualname__}、{config_class.__qualname__}'
+                )
+            self._apps[config_class.code] = config_class
+        return config_class
+
+    def _discover(self):
+        """发现业务应用配置类：INSTALLED_APPS 中的 business_app 属性和 jyxt.apps 入口点"""
+        for app_config in django_apps.get_app_configs():
+            path = getattr(app_config, 'business_app', None)
+            if path:
+                yield import_string(path)
+        for entry_point in entry_points(group=ENTRY_POINT_GROUP):
+            try:
+                yield entry_point.load()
+            except Exception:
+                # 第三方应用加载失败不影响其他应用
+                logger.exception('业务应用入口点"%s"加载失败', entry_point.name)
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            django_apps.check_apps_ready()
+            for config_class in self._discover():
+                self.register(config_class)
+            self._loaded = True
+
     def get_app_config(self, app_code):
         """获取应用配置"""
+        self._ensure_loaded()
         return self._apps.get(app_code)
-    
+
     def get_all_apps(self):
         """获取所有注册的应用"""
+        self._ensure_loaded()
         return self._apps.items()
-    
+
     def get_available_apps(self, enterprise=None):
-        """获取可用的应用"""
-        # 简化版本，后续可以添加企业订阅检查
-        return self._apps
+        """获取企业可用的应用：已订阅且订阅有效、未过期（订阅信息按企业缓存）"""
+        from .subscriptions import get_active_app_codes
+
+        if not enterprise:
+            return {}
+        self._ensure_loaded()
+        app_codes = get_active_app_codes(enterprise.pk)
+        return {code: config for code, config in self._apps.items() if code in app_codes}
+
 
 # 全局应用注册表
 app_registry = AppRegistry()
 
+
 class BaseAppConfig:
-    """应用配置基类"""
-    name = "未命名应用"
-    code = "unknown"
-    description = "应用描述"
-    version = "1.0.0"
-    models = []
-    menu_items = []
-    permissions = []
-    settings = {}
\ No newline at end of file
+    """应用配置基类
+
+    模型一律以 'app_label.ModelName' 字符串声明，通过 get_*_model() 在使用时解析，
+    应用配置模块本身不导入任何模型。
+    """
+    name: str = "未命名应用"
+    code: str = "unknown"
+    description: str = "应用描述"
+    version: str = "1.0.0"
+    # 企业扩展信息模型、应用配置模型
+    enterprise_profile_model: str | None = None
+    config_model: str | None = None
+    # 应用的其他模型
+    models: list[str] = []
+    # 应用管理员角色：[(角色代码, 角色名称)]
+    admin_roles: list[tuple[str, str]] = []
+    # 企业扩展信息模型上记录企业所属管理员角色（角色代码）的字段
+    admin_role_field: str | None = None
+    menu_items: list[dict] = []
+    # 权限定义：[('app_label.codename', 权限名称)]
+    permissions: list[tuple[str, str]] = []
+    settings: dict = {}
+
+    @staticmethod
+    def _resolve_model(label):
+        return django_apps.get_model(label) if label else None
+
+    @classmethod
+    def get_enterprise_profile_model(cls):
+        """企业扩展信息模型（未声明时为None）"""
+        return cls._resolve_model(cls.enterprise_profile_model)
+
+    @classmethod
+    def get_config_model(cls):
+        """应用配置模型（未声明时为None）"""
+        return cls._resolve_model(cls.config_model)
+
+    @classmethod
+    def get_models(cls):
+        """应用的全部模型（扩展信息模型、配置模型及 models 中声明的模型）"""
+        labels = [cls.enterprise_profile_model, cls.config_model, *cls.models]
+        return [django_apps.get_model(label) for label in dict.fromkeys(labels) if label]
+
+    @classmethod
+    def get_admin_roles(cls) -> list[AdminRole]:
+        return [AdminRole(code, name) for code, name in cls.admin_roles]
+
+    @classmethod
+    def get_permissions(cls) -> list[AppPermission]:
+        return [AppPermission(codename, name) for codename, name in cls.permissions]
+
+    @classmethod
+    def get_menu(cls):
+        """编译后的菜单（URL已反向解析），每个应用只编译一次"""
+        if '_compiled_menu' not in cls.__dict__:
+            from .menus import compile_menu
+
+            cls._compiled_menu = compile_menu(cls.menu_items)
+        return cls._compiled_menu
@@ -0,0 +1,57 @@
+# JYXT/core/signals.py
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from accounts.models import User
+from enterprises.models import Department, Enterprise, EnterpriseSubscription
+from staff.models import Staff, StaffRole
+from . import authz, menus, subscriptions, tenant
+
+
+@receiver(post_save, sender=Staff)
+@receiver(post_delete, sender=Staff)
+def invalidate_staff_tenant_cache(sender, instance, **kwargs):
+    """员工记录变更（入职、离职、调动企业）时，使该用户的企业解析缓存失效"""
+    tenant.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=StaffRole)
+@receiver(post_delete, sender=StaffRole)
+def invalidate_staff_role_cache(sender, instance, **kwargs):
+    """员工角色变更时，使该用户的企业内角色缓存失效"""
+    if StaffRole.staff.is_cached(instance):
+        user_id = instance.staff.user_id
+    else:
+        user_id = Staff.objects.filter(pk=instance.staff_id).values_list('user_id', flat=True).first()
+    if user_id:
+        authz.invalidate_user(user_id)
+
+
+@receiver(post_save, sender=Enterprise)
+@receiver(post_delete, sender=Enterprise)
+def invalidate_enterprise_tenant_cache(sender, instance, **kwargs):
+    """企业信息变更时，使缓存的企业对象失效"""
+    tenant.invalidate_enterprises()
+
+
+@receiver(post_delete, sender=Department)
+def invalidate_department_tenant_cache(sender, instance, **kwargs):
+    """部门删除时（员工的部门被置空），使该企业员工会话中的在职企业列表失效；改名和移动在 Department.save 中处理"""
+    tenant.invalidate_departments(instance.enterprise_id)
+
+
+@receiver(post_save, sender=EnterpriseSubscription)
+@receiver(post_delete, sender=EnterpriseSubscription)
+def invalidate_subscription_cache(sender, instance, **kwargs):
+    """企业订阅变更时，使应用订阅缓存失效"""
+    subscriptions.invalidate()
+
+
+@receiver(m2m_changed, sender=User.user_permissions.through)
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=Group.permissions.through)
+def invalidate_permission_cache(sender, action, **kwargs):
+    """用户权限、用户组或用户组权限变更时，使缓存的用户权限集合失效"""
+    if action.startswith('post_'):
+        menus.invalidate_permissions()
@@ -0,0 +1,75 @@
+# JYXT/core/subscriptions.py
+"""企业应用订阅缓存
+
+侧边栏菜单和应用访问检查在每个页面都会用到企业订阅信息，这里按企业、按用户缓存有效订阅的应用代码：
+- 企业：get_active_app_codes(企业ID)，用于按企业显示可用应用；
+- 用户：get_user_app_codes(用户)，用户所有在职企业订阅的应用，一次关联查询得到。
+
+订阅保存或删除时递增全局版本号使缓存失效；用户的在职企业变化时，
+沿用租户解析的用户版本号（员工记录信号中递增）。缓存有效期不超过最早的订阅过期时间，
+订阅到期后无需任何操作即自动失效。
+"""
+from django.core.cache import cache
+from django.utils import timezone
+
+from .db_router import read_from_primary
+from .tenant import _USER_VERSION_KEY
+from .versions import bump_version, get_version
+
+# 缓存有效期（秒）
+SUBSCRIPTION_CACHE_TIMEOUT = 300
+
+_VERSION_KEY = 'subscriptions:version'
+_ENTERPRISE_KEY = 'subscriptions:{version}:enterprise:{enterprise_id}'
+_USER_KEY = 'subscriptions:{version}:user:{user_id}:{user_version}'
+
+
+def invalidate():
+    """使所有订阅缓存失效（订阅变更时调用）"""
+    bump_version(_VERSION_KEY)
+
+
+def _cache_timeout(rows):
+    """缓存有效期：不超过最早一个订阅的剩余有效时间"""
+    timeout = SUBSCRIPTION_CACHE_TIMEOUT
+    now = timezone.now()
+    for _, expires_at in rows:
+        if expires_at is not None:
+            timeout = min(timeout, max(int((expires_at - now).total_seconds()), 1))
+    return timeout
+
+
+def _cached_codes(key, queryset):
+    codes = cache.get(key)
+    if codes is None:
+        with read_from_primary():
+            rows = list(queryset.values_list('app_code', 'expires_at'))
+        codes = frozenset(app_code for app_code, _ in rows)
+        cache.set(key, codes, _cache_timeout(rows))
+    return codes
+
+
+def get_active_app_codes(enterprise_id):
+    """企业有效订阅（激活且未过期）的应用代码集合"""
+    from enterprises.models import EnterpriseSubscription
+
+    if not enterprise_id:
+        return frozenset()
+    key = _ENTERPRISE_KEY.format(version=get_version(_VERSION_KEY), enterprise_id=enterprise_id)
+    return _cached_codes(key, EnterpriseSubscription.objects.active().filter(enterprise_id=enterprise_id))
+
+
+def get_user_app_codes(user):
+    """用户所有在职企业有效订阅的应用代码集合"""
+    from enterprises.models import EnterpriseSubscription
+    from staff.models import Staff
+
+    key = _USER_KEY.format(
+        version=get_version(_VERSION_KEY),
+        user_id=user.pk,
+        user_version=get_version(_USER_VERSION_KEY.format(user_id=user.pk)),
+    )
+    return _cached_codes(key, EnterpriseSubscription.objects.active().filter(
+        enterprise__staff_members__user=user,
+        enterprise__staff_members__employment_status=Staff.EMPLOYED,
+    ))
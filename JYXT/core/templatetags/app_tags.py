@@ -1,6 +1,9 @@
 # JYXT/core/templatetags/app_tags.py
 from django import template
 from django.conf import settings
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.http import urlencode
 
 register = template.Library()
 
@@ -39,4 +42,62 @@ def with_system_name(value, separator=None):
     if not value:
         return system_name
     
-    return f"{value}{sep}{system_name}"
\ No newline at end of file
+    return f"{value}{sep}{system_name}"
+
+@register.simple_tag(takes_context=True)
+def query_replace(context, **kwargs):
+    """在当前请求的查询参数基础上替换部分参数，返回以'?'开头的查询字符串
+    
+    用法:
+        <a href="{% query_replace cursor=page_obj.next_cursor %}">下一页</a>
+        
+    参数值为空时从查询字符串中移除该参数
+    """
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        if value in (None, ''):
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return f'?{query.urlencode()}' if query else '?'
+
+
+@register.simple_tag(takes_context=True)
+def app_menu(context):
+    """输出当前企业可用应用的侧边栏菜单（菜单HTML片段已缓存）
+    
+    用法:
+        {% app_menu %}
+    """
+    from django.utils.safestring import mark_safe
+    from JYXT.core import authz
+    from JYXT.core.menus import render_app_menu
+    
+    request = context.get('request')
+    if request is None:
+        return ''
+    apps = context.get('available_apps') or {}
+    # 没有可用应用时不解析角色
+    roles = authz.get_roles(request) if apps else frozenset()
+    return mark_safe(render_app_menu(request.user, apps, roles))
+
+
+@register.simple_tag(takes_context=True)
+def dashboard_widgets(context, dashboard):
+    """渲染仪表盘的小部件（缓存的小部件直接渲染，延迟加载的小部件渲染占位）
+    
+    用法:
+        <div class="row">{% dashboard_widgets 'skill_assessment' %}</div>
+    """
+    from JYXT.core.widgets import render_dashboard, widget_registry
+    
+    request = context['request']
+    enterprise = getattr(request, 'enterprise', None)
+    fragments = render_dashboard(dashboard, request.user, enterprise)
+    has_lazy = any(widget.lazy for widget in widget_registry.for_dashboard(dashboard))
+    return render_to_string('includes/dashboard_widgets.html', {
+        'fragments': fragments,
+        'has_lazy': has_lazy and bool(fragments),
+        'dashboard': dashboard,
+        'widgets_url': f"{reverse('dashboard_widgets')}?{urlencode({'dashboard': dashboard})}",
+    })
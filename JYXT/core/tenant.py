@@ -0,0 +1,203 @@
+# JYXT/core/tenant.py
+"""租户（当前企业）解析
+
+统一处理"当前用户正在使用哪个企业"的判断逻辑：
+1. 优先使用session中的 current_enterprise_id（用户选择的企业），
+   普通用户必须在该企业有在职记录，系统管理员不做限制；
+2. session中没有有效企业时，普通用户回退到第一个在职企业。
+
+解析结果按 (用户, 所选企业) 缓存，员工记录或企业信息变更时通过版本号失效。
+
+用户的在职企业列表（名称、LOGO、部门、职位）在登录时计算一次并存入session，
+登录跳转、企业选择页和企业解析都复用这份列表，不再查询员工表；
+列表带有版本号，员工记录、企业信息或列表中企业的部门变更后下次使用时自动重新计算。
+
+异步视图使用 aget_enterprise() / aget_enterprise_choices()，不在事件循环中执行同步查询。
+"""
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+from .db_router import read_from_primary
+from .versions import aget_versions, bump_version, get_version, get_versions
+
+SESSION_KEY = 'current_enterprise_id'
+CHOICES_SESSION_KEY = 'employed_enterprises'
+
+# 缓存有效期（秒）
+TENANT_CACHE_TIMEOUT = 300
+
+# 缓存中表示"没有企业"的占位值（None无法与缓存未命中区分）
+_NO_ENTERPRISE = 0
+
+_USER_VERSION_KEY = 'tenant:user:{user_id}:version'
+_ENTERPRISE_VERSION_KEY = 'tenant:enterprise:version'
+_DEPARTMENT_VERSION_KEY = 'tenant:enterprise:{enterprise_id}:departments:version'
+_RESULT_KEY = 'tenant:{user_id}:{user_version}:{enterprise_version}:{requested}'
+
+
+def invalidate_user(user_id):
+    """使某个用户的企业解析缓存失效（员工记录变更时调用）"""
+    bump_version(_USER_VERSION_KEY.format(user_id=user_id))
+
+
+def invalidate_enterprises():
+    """使所有企业解析缓存失效（企业信息变更时调用）"""
+    bump_version(_ENTERPRISE_VERSION_KEY)
+
+
+def invalidate_departments(enterprise_id):
+    """使在职企业列表中该企业员工的部门名称失效（部门改名、移动或删除时调用，只影响该企业的员工）"""
+    bump_version(_DEPARTMENT_VERSION_KEY.format(enterprise_id=enterprise_id))
+
+
+def _query_choices(user):
+    """查询用户的在职企业（按任职记录创建顺序）"""
+    from enterprises.models import Enterprise
+
+    logo_storage = Enterprise._meta.get_field('logo').storage
+    return [_choice(row, logo_storage) for row in _choice_rows(user)]
+
+
+def _choice_rows(user):
+    from staff.models import Staff
+
+    # 结果存入session并以当前版本号标记，必须读主库（见 db_router）
+    return Staff.objects.using(DEFAULT_DB_ALIAS).filter(
+        user=user, employment_status=Staff.EMPLOYED, enterprise__isnull=False
+    ).order_by('id').values_list(
+        'enterprise_id', 'enterprise__name', 'enterprise__logo', 'department__name', 'position'
+    )
+
+
+def _choice(row, logo_storage):
+    enterprise_id, name, logo, department, position = row
+    return {
+        'id': enterprise_id,
+        'name': name,
+        'logo': logo_storage.url(logo) if logo else '',
+        'department': department or '',
+        'position': position,
+    }
+
+
+def _choices_version_keys(user, choices):
+    """在职企业列表依赖的版本号：用户、所有企业、列表中各企业的部门"""
+    return [
+        _USER_VERSION_KEY.format(user_id=user.pk),
+        _ENTERPRISE_VERSION_KEY,
+        *(_DEPARTMENT_VERSION_KEY.format(enterprise_id=choice['id']) for choice in choices),
+    ]
+
+
+def _choices_stamp(user, keys, versions):
+    return [user.pk, *(versions[key] for key in keys)]
+
+
+def get_enterprise_choices(request):
+    """当前用户的在职企业列表，缓存在session中
+
+    返回 [{'id', 'name', 'logo', 'department', 'position'}]，员工记录、企业信息或所在企业的部门变更后自动重新计算。
+    """
+    user = request.user
+    stored = request.session.get(CHOICES_SESSION_KEY)
+    if stored:
+        keys = _choices_version_keys(user, stored['enterprises'])
+        if stored.get('version') == _choices_stamp(user, keys, get_versions(keys)):
+            return stored['enterprises']
+    # 用户和企业的版本号在查询之前读取；部门版本号取决于查询到的企业
+    versions = get_versions(_choices_version_keys(user, []))
+    choices = _query_choices(user)
+    keys = _choices_version_keys(user, choices)
+    versions = {**get_versions(keys[len(versions):]), **versions}
+    request.session[CHOICES_SESSION_KEY] = {'version': _choices_stamp(user, keys, versions), 'enterprises': choices}
+    return choices
+
+
+async def aget_enterprise_choices(request, user=None):
+    """get_enterprise_choices 的异步版本（异步视图中使用，user 为已加载的用户）"""
+    from enterprises.models import Enterprise
+
+    user = user or await request.auser()
+    stored = await request.session.aget(CHOICES_SESSION_KEY)
+    if stored:
+        keys = _choices_version_keys(user, stored['enterprises'])
+        if stored.get('version') == _choices_stamp(user, keys, await aget_versions(keys)):
+            return stored['enterprises']
+    versions = await aget_versions(_choices_version_keys(user, []))
+    logo_storage = Enterprise._meta.get_field('logo').storage
+    choices = [_choice(row, logo_storage) async for row in _choice_rows(user)]
+    keys = _choices_version_keys(user, choices)
+    versions = {**await aget_versions(keys[len(versions):]), **versions}
+    await request.session.aset(
+        CHOICES_SESSION_KEY, {'version': _choices_stamp(user, keys, versions), 'enterprises': choices}
+    )
+    return choices
+
+
+def _query_enterprise(request, requested_id):
+    """解析企业
+
+    普通用户：在职企业中优先返回session所选企业，否则返回第一个在职企业（在职企业列表取自session）。
+    系统管理员：只返回session所选企业。
+    """
+    from enterprises.models import Enterprise
+
+    if request.user.is_superuser:
+        if not requested_id:
+            return None
+        return Enterprise.objects.filter(id=requested_id).first()
+
+    enterprise_ids = [choice['id'] for choice in get_enterprise_choices(request)]
+    if not enterprise_ids:
+        return None
+    enterprise_id = requested_id if requested_id in enterprise_ids else enterprise_ids[0]
+    return Enterprise.objects.filter(id=enterprise_id).first()
+
+
+def resolve_enterprise(request):
+    """解析当前请求的企业，session中的无效企业ID会被清除"""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+
+    session = request.session
+    requested_id = session.get(SESSION_KEY)
+    try:
+        requested_id = int(requested_id) if requested_id else None
+    except (TypeError, ValueError):
+        requested_id = None
+
+    key = _RESULT_KEY.format(
+        user_id=user.pk,
+        user_version=get_version(_USER_VERSION_KEY.format(user_id=user.pk)),
+        enterprise_version=get_version(_ENTERPRISE_VERSION_KEY),
+        requested=requested_id or '-',
+    )
+    enterprise = cache.get(key)
+    if enterprise is None:
+        with read_from_primary():
+            enterprise = _query_enterprise(request, requested_id) or _NO_ENTERPRISE
+        cache.set(key, enterprise, TENANT_CACHE_TIMEOUT)
+    if enterprise == _NO_ENTERPRISE:
+        enterprise = None
+
+    # session中的企业不存在或用户已不在该企业任职，清除session
+    if requested_id and (enterprise is None or enterprise.id != requested_id):
+        session.pop(SESSION_KEY, None)
+
+    return enterprise
+
+
+async def aget_enterprise(request):
+    """异步视图中获取当前企业
+
+    request.enterprise 是延迟解析的同步对象，这里在线程中完成解析（结果缓存在请求上），
+    之后异步视图可以直接使用。
+    """
+    enterprise = getattr(request, 'enterprise', None)
+    if enterprise is None:
+        return None
+    if not await sync_to_async(bool)(enterprise):
+        return None
+    return enterprise
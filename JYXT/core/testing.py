@@ -0,0 +1,77 @@
+# JYXT/core/testing.py
+"""测试夹具
+
+各应用测试共用的企业、用户、员工创建方法，避免在每个测试类中重复同样的数据：
+
+    class StaffListTests(TenantTestMixin, TestCase):
+        @classmethod
+        def setUpTestData(cls):
+            cls.enterprise = cls.create_enterprise()
+            cls.admin = cls.create_admin(cls.enterprise)
+
+        def setUp(self):
+            self.login(self.admin, self.enterprise)
+"""
+from itertools import count
+
+from django.contrib.sessions.backends.cache import SessionStore
+from django.test import RequestFactory
+
+from accounts.models import User
+from enterprises.models import Enterprise
+from staff.models import Staff, StaffRole
+from .tenant import SESSION_KEY
+
+# 测试用户的默认用户名（手机号）和密码
+DEFAULT_USERNAME = '13800000000'
+DEFAULT_PASSWORD = '000000'
+
+# 测试企业的统一社会信用代码序号（代码唯一）
+_credit_codes = count(1)
+
+
+class TenantTestMixin:
+    """企业、用户、员工测试夹具（与 TestCase 一起使用）"""
+
+    @staticmethod
+    def create_enterprise(name='企业A', code=None):
+        """创建企业，未指定统一社会信用代码时按序号生成"""
+        code = code or f'T{next(_credit_codes):017d}'
+        return Enterprise.objects.create(name=name, unified_social_credit_code=code)
+
+    @staticmethod
+    def create_user(username=DEFAULT_USERNAME, password=DEFAULT_PASSWORD, **kwargs):
+        return User.objects.create_user(username=username, password=password, **kwargs)
+
+    @staticmethod
+    def create_staff(user, enterprise, role_type=None, **kwargs):
+        """创建员工记录，指定 role_type 时同时创建员工角色"""
+        staff = Staff.objects.create(user=user, enterprise=enterprise, **kwargs)
+        if role_type is not None:
+            StaffRole.objects.create(staff=staff, role_type=role_type)
+        return staff
+
+    @classmethod
+    def create_admin(cls, enterprise, username='admin', password='admin', **kwargs):
+        """创建企业管理员：用户类型和本企业的员工角色均为企业管理员"""
+        user = cls.create_user(username, password, user_type=User.ENTERPRISE_ADMIN, **kwargs)
+        cls.create_staff(user, enterprise, role_type=StaffRole.ENTERPRISE_ADMIN)
+        return user
+
+    def login(self, user, enterprise=None):
+        """测试客户端登录，指定企业时写入会话中的当前企业"""
+        self.client.force_login(user)
+        if enterprise is not None:
+            session = self.client.session
+            session[SESSION_KEY] = enterprise.pk
+            session.save()
+
+    @staticmethod
+    def make_request(user, method='get', enterprise_id=None):
+        """带用户和会话的请求，用于直接测试中间件、租户解析等"""
+        request = getattr(RequestFactory(), method)('/')
+        request.user = user
+        request.session = SessionStore()
+        if enterprise_id:
+            request.session[SESSION_KEY] = enterprise_id
+        return request
@@ -0,0 +1,61 @@
+# JYXT/core/versions.py
+"""缓存版本号
+
+缓存的结果以版本号作为键的一部分，数据变更时递增版本号，旧结果不再被读取（等待过期）：
+
+    key = f'subscriptions:{get_version(VERSION_KEY)}:enterprise:{enterprise_id}'
+    ...
+    bump_version(VERSION_KEY)
+
+版本号永不过期，但仍可能被缓存淘汰（LocMem 剔除、Redis LRU、重启）而结果键仍然存在。
+版本号不存在时以当前时间（纳秒）作为起始值，不会回到已经用过的版本号，淘汰前的旧结果不会再被命中。
+"""
+import time
+
+from django.core.cache import cache
+
+
+def get_version(key):
+    """当前版本号（不存在时以当前时间初始化）"""
+    version = cache.get(key)
+    if version is None:
+        initial = time.time_ns()
+        cache.add(key, initial, None)
+        version = cache.get(key, initial)
+    return version
+
+
+async def aget_version(key):
+    """get_version 的异步版本"""
+    version = await cache.aget(key)
+    if version is None:
+        initial = time.time_ns()
+        await cache.aadd(key, initial, None)
+        version = await cache.aget(key, initial)
+    return version
+
+
+def get_versions(keys):
+    """一次读取多个版本号 {键: 版本号}（不存在的逐个初始化）"""
+    versions = cache.get_many(keys) if keys else {}
+    for key in keys:
+        if key not in versions:
+            versions[key] = get_version(key)
+    return versions
+
+
+async def aget_versions(keys):
+    """get_versions 的异步版本"""
+    versions = await cache.aget_many(keys) if keys else {}
+    for key in keys:
+        if key not in versions:
+            versions[key] = await aget_version(key)
+    return versions
+
+
+def bump_version(key):
+    """递增版本号，使以旧版本号缓存的结果失效"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
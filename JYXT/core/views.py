@@ -1,18 +1,34 @@
 # JYXT/core/views.py
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.contrib.auth.views import redirect_to_login
 from django.contrib import messages
 from django.shortcuts import redirect
 
+from . import authz
+
 class BaseView(LoginRequiredMixin):
     """基础视图类"""
     pass
 
+class AsyncLoginRequiredMixin:
+    """异步视图的登录检查
+    
+    异步视图中不能访问延迟加载的 request.user（会在事件循环中查询数据库），
+    这里先通过 auser() 加载用户并替换到请求上，视图中可直接使用 request.user。
+    """
+    
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        return await super().dispatch(request, *args, **kwargs)
+
 class EnterpriseRequiredMixin(UserPassesTestMixin):
     """需要企业上下文的视图"""
     
     def test_func(self):
-        return hasattr(self.request, 'enterprise') and self.request.enterprise is not None
+        return bool(getattr(self.request, 'enterprise', None))
     
     def handle_no_permission(self):
         messages.error(self.request, "请先选择或创建企业")
@@ -32,7 +48,7 @@ class EnterpriseAdminRequiredMixin(UserPassesTestMixin):
     """需要企业管理员权限的视图"""
     
     def test_func(self):
-        return self.request.user.is_authenticated and getattr(self.request.user, 'is_enterprise_admin', False)
+        return authz.is_enterprise_admin(self.request)
     
     def handle_no_permission(self):
         messages.error(self.request, "需要管理员权限")
@@ -0,0 +1,233 @@
+# JYXT/core/widgets.py
+"""仪表盘小部件
+
+各应用在自己的 widgets.py 中声明小部件（启动时自动发现），仪表盘模板用
+{% dashboard_widgets '仪表盘名称' %} 渲染：
+
+    @widget_registry.register
+    class SkillStandardCountWidget(CountWidget):
+        code = 'skill_assessment.standards'
+        dashboard = 'skill_assessment'
+        title = '技能标准'
+        depends_on = ['skill_assessment.SkillStandard']
+
+        def get_queryset(self, enterprise):
+            return SkillStandard.objects.filter(enterprise=enterprise)
+
+- 缓存：计算结果按 (小部件, 企业) 缓存 cache_timeout 秒，计算时读主库（即使仪表盘视图从副本读取）；
+- 失效：depends_on 中的模型保存或删除时，按记录所属企业递增版本号，只使该企业的相关小部件失效；
+- 延迟加载：lazy = True 的小部件先渲染占位，页面加载后由浏览器请求异步片段接口
+  （/dashboard/widgets/?dashboard=<名称>，单个小部件为 /dashboard/widgets/<code>/），
+  各小部件的统计并发执行，耗时的统计不阻塞页面。
+
+每个小部件同时提供异步接口（aget_data / arender），CountWidget 使用异步ORM（acount）统计；
+自定义小部件只实现 compute 时，异步接口在线程中调用它。
+"""
+import asyncio
+import hashlib
+
+from asgiref.sync import sync_to_async
+
+from django.apps import apps as django_apps
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.template.loader import render_to_string
+from django.urls import NoReverseMatch, reverse
+from django.utils.module_loading import autodiscover_modules
+
+from .db_router import read_from_primary
+from .versions import aget_versions, bump_version, get_versions
+
+# 默认缓存有效期（秒）
+WIDGET_CACHE_TIMEOUT = 300
+
+_VERSION_KEY = 'widget:version:{model}:{enterprise_id}'
+_DATA_KEY = 'widget:{code}:{enterprise_id}:{versions}'
+
+
+def invalidate(model_label, enterprise_id):
+    """使某个企业依赖该模型的小部件缓存失效（model_label 为 'app_label.ModelName'）"""
+    bump_version(_VERSION_KEY.format(model=model_label.lower(), enterprise_id=enterprise_id))
+
+
+class DashboardWidget:
+    """仪表盘小部件基类"""
+    # 唯一代码，建议使用 '应用.名称'
+    code = ''
+    # 所在的仪表盘
+    dashboard = ''
+    title = ''
+    template_name = ''
+    # 显示顺序
+    order = 0
+    # 依赖的应用（订阅该应用的企业才显示），为空时所有企业都显示
+    app_code = ''
+    cache_timeout = WIDGET_CACHE_TIMEOUT
+    # 依赖的模型（'app_label.ModelName'），这些模型的记录须有 enterprise 外键
+    depends_on = []
+    # 是否通过片段接口延迟加载
+    lazy = False
+
+    def compute(self, enterprise):
+        """计算小部件数据（返回可缓存的字典）"""
+        raise NotImplementedError
+
+    def is_visible(self, user, enterprise):
+        if not self.app_code or user.is_superuser:
+            return True
+        from .subscriptions import get_active_app_codes
+
+        return self.app_code in get_active_app_codes(enterprise.pk)
+
+    async def acompute(self, enterprise):
+        """异步计算小部件数据（默认在线程中调用 compute）"""
+        return await sync_to_async(self.compute)(enterprise)
+
+    def _version_keys(self, enterprise):
+        return [
+            _VERSION_KEY.format(model=label.lower(), enterprise_id=enterprise.pk) for label in self.depends_on
+        ]
+
+    def _data_key(self, enterprise, version_keys, versions):
+        stamp = ','.join(str(versions.get(key, 0)) for key in version_keys)
+        return _DATA_KEY.format(
+            code=self.code,
+            enterprise_id=enterprise.pk,
+            versions=hashlib.sha1(stamp.encode()).hexdigest()[:16],
+        )
+
+    def _cache_key(self, enterprise):
+        version_keys = self._version_keys(enterprise)
+        versions = get_versions(version_keys)
+        return self._data_key(enterprise, version_keys, versions)
+
+    def get_data(self, enterprise):
+        """小部件数据（按企业缓存）"""
+        key = self._cache_key(enterprise)
+        data = cache.get(key)
+        if data is None:
+            with read_from_primary():
+                data = self.compute(enterprise)
+            cache.set(key, data, self.cache_timeout)
+        return data
+
+    async def aget_data(self, enterprise):
+        """get_data 的异步版本"""
+        version_keys = self._version_keys(enterprise)
+        versions = await aget_versions(version_keys)
+        key = self._data_key(enterprise, version_keys, versions)
+        data = await cache.aget(key)
+        if data is None:
+            with read_from_primary():
+                data = await self.acompute(enterprise)
+            await cache.aset(key, data, self.cache_timeout)
+        return data
+
+    def get_context(self, data):
+        return {'widget': self, **data}
+
+    def render(self, enterprise):
+        return render_to_string(self.template_name, self.get_context(self.get_data(enterprise)))
+
+    async def arender(self, enterprise):
+        return render_to_string(self.template_name, self.get_context(await self.aget_data(enterprise)))
+
+    def render_placeholder(self):
+        return render_to_string('includes/widgets/placeholder.html', {'widget': self})
+
+
+class CountWidget(DashboardWidget):
+    """显示一个统计数字的小部件（AdminLTE small-box）"""
+    template_name = 'includes/widgets/small_box.html'
+    icon = 'fas fa-chart-bar'
+    color = 'info'
+    # 详情页面的URL名称
+    url_name = ''
+
+    def get_queryset(self, enterprise):
+        raise NotImplementedError
+
+    def compute(self, enterprise):
+        return {'value': self.get_queryset(enterprise).count()}
+
+    async def acompute(self, enterprise):
+        # 重写 compute 的子类需同时重写 acompute
+        return {'value': await self.get_queryset(enterprise).acount()}
+
+    def get_context(self, data):
+        try:
+            url = reverse(self.url_name) if self.url_name else ''
+        except NoReverseMatch:
+            url = ''
+        return {'widget': self, 'url': url, **data}
+
+
+class WidgetRegistry:
+    """仪表盘小部件注册表"""
+
+    def __init__(self):
+        self._widgets = {}
+        self._connected = set()
+
+    def register(self, widget_class):
+        """注册小部件（可用作类装饰器）"""
+        self._widgets[widget_class.code] = widget_class()
+        return widget_class
+
+    def get(self, code):
+        return self._widgets.get(code)
+
+    def for_dashboard(self, dashboard):
+        widgets = [widget for widget in self._widgets.values() if widget.dashboard == dashboard]
+        return sorted(widgets, key=lambda widget: (widget.order, widget.code))
+
+    def connect_signals(self):
+        """为小部件依赖的模型连接缓存失效信号"""
+        for widget in self._widgets.values():
+            for label in widget.depends_on:
+                if label in self._connected:
+                    continue
+                model = django_apps.get_model(label)
+                post_save.connect(_invalidate_instance, sender=model, dispatch_uid=f'widgets:{label}:save')
+                post_delete.connect(_invalidate_instance, sender=model, dispatch_uid=f'widgets:{label}:delete')
+                self._connected.add(label)
+
+
+def _invalidate_instance(sender, instance, **kwargs):
+    enterprise_id = getattr(instance, 'enterprise_id', None)
+    if enterprise_id:
+        invalidate(sender._meta.label, enterprise_id)
+
+
+# 全局小部件注册表
+widget_registry = WidgetRegistry()
+
+
+def autodiscover():
+    """导入各应用的 widgets 模块并连接失效信号（CoreConfig.ready 中调用）"""
+    autodiscover_modules('widgets')
+    widget_registry.connect_signals()
+
+
+def render_dashboard(dashboard, user, enterprise):
+    """渲染仪表盘的全部小部件，返回HTML片段列表"""
+    if not enterprise:
+        return []
+    fragments = []
+    for widget in widget_registry.for_dashboard(dashboard):
+        if not widget.is_visible(user, enterprise):
+            continue
+        fragments.append(widget.render_placeholder() if widget.lazy else widget.render(enterprise))
+    return fragments
+
+
+async def arender_lazy_widgets(dashboard, user, enterprise):
+    """并发渲染仪表盘中延迟加载的小部件，返回 {小部件代码: HTML片段}"""
+    if not enterprise:
+        return {}
+    widgets = [widget for widget in widget_registry.for_dashboard(dashboard) if widget.lazy]
+    visible = await sync_to_async(
+        lambda: [widget for widget in widgets if widget.is_visible(user, enterprise)]
+    )()
+    fragments = await asyncio.gather(*(widget.arender(enterprise) for widget in visible))
+    return {widget.code: fragment for widget, fragment in zip(visible, fragments)}
@@ -2,6 +2,9 @@
 import os
 from pathlib import Path
 
+from JYXT.core.caches import caches_from_env
+from JYXT.core.database import databases_from_env
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = 'django-insecure-your-secret-key-here'  # 修改为随机密钥
@@ -34,9 +37,11 @@ MIDDLEWARE = [
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'JYXT.core.db_router.ReplicaRoutingMiddleware',  # 只读页面从副本读取（未配置副本时不起作用）
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'JYXT.core.middleware.TenantMiddleware',  # 确保路径正确
+    'JYXT.core.middleware.ActivityMiddleware',  # 记录用户最后活跃时间
 ]
 
 ROOT_URLCONF = 'JYXT.urls'
@@ -58,12 +63,18 @@ TEMPLATES = [
     },
 ]
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-    }
-}
+# 数据库：由环境变量 DATABASE_URL / DATABASE_REPLICA_URL 等配置，见 JYXT/core/database.py
+DATABASES = databases_from_env(os.environ, BASE_DIR)
+
+# 读写分离：配置了副本时只读页面从副本读取
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['JYXT.core.db_router.PrimaryReplicaRouter']
+# 会话写请求之后读主库的秒数（读己之写）
+DATABASE_REPLICA_STICKY_SECONDS = int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', 10))
+
+# 缓存：由环境变量 CACHE_URL 配置，见 JYXT/core/caches.py
+# 默认为进程内缓存，仅用于开发和测试；多进程部署必须使用 Redis 或 Memcached
+CACHES = caches_from_env(os.environ)
 
 # 认证设置
 AUTH_USER_MODEL = 'accounts.User'
@@ -10,7 +10,11 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('', RedirectView.as_view(url='/dashboard/')),
     path('dashboard/', views.DashboardView.as_view(), name='dashboard'),
+    path('dashboard/widgets/', views.DashboardWidgetsView.as_view(), name='dashboard_widgets'),
+    path('dashboard/widgets/<str:code>/', views.WidgetFragmentView.as_view(), name='dashboard_widget'),
+    path('autocomplete/<str:source>/', views.AutocompleteView.as_view(), name='autocomplete'),
     path('enterprise-dashboard/', views.EnterpriseDashboardView.as_view(), name='enterprise_dashboard'),
+    path('api/v1/', include('JYXT.api_urls')),
     path('accounts/', include('accounts.urls')),
     path('enterprises/', include('enterprises.urls')),
     path('staff/', include('staff.urls')),
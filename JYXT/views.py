@@ -1,87 +1,82 @@
 # JYXT/views.py
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse
+from django.views import View
 from django.views.generic import TemplateView
 from django.contrib.auth.decorators import login_required
 from django.utils.decorators import method_decorator
-from JYXT.core.views import BaseView, EnterpriseRequiredMixin
+from JYXT.core.autocomplete import autocomplete_registry
+from JYXT.core.tenant import aget_enterprise
+from JYXT.core.views import AsyncLoginRequiredMixin, BaseView, EnterpriseRequiredMixin
+from JYXT.core.widgets import arender_lazy_widgets, widget_registry
 
 @method_decorator(login_required, name='dispatch')
 class DashboardView(TemplateView):
     """系统仪表盘"""
     template_name = 'dashboard.html'
+    replica_reads = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        request = self.request
-        user = request.user
-        
-        # 优先使用session中存储的企业ID（用户选择的企业）
-        from enterprises.models import Enterprise
-        from staff.models import Staff
-        if 'current_enterprise_id' in request.session:
-            try:
-                # 验证用户是否在该企业有在职记录
-                staff = user.staff_members.get(
-                    enterprise_id=request.session['current_enterprise_id'],
-                    employment_status=Staff.EMPLOYED
-                )
-                # 如果验证通过，获取企业信息
-                current_enterprise = Enterprise.objects.get(id=request.session['current_enterprise_id'])
-                context['current_enterprise'] = current_enterprise
-            except (Staff.DoesNotExist, Enterprise.DoesNotExist):
-                # 如果session中的企业不存在或用户已不在该企业任职，清除session并回退到用户默认企业
-                if 'current_enterprise_id' in request.session:
-                    del request.session['current_enterprise_id']
-                pass
-        
-        # 如果session中没有有效的企业ID，再从用户对象获取默认在职企业
-        if 'current_enterprise' not in context or not context['current_enterprise']:
-            # 获取用户的在职企业
-            employed_staffs = user.staff_members.filter(employment_status=Staff.EMPLOYED)
-            if employed_staffs.exists():
-                # 选择第一个在职企业作为默认企业
-                context['current_enterprise'] = employed_staffs.first().enterprise
-            else:
-                context['current_enterprise'] = getattr(request, 'enterprise', None)
-        
+        # 当前企业由TenantMiddleware统一解析：优先session中选择的企业，否则为用户默认在职企业
+        context['current_enterprise'] = self.request.enterprise
         return context
 
 @method_decorator(login_required, name='dispatch')
 class EnterpriseDashboardView(EnterpriseRequiredMixin, TemplateView):
     """企业仪表盘"""
     template_name = 'enterprises/dashboard.html'
+    replica_reads = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        request = self.request
-        user = request.user
-        
-        # 优先使用session中存储的企业ID（用户选择的企业）
-        from enterprises.models import Enterprise
-        from staff.models import Staff
-        if 'current_enterprise_id' in request.session:
-            try:
-                # 验证用户是否在该企业有在职记录
-                staff = user.staff_members.get(
-                    enterprise_id=request.session['current_enterprise_id'],
-                    employment_status=Staff.EMPLOYED
-                )
-                # 如果验证通过，获取企业信息
-                current_enterprise = Enterprise.objects.get(id=request.session['current_enterprise_id'])
-                context['current_enterprise'] = current_enterprise
-            except (Staff.DoesNotExist, Enterprise.DoesNotExist):
-                # 如果session中的企业不存在或用户已不在该企业任职，清除session并回退到用户默认企业
-                if 'current_enterprise_id' in request.session:
-                    del request.session['current_enterprise_id']
-                pass
-        
-        # 如果session中没有有效的企业ID，再从用户对象获取默认在职企业
-        if 'current_enterprise' not in context or not context['current_enterprise']:
-            # 获取用户的在职企业
-            employed_staffs = user.staff_members.filter(employment_status=Staff.EMPLOYED)
-            if employed_staffs.exists():
-                # 选择第一个在职企业作为默认企业
-                context['current_enterprise'] = employed_staffs.first().enterprise
-            else:
-                context['current_enterprise'] = getattr(request, 'enterprise', None)
-        
-        return context
\ No newline at end of file
+        # 当前企业由TenantMiddleware统一解析：优先session中选择的企业，否则为用户默认在职企业
+        context['current_enterprise'] = self.request.enterprise
+        return context
+
+class WidgetFragmentView(AsyncLoginRequiredMixin, View):
+    """仪表盘小部件片段（异步视图）"""
+    replica_reads = True
+    
+    async def get(self, request, code):
+        widget = widget_registry.get(code)
+        enterprise = await aget_enterprise(request)
+        if widget is None or not enterprise:
+            raise Http404('小部件不存在')
+        if not await sync_to_async(widget.is_visible)(request.user, enterprise):
+            raise Http404('小部件不存在')
+        return HttpResponse(await widget.arender(enterprise))
+
+class DashboardWidgetsView(AsyncLoginRequiredMixin, View):
+    """仪表盘中全部延迟加载的小部件片段（异步视图，各小部件并发统计）
+    
+    返回 {小部件代码: HTML片段}，仪表盘页面加载后一次请求取回。
+    """
+    replica_reads = True
+    
+    async def get(self, request):
+        enterprise = await aget_enterprise(request)
+        fragments = await arender_lazy_widgets(request.GET.get('dashboard', ''), request.user, enterprise)
+        return JsonResponse(fragments)
+
+@method_decorator(login_required, name='dispatch')
+class AutocompleteView(View):
+    """表单选择框的自动补全接口
+    
+    GET ?q=关键词&page=页码，返回当前企业内前缀匹配的一页记录：
+    {'results': [{'id':, 'text':}], 'pagination': {'more': 是否还有下一页}}
+    """
+    replica_reads = True
+    
+    def get(self, request, source):
+        autocomplete_source = autocomplete_registry.get(source)
+        if autocomplete_source is None:
+            raise Http404('自动补全来源不存在')
+        enterprise = request.enterprise
+        if not enterprise or not autocomplete_source.has_permission(request):
+            return JsonResponse({'error': '您没有权限访问该数据'}, status=403)
+        try:
+            page = max(1, int(request.GET.get('page', 1)))
+        except ValueError:
+            page = 1
+        return JsonResponse(autocomplete_source.search(enterprise, request.GET.get('q', ''), page))
@@ -3,6 +3,7 @@ from django import forms
 from .models import User
 from staff.models import Staff, StaffRole
 from enterprises.models import Department
+from JYXT.core.autocomplete import AutocompleteModelChoiceField
 
 class UserForm(forms.ModelForm):
     """用户认证表单 - 只处理User模型中的认证相关字段"""
@@ -44,7 +45,8 @@ class UserCreateForm(forms.Form):
     work_phone = forms.CharField(max_length=20, required=False, label='办公电话')
     enterprise_phone = forms.CharField(max_length=20, required=True, label='手机号')
     enterprise_email = forms.EmailField(required=False, label='企业邮箱')
-    department = forms.ModelChoiceField(
+    department = AutocompleteModelChoiceField(
+        'enterprises.departments',
         queryset=Department.objects.filter(is_active=True).order_by('name'),
         required=True, 
         label='部门',
@@ -66,10 +68,10 @@ class UserCreateForm(forms.Form):
                 if choice[0] == 'enterprise_user'  # 只能创建企业用户
             ]
             
-            # 根据当前用户的企业过滤部门选项
-            if hasattr(self.request.user, 'staff') and self.request.user.staff and self.request.user.staff.enterprise:
+            # 根据当前企业过滤部门选项
+            if getattr(self.request, 'enterprise', None):
                 self.fields['department'].queryset = Department.objects.filter(
-                    enterprise=self.request.user.staff.enterprise, 
+                    enterprise=self.request.enterprise, 
                     is_active=True
                 ).order_by('name')
 
@@ -121,7 +123,8 @@ class ProfileForm(forms.Form):
     
     # Staff模型字段
     enterprise_phone = forms.CharField(max_length=20, required=False, label='手机号')
-    department = forms.ModelChoiceField(
+    department = AutocompleteModelChoiceField(
+        'enterprises.departments',
         queryset=Department.objects.filter(is_active=True).order_by('name'),
         required=False, 
         label='部门',
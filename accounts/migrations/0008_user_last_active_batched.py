@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_user_first_name_alter_user_last_name'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='last_active',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='最后活跃时间'),
+        ),
+    ]
@@ -1,7 +1,8 @@
 # accounts/models.py
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, router
+from django.db.models import Case, IntegerField, Value, When
+from django.utils.functional import cached_property
 
 class User(AbstractUser):
     """用户认证模型 - 存储个人基本信息和认证相关信息"""
@@ -32,13 +33,29 @@ class User(AbstractUser):
     
     # 系统认证字段
     email_verified = models.BooleanField('邮箱验证', default=False)
-    last_active = models.DateTimeField('最后活跃时间', auto_now=True)
+    # 由 ActivityMiddleware 节流后批量更新，完整保存用户时保留数据库中较新的值（见 save()）
+    last_active = models.DateTimeField('最后活跃时间', null=True, blank=True, editable=False)
     
     class Meta:
         db_table = 'accounts_user'
         verbose_name = '用户'
         verbose_name_plural = '用户管理'
     
+    def save(self, *args, **kwargs):
+        """保存用户：last_active 由 activity.flush() 以 update() 批量写入
+
+        完整保存（未指定 update_fields）前重新读取 last_active，保留较新的值，
+        避免用实例加载时的旧值覆盖 flush 写入的活跃时间；指定 update_fields 时只保存所列字段。
+        """
+        if self.pk is not None and not self._state.adding and kwargs.get('update_fields') is None:
+            using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+            stored = type(self)._base_manager.using(using).filter(pk=self.pk).values_list(
+                'last_active', flat=True
+            ).first()
+            if stored is not None and (self.last_active is None or stored > self.last_active):
+                self.last_active = stored
+        super().save(*args, **kwargs)
+    
     def __str__(self):
         if self.is_superuser:
             return f"{self.username} (系统管理员)"
@@ -47,8 +64,9 @@ class User(AbstractUser):
     @property
     def department(self):
         """获取用户的部门（从staff中）"""
-        if hasattr(self, 'staff') and self.staff and self.staff.department:
-            return self.staff.department.name
+        staff = self._active_staff
+        if staff and staff.department:
+            return staff.department.name
         return ''
         
     @property
@@ -72,65 +90,69 @@ class User(AbstractUser):
             # 这里可以根据独立用户的权限设置来决定
             return True
         
-        # 企业用户需要检查企业订阅
-        from enterprises.models import EnterpriseSubscription
-        from staff.models import Staff
-        
-        # 获取用户关联的所有企业
-        staff_members = Staff.objects.filter(user=self)
-        for staff in staff_members:
-            if staff.enterprise:
-                # 检查企业是否订阅了该应用
-                if EnterpriseSubscription.objects.filter(
-                    enterprise=staff.enterprise,
-                    app_code=app_code,
-                    status='active'
-                ).exists():
-                    return True
+        # 企业用户需要检查在职企业的有效订阅（一次关联查询，结果缓存）
+        from JYXT.core.subscriptions import get_user_app_codes
         
-        return False
+        return app_code in get_user_app_codes(self)
     
     # 以下是与staff应用关联的属性和方法
+    @cached_property
+    def _active_staff(self):
+        """解析用户的当前员工记录（优先在职记录），同时加载部门和企业
+
+        结果缓存在用户实例上，request.user在每个请求中都是新实例，
+        因此一个请求内只查询一次。员工记录变更后调用 clear_staff_cache() 失效。
+        """
+        from staff.models import Staff
+        
+        if self.pk is None:
+            return None
+        return self.staff_members.select_related('department', 'enterprise').annotate(
+            _employment_order=Case(
+                When(employment_status=Staff.EMPLOYED, then=Value(0)),
+                default=Value(1),
+                output_field=IntegerField(),
+            )
+        ).order_by('_employment_order', 'pk').first()
+    
+    def clear_staff_cache(self):
+        """清除缓存的员工记录"""
+        self.__dict__.pop('_active_staff', None)
+    
+    def refresh_from_db(self, *args, **kwargs):
+        self.clear_staff_cache()
+        super().refresh_from_db(*args, **kwargs)
+    
     @property
     def staff_profile(self):
         """获取用户的员工资料（向后兼容的方法）"""
-        try:
-            return self.staff_members.first()
-        except ObjectDoesNotExist:
-            return None
+        return self._active_staff
     
     @property
     def staff(self):
-        """获取用户的第一个员工资料记录（向后兼容的属性）"""
-        try:
-            return self.staff_members.first()
-        except ObjectDoesNotExist:
-            return None
+        """获取用户的当前员工资料记录（向后兼容的属性）"""
+        return self._active_staff
     
     @property
     def work_phone(self):
         """获取用户的办公电话（从staff中）"""
-        if hasattr(self, 'staff') and self.staff:
-            return self.staff.work_phone
-        return ''
+        staff = self._active_staff
+        return staff.work_phone if staff else ''
     
     @property
     def enterprise_phone(self):
         """获取用户的企业手机号（从staff中）"""
-        if hasattr(self, 'staff') and self.staff:
-            return self.staff.enterprise_phone
-        return ''
+        staff = self._active_staff
+        return staff.enterprise_phone if staff else ''
     
     @property
     def enterprise_email(self):
         """获取用户的企业邮箱（从staff中）"""
-        if hasattr(self, 'staff') and self.staff:
-            return self.staff.enterprise_email
-        return ''
+        staff = self._active_staff
+        return staff.enterprise_email if staff else ''
     
     @property
     def bio(self):
         """获取用户的个人简介（从staff中）"""
-        if hasattr(self, 'staff') and self.staff:
-            return self.staff.bio
-        return ''
\ No newline at end of file
+        staff = self._active_staff
+        return staff.bio if staff else ''
@@ -1,3 +1,262 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from JYXT.core import activity
+from JYXT.core.tenant import SESSION_KEY
+from JYXT.core.testing import TenantTestMixin
+from enterprises.models import Department
+from staff.models import Staff, StaffRole
+from .models import User
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class LoginFlowTests(TenantTestMixin, TestCase):
+    """登录流程测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise_a = cls.create_enterprise('企业A')
+        cls.enterprise_b = cls.create_enterprise('企业B')
+        cls.user = cls.create_user()
+        cls.create_staff(cls.user, cls.enterprise_a, position='工程师')
+        cls.staff_b = cls.create_staff(cls.user, cls.enterprise_b)
+
+    def setUp(self):
+        cache.clear()
+
+    def _login(self):
+        return self.client.post('/accounts/login/', {'username': '13800000000', 'password': '000000'})
+
+    def _staff_queries(self, func):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as queries:
+            response = func()
+        return response, [query['sql'] for query in queries if '"staff"' in query['sql']]
+
+    def test_multiple_enterprises_reuse_session_choices(self):
+        self.assertRedirects(self._login(), '/accounts/select-enterprise/', fetch_redirect_response=False)
+        response, staff_queries = self._staff_queries(lambda: self.client.get('/accounts/select-enterprise/'))
+        self.assertContains(response, '企业B')
+        self.assertContains(response, '工程师')
+        self.assertEqual(staff_queries, [])
+
+        response, staff_queries = self._staff_queries(lambda: self.client.post(
+            '/accounts/select-enterprise/', {'enterprise_id': self.enterprise_b.pk}
+        ))
+        self.assertRedirects(response, '/dashboard/', fetch_redirect_response=False)
+        response, staff_queries = self._staff_queries(lambda: self.client.get('/dashboard/'))
+        self.assertEqual(response.context['current_enterprise'], self.enterprise_b)
+        self.assertEqual(staff_queries, [])
+
+    def test_single_enterprise_selected_on_login(self):
+        self.staff_b.employment_status = Staff.RESIGNED
+        self.staff_b.save()
+        self.assertRedirects(self._login(), '/dashboard/', fetch_redirect_response=False)
+        self.assertEqual(self.client.session[SESSION_KEY], self.enterprise_a.pk)
+
+    def test_employment_change_refreshes_choices(self):
+        self._login()
+        self.staff_b.employment_status = Staff.RESIGNED
+        self.staff_b.save()
+        response = self.client.post('/accounts/select-enterprise/', {'enterprise_id': self.enterprise_b.pk})
+        self.assertRedirects(response, '/accounts/select-enterprise/', fetch_redirect_response=False)
+        self.assertNotIn(SESSION_KEY, self.client.session)
+
+    def test_department_rename_refreshes_choices(self):
+        department = Department.objects.create(name='技术部', enterprise=self.enterprise_b)
+        other = self.create_enterprise('企业C')
+        other_department = Department.objects.create(name='销售部', enterprise=other)
+        self.staff_b.department = department
+        self.staff_b.save()
+        self._login()
+        self.assertContains(self.client.get('/accounts/select-enterprise/'), '技术部')
+        department.name = '研发部'
+        department.save()
+        response = self.client.get('/accounts/select-enterprise/')
+        self.assertContains(response, '研发部')
+        self.assertNotContains(response, '技术部')
+
+        # 其他企业的部门变更不影响本用户的在职企业列表
+        other_department.name = '市场部'
+        other_department.save()
+        other_department.delete()
+        response, staff_queries = self._staff_queries(lambda: self.client.get('/accounts/select-enterprise/'))
+        self.assertEqual(staff_queries, [])
+
+
+class UserStaffCacheTests(TenantTestMixin, TestCase):
+    """用户员工资料缓存测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise()
+        cls.department = Department.objects.create(name='技术部', enterprise=cls.enterprise)
+        cls.user = cls.create_user()
+        cls.create_staff(cls.user, cls.enterprise, department=cls.department, work_phone='010-1234')
+
+    def test_staff_resolved_once(self):
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.department, '技术部')
+            self.assertEqual(user.work_phone, '010-1234')
+            self.assertEqual(user.staff.enterprise, self.enterprise)
+            self.assertTrue(hasattr(user, 'staff'))
+
+    def test_employed_staff_preferred(self):
+        user = User.objects.get(pk=self.user.pk)
+        user.staff_members.update(employment_status=Staff.RESIGNED)
+        other = self.create_enterprise('企业B')
+        self.create_staff(user, other)
+        self.assertEqual(user.staff.enterprise, other)
+
+    def test_clear_staff_cache(self):
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.department, '技术部')
+        user.staff_members.update(department=None)
+        self.assertEqual(user.department, '技术部')
+        user.clear_staff_cache()
+        self.assertEqual(user.department, '')
+
+
+class UserListViewTests(TenantTestMixin, TestCase):
+    """用户列表视图测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        cls.other = cls.create_enterprise('企业B')
+        cls.admin = cls.create_user('admin', 'admin', user_type=User.ENTERPRISE_ADMIN)
+        cls.create_staff(cls.admin, cls.enterprise)
+
+    def _create_users(self, count):
+        start = User.objects.count()
+        for i in range(start, start + count):
+            user = User.objects.create(username=f'user{i}')
+            Staff.objects.create(user=user, enterprise=self.enterprise)
+            Staff.objects.create(user=user, enterprise=self.other)
+
+    def _get(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/accounts/users/')
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_independent_of_page_size(self):
+        self._create_users(2)
+        # 第一次请求计算session中的在职企业列表并预热缓存
+        self._get()
+        small, _ = self._get()
+        self._create_users(10)
+        large, _ = self._get()
+        self.assertEqual(small, large)
+
+    def test_no_duplicate_users_across_enterprises(self):
+        self._create_users(3)
+        _, response = self._get()
+        users = list(response.context['users'])
+        self.assertEqual(len(users), len(set(users)))
+        self.assertEqual(len(users), 4)
+
+    def test_export_streams_all_users(self):
+        self._create_users(3)
+        self.client.force_login(self.admin)
+        response = self.client.get('/accounts/users/export/?format=csv')
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 1 + 4)
+        self.assertIn('企业A、企业B', lines[-1])
+
+
+class CurrentEnterpriseScopeTests(TenantTestMixin, TestCase):
+    """用户管理按当前企业（而不是用户的默认员工记录）限定范围"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise_a = cls.create_enterprise('企业A')
+        cls.enterprise_b = cls.create_enterprise('企业B')
+        # 在企业A是普通员工（默认员工记录），在企业B是企业管理员
+        cls.user = cls.create_user()
+        cls.create_staff(cls.user, cls.enterprise_a, role_type=StaffRole.REGULAR_STAFF)
+        cls.create_staff(cls.user, cls.enterprise_b, role_type=StaffRole.ENTERPRISE_ADMIN)
+        cls.colleague_a = cls.create_user('13800000001')
+        cls.create_staff(cls.colleague_a, cls.enterprise_a)
+        cls.department_b = Department.objects.create(enterprise=cls.enterprise_b, name='技术部')
+
+    def setUp(self):
+        cache.clear()
+        self.login(self.user, self.enterprise_b)
+
+    def test_user_list_scoped_to_session_enterprise(self):
+        self.assertEqual(self.user.staff.enterprise, self.enterprise_a)
+        response = self.client.get('/accounts/users/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['users']), [self.user])
+        self.assertEqual(response.context['current_enterprise'], self.enterprise_b)
+        self.assertEqual(self.client.get(f'/accounts/users/{self.colleague_a.pk}/update/').status_code, 404)
+
+    def test_created_staff_belongs_to_session_enterprise(self):
+        response = self.client.post('/accounts/users/create/', {
+            'first_name': '新员工',
+            'enterprise_phone': '13900000000',
+            'user_type': User.ENTERPRISE_USER,
+            'is_active': 'on',
+            'department': self.department_b.pk,
+        })
+        self.assertEqual(response.status_code, 302)
+        staff = Staff.objects.get(user__username='13900000000')
+        self.assertEqual(staff.enterprise, self.enterprise_b)
+
+
+class UserSaveTests(TenantTestMixin, TestCase):
+    """用户保存时保留批量写入的活跃时间测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = cls.create_user()
+
+    def setUp(self):
+        cache.clear()
+        activity.flush()
+
+    def test_saving_user_keeps_last_active(self):
+        user = User.objects.get(pk=self.user.pk)
+        # 实例加载之后活跃时间被批量写入
+        activity.touch(user.pk)
+        activity.flush()
+        user.first_name = '张三'
+        user.save()
+        saved = User.objects.get(pk=user.pk)
+        self.assertEqual(saved.first_name, '张三')
+        self.assertIsNotNone(saved.last_active)
+
+        # 显式指定时仍然保存
+        user.last_active = None
+        user.save(update_fields=['last_active'])
+        self.assertIsNone(User.objects.get(pk=user.pk).last_active)
+
+    def test_full_save_keeps_normal_semantics(self):
+        from django.db.models.signals import post_save
+
+        user = User.objects.get(pk=self.user.pk)
+        received = []
+
+        def receiver(sender, update_fields, **kwargs):
+            received.append(update_fields)
+
+        post_save.connect(receiver, sender=User)
+        try:
+            user.save()
+        finally:
+            post_save.disconnect(receiver, sender=User)
+        self.assertEqual(received, [None])
+
+        # 并发删除后完整保存重新插入
+        User.objects.filter(pk=user.pk).delete()
+        user.save()
+        self.assertTrue(User.objects.filter(pk=user.pk).exists())
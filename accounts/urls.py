@@ -12,6 +12,7 @@ urlpatterns = [
     path('logout/', views.CustomLogoutView.as_view(), name='logout'),
     path('select-enterprise/', views.SelectEnterpriseView.as_view(), name='select_enterprise'),
     path('users/', views.UserListView.as_view(), name='user_list'),
+    path('users/export/', views.UserExportView.as_view(), name='user_export'),
     path('users/create/', views.UserCreateView.as_view(), name='user_create'),
     path('users/<int:pk>/update/', views.UserUpdateView.as_view(), name='user_update'),
     path('users/<int:pk>/', views.UserDetailView.as_view(), name='user_detail'),
@@ -1,11 +1,18 @@
 # accounts/views.py
+from asgiref.sync import sync_to_async
 from django.urls import reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DetailView, View
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
 from django.shortcuts import redirect, render
+from django.db.models import Prefetch
+from django.utils import timezone
+from JYXT.core.exports import EXPORT_CHUNK_SIZE, ExportError, export_response
+from JYXT.core.pagination import KeysetPaginationMixin
 from JYXT.core.permissions import SuperUserRequiredMixin, EnterpriseAdminRequiredMixin
+from JYXT.core.views import AsyncLoginRequiredMixin
+from JYXT.core.tenant import CHOICES_SESSION_KEY, SESSION_KEY, aget_enterprise_choices, get_enterprise_choices
 from .models import User
 from staff.models import Staff, StaffRole
 
@@ -19,39 +26,27 @@ class CustomLoginView(LoginView):
     
     def form_valid(self, form):
         """处理登录表单验证成功后的逻辑"""
-        # 获取当前登录的用户（在父类form_valid前，我们需要先认证用户）
-        user = form.get_user()
-        
         # 清除之前可能存在的企业选择session - 关键修复点
-        if 'current_enterprise_id' in self.request.session:
-            del self.request.session['current_enterprise_id']
-        
-        # 检查用户是否有在职的企业任职记录
-        employed_staffs = user.staff_members.filter(employment_status=Staff.EMPLOYED)
-        
-        # 根据用户情况设置success_url
-        if getattr(user, 'is_super_admin', False):
-            self.success_url = reverse_lazy('enterprises:enterprise_list')
-        elif employed_staffs.count() == 0:
-            self.success_url = reverse_lazy('dashboard')
-        elif employed_staffs.count() == 1:
-            self.success_url = reverse_lazy('dashboard')
-        else:
-            self.success_url = reverse_lazy('accounts:select_enterprise')
-        
-        # 现在执行父类的form_valid方法，它会使用我们已经设置好的success_url
+        self.request.session.pop(SESSION_KEY, None)
+        self.request.session.pop(CHOICES_SESSION_KEY, None)
         return super().form_valid(form)
     
     def get_success_url(self):
-        # 优先使用form_valid中设置的success_url
-        if hasattr(self, 'success_url'):
-            return self.success_url
-        # 否则使用默认逻辑
+        """登录后的跳转地址（父类完成登录后调用）
+        
+        在职企业列表只查询一次并存入session，企业选择页和企业解析直接复用。
+        """
         user = self.request.user
         if getattr(user, 'is_super_admin', False):
             return reverse_lazy('enterprises:enterprise_list')
-        else:
-            return reverse_lazy('dashboard')
+        
+        choices = get_enterprise_choices(self.request)
+        if len(choices) > 1:
+            return reverse_lazy('accounts:select_enterprise')
+        if choices:
+            # 只有一个在职企业时直接选中
+            self.request.session[SESSION_KEY] = choices[0]['id']
+        return reverse_lazy('dashboard')
 
 class CustomLogoutView(LogoutView):
     """自定义登出视图"""
@@ -61,26 +56,27 @@ class CustomLogoutView(LogoutView):
         messages.info(request, "您已成功退出系统")
         return super().dispatch(request, *args, **kwargs)
 
-class SelectEnterpriseView(LoginRequiredMixin, View):
-    """企业选择视图"""
+class SelectEnterpriseView(AsyncLoginRequiredMixin, View):
+    """企业选择视图（异步视图）"""
     template_name = 'accounts/select_enterprise.html'
     
-    def get(self, request, *args, **kwargs):
+    async def get(self, request, *args, **kwargs):
         # 清除之前可能存在的企业选择session - 关键修复点
-        if 'current_enterprise_id' in request.session:
-            del request.session['current_enterprise_id']
+        await request.session.apop(SESSION_KEY, None)
         
-        # 获取用户所有在职的企业任职记录
-        employed_staffs = request.user.staff_members.filter(employment_status=Staff.EMPLOYED)
+        # 用户所有在职企业（登录时已存入session）
+        choices = await aget_enterprise_choices(request, request.user)
         
         # 如果用户只有一个在职企业，直接跳转到首页
-        if employed_staffs.count() <= 1:
+        if len(choices) <= 1:
             return redirect('dashboard')
         
-        return render(request, self.template_name, {
-            'staffs': employed_staffs
-        })    
-    def post(self, request, *args, **kwargs):
+        # 上下文处理器是同步的，模板在线程中渲染
+        return await sync_to_async(render)(request, self.template_name, {
+            'enterprises': choices
+        })
+    
+    async def post(self, request, *args, **kwargs):
         # 获取用户选择的企业ID
         enterprise_id = request.POST.get('enterprise_id')
         
@@ -88,47 +84,68 @@ class SelectEnterpriseView(LoginRequiredMixin, View):
             messages.error(request, "请选择一个企业")
             return redirect('accounts:select_enterprise')
         
-        try:
-            # 验证用户是否在该企业有在职记录
-            staff = request.user.staff_members.get(
-                enterprise_id=enterprise_id,
-                employment_status=Staff.EMPLOYED
-            )
-            
-            # 可以在这里添加逻辑来设置用户当前选择的企业
-            # 例如，使用session来存储用户当前选择的企业ID
-            request.session['current_enterprise_id'] = enterprise_id
-            
-            return redirect('dashboard')
-        except Staff.DoesNotExist:
+        # 用户必须在该企业有在职记录
+        choices = await aget_enterprise_choices(request, request.user)
+        if enterprise_id not in {str(choice['id']) for choice in choices}:
             messages.error(request, "您没有选择企业的访问权限")
             return redirect('accounts:select_enterprise')
+        
+        await request.session.aset(SESSION_KEY, int(enterprise_id))
+        return redirect('dashboard')
 
-class UserListView(EnterpriseAdminRequiredMixin, ListView):
+class UserListView(EnterpriseAdminRequiredMixin, KeysetPaginationMixin, ListView):
     """用户列表"""
     model = User
     template_name = 'accounts/user_list.html'
     context_object_name = 'users'
     paginate_by = 20
+    keyset_ordering = ('id',)
+    paginate_count = False
     
     def get_queryset(self):
         queryset = super().get_queryset()
         # 系统管理员（Django的is_superuser）和超级管理员可以看到所有用户
         if not (self.request.user.is_superuser or getattr(self.request.user, 'is_super_admin', False)):
-            if hasattr(self.request.user, 'staff') and self.request.user.staff and self.request.user.staff.enterprise:
-                queryset = queryset.filter(staff_members__enterprise=self.request.user.staff.enterprise)
-        return queryset
+            # 只显示当前企业的用户；使用子查询而不是关联查询过滤，避免用户在多个企业任职时重复出现
+            queryset = queryset.filter(
+                id__in=Staff.objects.filter(enterprise=self.request.enterprise).values('user_id')
+            )
+        # 预加载任职记录及其企业，模板中的任职企业列不再逐行查询
+        return queryset.prefetch_related(
+            Prefetch('staff_members', queryset=Staff.objects.select_related('enterprise').order_by('pk'))
+        ).order_by('pk')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # 使用更可靠的方式获取企业信息：直接从用户对象获取
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            context['current_enterprise'] = user.staff.enterprise
-        else:
-            context['current_enterprise'] = getattr(self.request, 'enterprise', None)
+        # 当前企业（session中选择的企业）
+        context['current_enterprise'] = self.request.enterprise
         return context
 
+class UserExportView(UserListView):
+    """用户导出 - 按列表页相同的范围流式导出全部用户"""
+    
+    def get(self, request, *args, **kwargs):
+        header = ['用户名', '姓名', '邮箱', '个人手机号', '用户类型', '任职企业', '状态', '注册时间']
+        rows = (
+            [
+                user.username,
+                user.first_name,
+                user.email,
+                user.phone,
+                user.get_user_type_display(),
+                '、'.join(staff.enterprise.name for staff in user.staff_members.all() if staff.enterprise),
+                '激活' if user.is_active else '禁用',
+                timezone.localtime(user.date_joined).strftime('%Y-%m-%d'),
+            ]
+            # 指定chunk_size时，预加载按每批次的用户执行一次
+            for user in self.get_queryset().iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        try:
+            return export_response(request.GET.get('format', 'csv'), '用户列表', header, rows)
+        except ExportError as e:
+            messages.error(request, str(e))
+            return redirect('accounts:user_list')
+
 class UserCreateView(EnterpriseAdminRequiredMixin, CreateView):
     """创建用户"""
     template_name = 'accounts/user_form.html'
@@ -142,25 +159,17 @@ class UserCreateView(EnterpriseAdminRequiredMixin, CreateView):
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs['request'] = self.request
-        kwargs['user_id'] = self.kwargs.get('pk')  # 传递用户ID给表单
         return kwargs
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # 使用更可靠的方式获取企业信息：直接从用户对象获取
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            context['current_enterprise'] = user.staff.enterprise
-        else:
-            context['current_enterprise'] = getattr(self.request, 'enterprise', None)
+        # 当前企业（session中选择的企业）
+        context['current_enterprise'] = self.request.enterprise
         return context
     
     def form_valid(self, form):
-        # 获取当前登录用户的企业
-        current_user = self.request.user
-        enterprise = None
-        if hasattr(current_user, 'staff') and current_user.staff and current_user.staff.enterprise:
-            enterprise = current_user.staff.enterprise
+        # 员工记录创建在当前企业（session中选择的企业）
+        enterprise = self.request.enterprise
         
         # 获取手机号（用作用户名）
         enterprise_phone = form.cleaned_data['enterprise_phone']
@@ -171,6 +180,7 @@ class UserCreateView(EnterpriseAdminRequiredMixin, CreateView):
             # 用户已存在，更新信息
             user.user_type = 'enterprise_user'  # 强制设置为企业用户
             user.first_name = form.cleaned_data['first_name']
+            user.last_name = form.cleaned_data.get('last_name', '')
             user.email = form.cleaned_data.get('email', '')
             user.is_active = form.cleaned_data['is_active']
             
@@ -184,6 +194,7 @@ class UserCreateView(EnterpriseAdminRequiredMixin, CreateView):
             user = User.objects.create(
                 username=enterprise_phone,
                 first_name=form.cleaned_data['first_name'],
+                last_name=form.cleaned_data.get('last_name', ''),
                 email=form.cleaned_data.get('email', ''),
                 user_type='enterprise_user',  # 默认设置为企业用户
                 is_active=form.cleaned_data['is_active']
@@ -208,9 +219,7 @@ class UserCreateView(EnterpriseAdminRequiredMixin, CreateView):
             try:
                 # 检查用户是否在当前企业已有staff记录
                 staff = Staff.objects.get(user=user, enterprise=enterprise)
-                # 用户在当前企业已有staff记录，更新信息
-                staff.first_name = form.cleaned_data['first_name']
-                staff.last_name = form.cleaned_data.get('last_name', '')
+                # 用户在当前企业已有staff记录，更新信息（姓名保存在用户上）
                 staff.work_phone = form.cleaned_data.get('work_phone', '')
                 staff.enterprise_email = form.cleaned_data.get('enterprise_email', '')
                 staff.department = form.cleaned_data['department']
@@ -221,8 +230,6 @@ class UserCreateView(EnterpriseAdminRequiredMixin, CreateView):
                 staff = Staff.objects.create(
                     user=user,
                     enterprise=enterprise,
-                    first_name=form.cleaned_data['first_name'],
-                    last_name=form.cleaned_data.get('last_name', ''),
                     work_phone=form.cleaned_data.get('work_phone', ''),
                     enterprise_phone=enterprise_phone,
                     enterprise_email=form.cleaned_data.get('enterprise_email', ''),
@@ -265,9 +272,9 @@ class UserUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
         return kwargs
     
     def get_initial(self):
-        # 获取用户和员工资料对象
-        user = User.objects.get(id=self.kwargs.get('pk'))
-        staff = getattr(user, 'staff', None)
+        # 获取用户和当前企业的员工资料对象（用户已按当前企业过滤）
+        user = self.object
+        staff = Staff.objects.filter(user=user, enterprise=self.request.enterprise).first()
         
         # 设置表单初始值
         initial = {
@@ -291,51 +298,33 @@ class UserUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
         # 获取基础查询集
         queryset = User.objects.all()
         
-        # 调试信息
         user = self.request.user
-        pk = self.kwargs.get('pk')
         
         # 判断用户类型和权限
         is_super_admin = getattr(user, 'is_super_admin', False) or user.is_superuser
-        is_enterprise_admin = getattr(user, 'is_enterprise_admin', False)
         
-        # 应用权限过滤
+        # 应用权限过滤：只能访问当前企业（session中选择的企业）的用户
         if not is_super_admin:
-            if is_enterprise_admin:
-                # 允许企业管理员查看所有企业管理员用户
-                queryset = queryset.filter(user_type='enterprise_admin')
-            elif hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-                # 普通企业用户只能查看自己企业的用户
-                queryset = queryset.filter(staff_members__enterprise=user.staff.enterprise)
+            enterprise = self.request.enterprise
+            if enterprise:
+                queryset = queryset.filter(
+                    id__in=Staff.objects.filter(enterprise=enterprise).values('user_id')
+                )
             else:
-                # 没有企业关联的用户只能查看自己
+                # 没有企业上下文的用户只能查看自己
                 queryset = queryset.filter(id=user.id)
         
-        # 额外安全检查 - 确保用户可以访问请求的对象
-        if pk and not is_super_admin:
-            try:
-                target_user = User.objects.get(id=pk)
-                if hasattr(target_user, 'staff') and target_user.staff and target_user.staff.enterprise and hasattr(user, 'staff') and user.staff and user.staff.enterprise and target_user.staff.enterprise != user.staff.enterprise and target_user.user_type != 'enterprise_admin':
-                    # 确保不是跨企业访问非管理员用户
-                    queryset = queryset.none()
-            except User.DoesNotExist:
-                pass
-        
         return queryset
         
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # 使用更可靠的方式获取企业信息：直接从用户对象获取
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            context['current_enterprise'] = user.staff.enterprise
-        else:
-            context['current_enterprise'] = getattr(self.request, 'enterprise', None)
+        # 当前企业（session中选择的企业）
+        context['current_enterprise'] = self.request.enterprise
         return context
     
     def form_valid(self, form):
-        # 获取用户对象
-        user = User.objects.get(id=self.kwargs.get('pk'))
+        # 获取用户对象（已按当前企业过滤）
+        user = self.object
         
         # 更新用户认证信息
         user.email = form.cleaned_data['email']
@@ -345,10 +334,8 @@ class UserUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
         user.last_name = form.cleaned_data['last_name']
         user.save()
         
-        # 获取当前用户所在的企业
-        current_enterprise = None
-        if hasattr(self.request.user, 'staff') and self.request.user.staff and self.request.user.staff.enterprise:
-            current_enterprise = self.request.user.staff.enterprise
+        # 当前企业（session中选择的企业）
+        current_enterprise = self.request.enterprise
         
         # 获取或创建当前企业的员工资料对象
         if current_enterprise:
@@ -356,16 +343,18 @@ class UserUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
             
             # 更新员工资料信息
             staff.enterprise_phone = form.cleaned_data['enterprise_phone']
-            staff.department = form.cleaned_data['department']  # 现在这个字段是一个Department对象
-            staff.position = form.cleaned_data['position']
+            if 'department' in form.cleaned_data:
+                staff.department = form.cleaned_data['department']  # 现在这个字段是一个Department对象
+            if 'position' in form.cleaned_data:
+                staff.position = form.cleaned_data['position']
             
             staff.save()
-        
-        # 更新员工角色信息
-        role, created = StaffRole.objects.get_or_create(staff=staff)
-        role.role_type = form.cleaned_data['user_type']
-        role.is_active = form.cleaned_data['is_active']
-        role.save()
+            
+            # 更新员工角色信息
+            role, created = StaffRole.objects.get_or_create(staff=staff)
+            role.role_type = form.cleaned_data['user_type']
+            role.is_active = form.cleaned_data['is_active']
+            role.save()
         
         messages.success(self.request, "用户信息更新成功")
         return redirect(self.success_url)
@@ -386,12 +375,8 @@ class ProfileView(BaseView, UpdateView):
         
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        # 使用更可靠的方式获取企业信息：直接从用户对象获取
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            context['current_enterprise'] = user.staff.enterprise
-        else:
-            context['current_enterprise'] = getattr(self.request, 'enterprise', None)
+        # 当前企业（session中选择的企业）
+        context['current_enterprise'] = self.request.enterprise
         return context
     
     def get_initial(self):
@@ -435,10 +420,8 @@ class ProfileView(BaseView, UpdateView):
         user.last_name = form.cleaned_data['last_name']
         user.save()
         
-        # 获取当前用户所在的企业
-        current_enterprise = None
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            current_enterprise = user.staff.enterprise
+        # 当前企业（session中选择的企业）
+        current_enterprise = self.request.enterprise
         
         # 获取或创建当前企业的员工资料对象
         if current_enterprise:
@@ -473,34 +456,20 @@ class UserDetailView(EnterpriseAdminRequiredMixin, DetailView):
         # 获取基础查询集
         queryset = super().get_queryset()
         
-        # 调试信息
         user = self.request.user
-        pk = self.kwargs.get('pk')
         
         # 判断用户类型和权限
         is_super_admin = getattr(user, 'is_super_admin', False) or user.is_superuser
-        is_enterprise_admin = getattr(user, 'is_enterprise_admin', False)
         
-        # 应用权限过滤
+        # 应用权限过滤：只能访问当前企业（session中选择的企业）的用户
         if not is_super_admin:
-            if is_enterprise_admin:
-                # 允许企业管理员查看所有企业管理员用户
-                queryset = queryset.filter(user_type='enterprise_admin')
-            elif hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-                # 普通企业用户只能查看自己企业的用户
-                queryset = queryset.filter(staff_members__enterprise=user.staff.enterprise)
+            enterprise = self.request.enterprise
+            if enterprise:
+                queryset = queryset.filter(
+                    id__in=Staff.objects.filter(enterprise=enterprise).values('user_id')
+                )
             else:
-                # 没有企业关联的用户只能查看自己
+                # 没有企业上下文的用户只能查看自己
                 queryset = queryset.filter(id=user.id)
         
-        # 额外安全检查 - 确保用户可以访问请求的对象
-        if pk and not is_super_admin:
-            try:
-                target_user = User.objects.get(id=pk)
-                if hasattr(target_user, 'staff') and target_user.staff and target_user.staff.enterprise and hasattr(user, 'staff') and user.staff and user.staff.enterprise and target_user.staff.enterprise != user.staff.enterprise and target_user.user_type != 'enterprise_admin':
-                    # 确保不是跨企业访问非管理员用户
-                    queryset = queryset.none()
-            except User.DoesNotExist:
-                pass
-        
         return queryset
\ No newline at end of file
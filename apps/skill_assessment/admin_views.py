@@ -3,7 +3,9 @@ from django.views.generic import ListView, CreateView, UpdateView, DetailView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy
 from django.contrib import messages
+from django.core.exceptions import ValidationError
 from JYXT.core.permissions import SuperUserRequiredMixin, AppAdminRequiredMixin
+from .conf import to_python
 from .models import SkillAssessmentEnterpriseProfile, SkillAssessmentConfig
 from enterprises.models import Enterprise
 
@@ -86,6 +88,15 @@ class SkillAssessmentConfigUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'skill_assessment/config_form.html'
     fields = ['value', 'description']
     
+    def form_valid(self, form):
+        # 按配置项声明的类型校验配置值；保存后由信号递增配置缓存版本号
+        try:
+            to_python(self.object.key, form.cleaned_data['value'])
+        except ValidationError as e:
+            form.add_error('value', e)
+            return self.form_invalid(form)
+        return super().form_valid(form)
+    
     def get_success_url(self):
         messages.success(self.request, "配置更新成功")
         return reverse_lazy('skill_assessment:config_list')
@@ -100,6 +111,7 @@ class SkillAssessmentConfigUpdateView(LoginRequiredMixin, UpdateView):
 
 class ManagementDashboardView(AppAdminRequiredMixin, ListView):
     """管理机构仪表盘"""
+    app_code = 'skill_assessment'
     template_name = 'skill_assessment/management_dashboard.html'
     
     def get_queryset(self):
@@ -0,0 +1,36 @@
+# apps/skill_assessment/api.py
+"""技能标准、认定计划的只读接口（订阅职业技能认定应用的企业）"""
+from JYXT.core.api import ApiView
+
+from .models import AssessmentPlan, SkillStandard
+
+
+class SkillStandardApiView(ApiView):
+    model = SkillStandard
+    app_code = 'skill_assessment'
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'code': 'code',
+        'level': 'level',
+        'description': 'description',
+        'updated_at': 'updated_at',
+    }
+
+    def get_queryset(self):
+        return SkillStandard.objects.filter(enterprise=self.request.enterprise)
+
+
+class AssessmentPlanApiView(ApiView):
+    model = AssessmentPlan
+    app_code = 'skill_assessment'
+    fields = {
+        'id': 'id',
+        'title': 'title',
+        'skill_standard': 'skill_standard_id',
+        'plan_date': 'plan_date',
+        'updated_at': 'updated_at',
+    }
+
+    def get_queryset(self):
+        return AssessmentPlan.objects.filter(enterprise=self.request.enterprise)
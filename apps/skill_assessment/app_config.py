@@ -1,4 +1,5 @@
 # apps/skill_assessment/app_config.py
+from JYXT.core import authz
 from JYXT.core.registry import BaseAppConfig
 
 class SkillAssessmentConfig(BaseAppConfig):
@@ -8,8 +9,24 @@ class SkillAssessmentConfig(BaseAppConfig):
     code = "skill_assessment"
     description = "企业职业技能等级认定管理平台"
     version = "1.0.0"
-    
-    # 菜单配置
+
+    # 模型（使用时才解析）
+    enterprise_profile_model = 'skill_assessment.SkillAssessmentEnterpriseProfile'
+    config_model = 'skill_assessment.SkillAssessmentConfig'
+    models = [
+        'skill_assessment.SkillStandard',
+        'skill_assessment.AssessmentPlan',
+        'skill_assessment.AssessmentRecord',
+    ]
+
+    # 应用管理员角色
+    admin_roles = [
+        ('management', '管理机构'),
+    ]
+    admin_role_field = 'org_type'
+
+    # 菜单配置：订阅企业的在职员工可以查看认定数据，统计分析只对企业管理员显示；
+    # 不在当前企业任职的用户（如平台运营人员）可以通过Django权限查看
     menu_items = [
         {
             'name': '认定管理',
@@ -19,17 +36,19 @@ class SkillAssessmentConfig(BaseAppConfig):
                     'name': '认定计划',
                     'url': 'skill_assessment:assessment_plan_list',
                     'permission': 'skill_assessment.view_assessmentplan',
+                    'role': authz.MEMBER,
+                },
+                {
+                    'name': '认定记录',
+                    'url': 'skill_assessment:assessment_record_list',
+                    'permission': 'skill_assessment.view_assessmentrecord',
+                    'role': authz.MEMBER,
                 },
-                # 暂时注释，因为相关视图已禁用
-                # {
-                #     'name': '认定记录',
-                #     'url': 'skill_assessment:assessment_record_list',
-                #     'permission': 'skill_assessment.view_assessmentrecord',
-                # },
                 {
                     'name': '技能标准',
                     'url': 'skill_assessment:skill_standard_list',
                     'permission': 'skill_assessment.view_skillstandard',
+                    'role': authz.MEMBER,
                 },
             ]
         },
@@ -40,7 +59,7 @@ class SkillAssessmentConfig(BaseAppConfig):
                 {
                     'name': '认定统计',
                     'url': 'skill_assessment:statistics',
-                    'permission': 'skill_assessment.view_reports',  # 修改为使用查看报告权限
+                    'role': authz.ENTERPRISE_ADMIN,
                 },
             ]
         },
@@ -1,13 +1,14 @@
 # apps/skill_assessment/apps.py
 from django.apps import AppConfig
-from JYXT.core.registry import app_registry
+
 
 class SkillAssessmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.skill_assessment'
     verbose_name = '职业技能等级认定'
+    # 业务应用配置，由应用注册表在第一次使用时加载
+    business_app = 'apps.skill_assessment.app_config.SkillAssessmentConfig'
 
     def ready(self):
-        # 注册应用到注册表
-        from .app_config import SkillAssessmentConfig as AppConfig
-        app_registry.register('skill_assessment', AppConfig)
\ No newline at end of file
+        # 注册配置缓存失效信号
+        import apps.skill_assessment.signals
@@ -0,0 +1,151 @@
+# apps/skill_assessment/conf.py
+"""职业技能等级认定应用配置读取
+
+配置存储在 SkillAssessmentConfig 键值表中（值为文本）。这里为每个配置项声明类型和默认值，
+读取时按类型转换；默认值同时用于 init_system 初始化配置表。
+
+配置按两级缓存：
+- 共享缓存：整张配置表一次读出，按版本号缓存，所有进程共用；
+- 进程内缓存：转换后的配置快照，版本号未变时直接使用。
+
+配置保存或删除时递增版本号（信号中调用 invalidate()），各进程下次读取时自动加载新配置，
+平时读取配置只需一次缓存读取（版本号），不查询数据库。
+
+    from apps.skill_assessment.conf import get_config
+    days = get_config().max_assessment_duration
+"""
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+
+from JYXT.core.versions import bump_version, get_version
+
+logger = logging.getLogger(__name__)
+
+# 共享缓存有效期（秒）；版本号变化即失效，这里只是兜底
+CONFIG_CACHE_TIMEOUT = 24 * 60 * 60
+
+_VERSION_KEY = 'skill_assessment:config:version'
+_CONFIG_KEY = 'skill_assessment:config:{version}'
+
+# 进程内缓存的配置快照
+_snapshot = None
+
+
+@dataclass(frozen=True)
+class ConfigOption:
+    """配置项声明"""
+    key: str
+    type: str  # 'str' / 'int' / 'bool' / 'json'
+    default: Any
+    description: str
+    is_system: bool = False
+
+
+# 配置项声明（init_system 按此初始化配置表）
+CONFIG_OPTIONS = {
+    option.key: option for option in [
+        ConfigOption('max_assessment_duration', 'int', 30, '最大认定时长（天）'),
+        ConfigOption('certificate_template', 'str', 'default', '证书模板'),
+        ConfigOption('min_participants', 'int', 10, '最小参与人数'),
+        ConfigOption('system_version', 'str', '1.0.0', '系统版本', is_system=True),
+    ]
+}
+
+_TRUE_VALUES = {'1', 'true', 'yes', 'on', '是'}
+_FALSE_VALUES = {'0', 'false', 'no', 'off', '否', ''}
+
+
+def _to_bool(value):
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+_CONVERTERS = {
+    'str': str,
+    'int': lambda value: int(value.strip()),
+    'bool': _to_bool,
+    'json': json.loads,
+}
+
+
+def to_python(key, value):
+    """将配置表中的文本值转换为配置项声明的类型，无法转换时抛出 ValidationError"""
+    option = CONFIG_OPTIONS.get(key)
+    if option is None:
+        return value
+    try:
+        return _CONVERTERS[option.type](value)
+    except (ValueError, TypeError):
+        raise ValidationError(f'配置"{key}"的值必须是{option.type}类型')
+
+
+def to_text(key, value):
+    """配置值转换为配置表中存储的文本"""
+    option = CONFIG_OPTIONS.get(key)
+    if option is not None and option.type == 'json':
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+class ConfigSnapshot:
+    """某一版本的配置快照，配置项可以按属性或 get() 读取"""
+
+    def __init__(self, version, raw):
+        self.version = version
+        self._raw = raw
+        self._values = {}
+
+    def get(self, key, default=None):
+        if key in self._values:
+            return self._values[key]
+        option = CONFIG_OPTIONS.get(key)
+        fallback = option.default if option is not None else default
+        if key not in self._raw:
+            return fallback
+        try:
+            value = to_python(key, self._raw[key])
+        except ValidationError:
+            logger.warning('配置"%s"的值无法转换，使用默认值：%r', key, self._raw[key])
+            value = fallback
+        self._values[key] = value
+        return value
+
+    def __getattr__(self, key):
+        if key.startswith('_') or (key not in CONFIG_OPTIONS and key not in self._raw):
+            raise AttributeError(key)
+        return self.get(key)
+
+
+def invalidate():
+    """使配置缓存失效（配置保存或删除时调用）"""
+    bump_version(_VERSION_KEY)
+
+
+def get_config():
+    """当前配置快照"""
+    global _snapshot
+    from .models import SkillAssessmentConfig
+
+    version = get_version(_VERSION_KEY)
+    snapshot = _snapshot
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+
+    key = _CONFIG_KEY.format(version=version)
+    raw = cache.get(key)
+    if raw is None:
+        raw = dict(SkillAssessmentConfig.objects.values_list('key', 'value'))
+        cache.set(key, raw, CONFIG_CACHE_TIMEOUT)
+    snapshot = _snapshot = ConfigSnapshot(version, raw)
+    return snapshot
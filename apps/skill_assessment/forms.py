@@ -0,0 +1,21 @@
+# apps/skill_assessment/forms.py
+from django import forms
+
+
+class StatisticsFilterForm(forms.Form):
+    """认定统计的日期范围筛选"""
+    start = forms.DateField(
+        label='开始日期', required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+    end = forms.DateField(
+        label='结束日期', required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'}),
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        start, end = cleaned_data.get('start'), cleaned_data.get('end')
+        if start and end and start > end:
+            raise forms.ValidationError('开始日期不能晚于结束日期')
+        return cleaned_data
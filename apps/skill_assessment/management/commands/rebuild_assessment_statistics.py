@@ -0,0 +1,16 @@
+# apps/skill_assessment/management/commands/rebuild_assessment_statistics.py
+from django.core.management.base import BaseCommand
+
+from apps.skill_assessment import statistics
+
+class Command(BaseCommand):
+    help = '从认定记录重新汇总认定统计（绕过模型批量导入认定记录后执行）'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--enterprise', type=int, help='只重建指定企业ID的统计')
+    
+    def handle(self, *args, **options):
+        rows = statistics.rebuild(options.get('enterprise'))
+        self.stdout.write(
+            self.style.SUCCESS(f'认定统计重建完成，共 {rows} 条统计')
+        )
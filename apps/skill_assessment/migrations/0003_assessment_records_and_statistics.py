@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:17
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0007_composite_indexes'),
+        ('skill_assessment', '0002_skillassessmentconfig_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssessmentRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('participant_name', models.CharField(max_length=100, verbose_name='参与者姓名')),
+                ('participant_id', models.CharField(max_length=18, verbose_name='身份证号')),
+                ('participant_department', models.CharField(blank=True, max_length=100, verbose_name='所属部门')),
+                ('assessment_date', models.DateField(default=django.utils.timezone.localdate, verbose_name='认定日期')),
+                ('score', models.DecimalField(blank=True, decimal_places=2, max_digits=5, null=True, verbose_name='得分')),
+                ('result', models.CharField(choices=[('passed', '通过'), ('failed', '未通过'), ('absent', '缺考')], max_length=20, verbose_name='认定结果')),
+                ('comments', models.TextField(blank=True, verbose_name='评语')),
+                ('certificate_number', models.CharField(blank=True, max_length=100, verbose_name='证书编号')),
+                ('assessment_plan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='skill_assessment.assessmentplan', verbose_name='认定计划')),
+                ('enterprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='enterprises.enterprise', verbose_name='企业')),
+            ],
+            options={
+                'verbose_name': '认定记录',
+                'verbose_name_plural': '认定记录管理',
+                'db_table': 'assessment_records',
+                'indexes': [models.Index(fields=['enterprise', 'assessment_date'], name='assessment_records_date_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AssessmentStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('assessment_date', models.DateField(verbose_name='认定日期')),
+                ('total', models.PositiveIntegerField(default=0, verbose_name='认定人数')),
+                ('passed', models.PositiveIntegerField(default=0, verbose_name='通过人数')),
+                ('failed', models.PositiveIntegerField(default=0, verbose_name='未通过人数')),
+                ('absent', models.PositiveIntegerField(default=0, verbose_name='缺考人数')),
+                ('enterprise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='enterprises.enterprise', verbose_name='企业')),
+                ('skill_standard', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='skill_assessment.skillstandard', verbose_name='技能标准')),
+            ],
+            options={
+                'verbose_name': '认定统计',
+                'verbose_name_plural': '认定统计',
+                'db_table': 'assessment_statistics',
+                'indexes': [models.Index(fields=['enterprise', 'assessment_date'], name='assessment_stats_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('enterprise', 'skill_standard', 'assessment_date'), name='assessment_statistics_unique')],
+            },
+        ),
+    ]
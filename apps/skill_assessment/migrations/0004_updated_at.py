@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('skill_assessment', '0003_assessment_records_and_statistics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assessmentplan',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+        migrations.AddField(
+            model_name='skillstandard',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='更新时间'),
+        ),
+    ]
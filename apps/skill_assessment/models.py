@@ -1,5 +1,6 @@
 # apps/skill_assessment/models.py
 from django.db import models
+from django.utils import timezone
 from enterprises.models import Enterprise
 
 class SkillAssessmentEnterpriseProfile(models.Model):
@@ -82,6 +83,7 @@ class SkillStandard(models.Model):
     code = models.CharField('技能代码', max_length=50)
     description = models.TextField('技能描述', blank=True)
     level = models.CharField('等级', max_length=50)
+    updated_at = models.DateTimeField('更新时间', auto_now=True)
     
     class Meta:
         db_table = 'skill_standards'
@@ -102,6 +104,7 @@ class AssessmentPlan(models.Model):
     title = models.CharField('计划标题', max_length=200)
     skill_standard = models.ForeignKey(SkillStandard, on_delete=models.CASCADE, verbose_name='技能标准')
     plan_date = models.DateField('计划日期')
+    updated_at = models.DateTimeField('更新时间', auto_now=True)
     
     class Meta:
         db_table = 'assessment_plans'
@@ -109,4 +112,81 @@ class AssessmentPlan(models.Model):
         verbose_name_plural = '认定计划管理'
     
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+class AssessmentRecord(models.Model):
+    """认定记录
+    
+    保存、删除记录时同步更新认定统计计数（见 statistics.py）；绕过模型批量写入后需执行
+    rebuild_assessment_statistics 重建统计。
+    """
+    RESULT_PASSED = 'passed'
+    RESULT_FAILED = 'failed'
+    RESULT_ABSENT = 'absent'
+    RESULT_CHOICES = [
+        (RESULT_PASSED, '通过'),
+        (RESULT_FAILED, '未通过'),
+        (RESULT_ABSENT, '缺考'),
+    ]
+    
+    enterprise = models.ForeignKey(Enterprise, on_delete=models.CASCADE, verbose_name='企业')
+    assessment_plan = models.ForeignKey(AssessmentPlan, on_delete=models.CASCADE, verbose_name='认定计划')
+    participant_name = models.CharField('参与者姓名', max_length=100)
+    participant_id = models.CharField('身份证号', max_length=18)
+    participant_department = models.CharField('所属部门', max_length=100, blank=True)
+    assessment_date = models.DateField('认定日期', default=timezone.localdate)
+    score = models.DecimalField('得分', max_digits=5, decimal_places=2, null=True, blank=True)
+    result = models.CharField('认定结果', max_length=20, choices=RESULT_CHOICES)
+    comments = models.TextField('评语', blank=True)
+    certificate_number = models.CharField('证书编号', max_length=100, blank=True)
+    
+    class Meta:
+        db_table = 'assessment_records'
+        verbose_name = '认定记录'
+        verbose_name_plural = '认定记录管理'
+        indexes = [
+            models.Index(fields=['enterprise', 'assessment_date'], name='assessment_records_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.participant_name} - {self.get_result_display()}"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # 记录加载时的统计维度，保存时据此计算统计计数的增减
+        instance._loaded_stat_values = {
+            name: getattr(instance, name)
+            for name in ('enterprise_id', 'assessment_plan_id', 'assessment_date', 'result')
+            if name in instance.__dict__
+        }
+        return instance
+
+class AssessmentStatistic(models.Model):
+    """认定统计计数（按企业、技能标准、认定日期汇总的认定记录数）
+    
+    由认定记录的保存、删除增量维护，统计页面按日期范围 GROUP BY 汇总，不再逐条统计认定记录。
+    """
+    enterprise = models.ForeignKey(Enterprise, on_delete=models.CASCADE, verbose_name='企业')
+    skill_standard = models.ForeignKey(SkillStandard, on_delete=models.CASCADE, verbose_name='技能标准')
+    assessment_date = models.DateField('认定日期')
+    total = models.PositiveIntegerField('认定人数', default=0)
+    passed = models.PositiveIntegerField('通过人数', default=0)
+    failed = models.PositiveIntegerField('未通过人数', default=0)
+    absent = models.PositiveIntegerField('缺考人数', default=0)
+    
+    class Meta:
+        db_table = 'assessment_statistics'
+        verbose_name = '认定统计'
+        verbose_name_plural = '认定统计'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['enterprise', 'skill_standard', 'assessment_date'], name='assessment_statistics_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['enterprise', 'assessment_date'], name='assessment_stats_date_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.skill_standard} {self.assessment_date}: {self.passed}/{self.total}"
@@ -0,0 +1,44 @@
+# apps/skill_assessment/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import conf, statistics
+from .models import AssessmentPlan, AssessmentRecord, SkillAssessmentConfig
+
+
+@receiver(post_save, sender=SkillAssessmentConfig)
+@receiver(post_delete, sender=SkillAssessmentConfig)
+def invalidate_config_cache(sender, instance, **kwargs):
+    """配置保存或删除时，使所有进程的配置缓存失效"""
+    conf.invalidate()
+
+
+@receiver(post_save, sender=AssessmentRecord)
+def update_statistics_on_save(sender, instance, created, raw=False, **kwargs):
+    """认定记录保存后增量更新认定统计"""
+    if not raw:
+        statistics.record_saved(instance, created)
+
+
+@receiver(post_delete, sender=AssessmentRecord)
+def update_statistics_on_delete(sender, instance, **kwargs):
+    """认定记录删除后增量更新认定统计"""
+    statistics.record_deleted(instance)
+
+
+@receiver(pre_save, sender=AssessmentPlan)
+def remember_plan_standard(sender, instance, raw=False, **kwargs):
+    if instance.pk and not raw:
+        instance._previous_standard_id = (
+            AssessmentPlan.objects.filter(pk=instance.pk).values_list('skill_standard_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=AssessmentPlan)
+def rebuild_statistics_on_standard_change(sender, instance, created, **kwargs):
+    """认定计划更换技能标准后，其认定记录的统计归属随之改变，重建该企业的统计"""
+    previous = getattr(instance, '_previous_standard_id', None)
+    if not created and previous is not None and previous != instance.skill_standard_id:
+        enterprise_id = instance.enterprise_id
+        transaction.on_commit(lambda: statistics.rebuild(enterprise_id))
@@ -0,0 +1,148 @@
+# apps/skill_assessment/statistics.py
+"""认定统计
+
+认定记录按 (企业, 技能标准, 认定日期) 汇总为 AssessmentStatistic 计数行：
+- 增量维护：认定记录保存、删除时（signals.py）对受影响的计数行做 F() 原子增减，不重新统计；
+- 查询：统计页面对计数行按技能标准或等级 GROUP BY，结果行数与技能标准数相同，
+  与认定记录数无关，并支持按认定日期范围筛选；
+- 重建：绕过模型批量写入认定记录、或修改认定计划的技能标准后，用 rebuild() 从认定记录重新汇总。
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+
+from .models import AssessmentPlan, AssessmentRecord, AssessmentStatistic
+
+# 认定结果对应的计数字段
+RESULT_FIELDS = {
+    AssessmentRecord.RESULT_PASSED: 'passed',
+    AssessmentRecord.RESULT_FAILED: 'failed',
+    AssessmentRecord.RESULT_ABSENT: 'absent',
+}
+
+COUNTER_FIELDS = ('total', 'passed', 'failed', 'absent')
+
+
+def _standard_id(plan_id, record=None):
+    if record is not None and record.assessment_plan_id == plan_id and AssessmentRecord.assessment_plan.is_cached(record):
+        return record.assessment_plan.skill_standard_id
+    return AssessmentPlan.objects.filter(pk=plan_id).values_list('skill_standard_id', flat=True).first()
+
+
+def _record_key(values, record=None):
+    """认定记录对应的计数维度 (企业, 技能标准, 认定日期, 结果)"""
+    standard_id = _standard_id(values['assessment_plan_id'], record)
+    if standard_id is None:
+        return None
+    return values['enterprise_id'], standard_id, values['assessment_date'], values['result']
+
+
+def _current_values(record):
+    return {
+        'enterprise_id': record.enterprise_id,
+        'assessment_plan_id': record.assessment_plan_id,
+        'assessment_date': record.assessment_date,
+        'result': record.result,
+    }
+
+
+def _apply(key, delta):
+    """对一个计数行增减 delta 条记录"""
+    enterprise_id, standard_id, assessment_date, result = key
+    changes = {'total': F('total') + delta}
+    field = RESULT_FIELDS.get(result)
+    if field:
+        changes[field] = F(field) + delta
+    rows = AssessmentStatistic.objects.filter(
+        enterprise_id=enterprise_id, skill_standard_id=standard_id, assessment_date=assessment_date,
+    )
+    if rows.update(**changes) or delta < 0:
+        # 计数行不存在时不扣减（技能标准或企业已级联删除）
+        return
+    initial = {'total': delta, **({field: delta} if field else {})}
+    try:
+        with transaction.atomic():
+            AssessmentStatistic.objects.create(
+                enterprise_id=enterprise_id, skill_standard_id=standard_id, assessment_date=assessment_date,
+                **initial,
+            )
+    except IntegrityError:
+        # 并发请求已创建该计数行
+        rows.update(**changes)
+
+
+def record_saved(record, created):
+    """认定记录保存后更新统计计数"""
+    new_key = _record_key(_current_values(record), record)
+    loaded = getattr(record, '_loaded_stat_values', None)
+    old_key = None
+    if not created and loaded and len(loaded) == 4:
+        old_key = new_key if loaded == _current_values(record) else _record_key(loaded)
+    elif not created:
+        # 未经 from_db 加载的实例（如手工指定主键后保存）无法得知原值，只能重建该企业的统计
+        transaction.on_commit(lambda: rebuild(record.enterprise_id))
+        return
+    if old_key != new_key:
+        if old_key:
+            _apply(old_key, -1)
+        if new_key:
+            _apply(new_key, 1)
+    record._loaded_stat_values = _current_values(record)
+
+
+def record_deleted(record):
+    """认定记录删除后更新统计计数"""
+    values = getattr(record, '_loaded_stat_values', None) or _current_values(record)
+    key = _record_key(values, record)
+    if key:
+        _apply(key, -1)
+
+
+def rebuild(enterprise=None):
+    """从认定记录重新汇总统计计数，返回计数行数"""
+    records = AssessmentRecord.objects.all()
+    statistics = AssessmentStatistic.objects.all()
+    if enterprise is not None:
+        records = records.filter(enterprise=enterprise)
+        statistics = statistics.filter(enterprise=enterprise)
+    rows = records.values(
+        'enterprise_id', 'assessment_date', skill_standard_id=F('assessment_plan__skill_standard_id'),
+    ).annotate(
+        total=Count('id'),
+        **{field: Count('id', filter=Q(result=result)) for result, field in RESULT_FIELDS.items()},
+    ).order_by()
+    with transaction.atomic():
+        statistics.delete()
+        created = AssessmentStatistic.objects.bulk_create(
+            [AssessmentStatistic(**row) for row in rows], batch_size=500,
+        )
+    return len(created)
+
+
+def _with_rate(row):
+    row['pass_rate'] = round(row['passed'] * 100 / row['total'], 1) if row['total'] else 0
+    return row
+
+
+def summarize(enterprise, start=None, end=None):
+    """汇总企业在认定日期范围内的统计
+
+    返回 {'total':, 'passed':, 'failed':, 'absent':, 'pass_rate':,
+          'by_standard': [...], 'by_level': [...]}，by_standard 每个技能标准一行。
+    """
+    queryset = AssessmentStatistic.objects.filter(enterprise=enterprise)
+    if start:
+        queryset = queryset.filter(assessment_date__gte=start)
+    if end:
+        queryset = queryset.filter(assessment_date__lte=end)
+    sums = {field: Sum(field) for field in COUNTER_FIELDS}
+
+    summary = {field: value or 0 for field, value in queryset.aggregate(**sums).items()}
+    by_standard = queryset.values(
+        'skill_standard_id',
+        name=F('skill_standard__name'), code=F('skill_standard__code'), level=F('skill_standard__level'),
+    ).annotate(**sums).order_by('code', 'level', 'skill_standard_id')
+    by_level = queryset.values(level=F('skill_standard__level')).annotate(**sums).order_by('level')
+
+    summary['by_standard'] = [_with_rate(row) for row in by_standard]
+    summary['by_level'] = [_with_rate(row) for row in by_level]
+    return _with_rate(summary)
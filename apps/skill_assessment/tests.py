@@ -1,3 +1,147 @@
+from datetime import date
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
 
-# Create your tests here.
+from JYXT.core.testing import TenantTestMixin
+from enterprises.models import EnterpriseSubscription
+
+from . import statistics
+from .conf import CONFIG_OPTIONS, get_config
+from .models import (
+    AssessmentPlan, AssessmentRecord, AssessmentStatistic, SkillAssessmentConfig, SkillStandard,
+)
+
+
+class ConfigAccessorTests(TestCase):
+    """应用配置读取测试"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_defaults_and_type_coercion(self):
+        self.assertEqual(get_config().max_assessment_duration, 30)
+        SkillAssessmentConfig.objects.create(key='min_participants', value=' 25 ')
+        SkillAssessmentConfig.objects.create(key='max_assessment_duration', value='abc')
+        config = get_config()
+        self.assertEqual(config.min_participants, 25)
+        # 无法转换的值回退为默认值
+        with self.assertLogs('apps.skill_assessment.conf', 'WARNING'):
+            self.assertEqual(config.max_assessment_duration, 30)
+        with self.assertRaises(AttributeError):
+            config.unknown_option
+
+    def test_cached_until_config_changes(self):
+        item = SkillAssessmentConfig.objects.create(key='min_participants', value='5')
+        get_config()
+        with self.assertNumQueries(0):
+            self.assertEqual(get_config().min_participants, 5)
+        item.value = '8'
+        item.save()
+        self.assertEqual(get_config().min_participants, 8)
+        item.delete()
+        self.assertEqual(get_config().min_participants, CONFIG_OPTIONS['min_participants'].default)
+
+    def test_init_system_uses_declared_defaults(self):
+        call_command('init_system', stdout=StringIO())
+        self.assertEqual(
+            set(SkillAssessmentConfig.objects.values_list('key', flat=True)), set(CONFIG_OPTIONS)
+        )
+        self.assertEqual(get_config().max_assessment_duration, 30)
+        self.assertTrue(SkillAssessmentConfig.objects.get(key='system_version').is_system)
+
+
+class AssessmentStatisticsTests(TenantTestMixin, TestCase):
+    """认定统计测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise()
+        cls.welder = SkillStandard.objects.create(enterprise=cls.enterprise, name='焊工', code='6-18-02-04', level='四级')
+        cls.fitter = SkillStandard.objects.create(enterprise=cls.enterprise, name='钳工', code='6-18-01-01', level='三级')
+        cls.welder_plan = AssessmentPlan.objects.create(
+            enterprise=cls.enterprise, title='焊工认定', skill_standard=cls.welder, plan_date=date(2024, 3, 1),
+        )
+        cls.fitter_plan = AssessmentPlan.objects.create(
+            enterprise=cls.enterprise, title='钳工认定', skill_standard=cls.fitter, plan_date=date(2024, 4, 1),
+        )
+
+    def _record(self, plan, result, day):
+        return AssessmentRecord.objects.create(
+            enterprise=self.enterprise, assessment_plan=plan, participant_name='张三',
+            participant_id='110101199001011234', result=result, assessment_date=day,
+        )
+
+    def _counters(self):
+        return sorted(
+            AssessmentStatistic.objects.values_list('skill_standard__code', 'assessment_date', 'total', 'passed')
+        )
+
+    def test_counters_follow_record_writes(self):
+        record = self._record(self.welder_plan, 'passed', date(2024, 3, 1))
+        self._record(self.welder_plan, 'failed', date(2024, 3, 1))
+        self.assertEqual(self._counters(), [('6-18-02-04', date(2024, 3, 1), 2, 1)])
+
+        record = AssessmentRecord.objects.get(pk=record.pk)
+        record.result = 'absent'
+        record.assessment_plan = self.fitter_plan
+        record.save()
+        self.assertEqual(self._counters(), [
+            ('6-18-01-01', date(2024, 3, 1), 1, 0),
+            ('6-18-02-04', date(2024, 3, 1), 1, 0),
+        ])
+        AssessmentRecord.objects.filter(assessment_plan=self.welder_plan).delete()
+        self.assertEqual(self._counters(), [
+            ('6-18-01-01', date(2024, 3, 1), 1, 0),
+            ('6-18-02-04', date(2024, 3, 1), 0, 0),
+        ])
+
+        # 增量维护的结果与从认定记录重建的结果一致
+        before = self._counters()
+        statistics.rebuild(self.enterprise)
+        self.assertEqual([row for row in before if row[2]], self._counters())
+
+    def test_summary_grouped_by_standard_and_date_range(self):
+        for day in (date(2024, 3, 1), date(2024, 3, 2), date(2024, 5, 1)):
+            self._record(self.welder_plan, 'passed', day)
+            self._record(self.fitter_plan, 'failed', day)
+        with self.assertNumQueries(3):
+            summary = statistics.summarize(self.enterprise, start=date(2024, 3, 1), end=date(2024, 3, 31))
+        self.assertEqual((summary['total'], summary['passed'], summary['pass_rate']), (4, 2, 50.0))
+        self.assertEqual(
+            [(row['code'], row['total'], row['passed']) for row in summary['by_standard']],
+            [('6-18-01-01', 2, 0), ('6-18-02-04', 2, 2)],
+        )
+        self.assertEqual([(row['level'], row['pass_rate']) for row in summary['by_level']], [('三级', 0), ('四级', 100.0)])
+
+    def test_plan_standard_change_rebuilds(self):
+        self._record(self.welder_plan, 'passed', date(2024, 3, 1))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.welder_plan.skill_standard = self.fitter
+            self.welder_plan.save()
+        self.assertEqual(self._counters(), [('6-18-01-01', date(2024, 3, 1), 1, 1)])
+
+
+class SkillStandardApiTests(TenantTestMixin, TestCase):
+    """技能标准只读JSON接口测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        other = cls.create_enterprise('企业B')
+        cls.admin = cls.create_admin(cls.enterprise)
+        cls.standard = SkillStandard.objects.create(enterprise=cls.enterprise, name='电工', code='E01', level='一级')
+        SkillStandard.objects.create(enterprise=other, name='电工', code='E01', level='一级')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_requires_subscription_and_scoped_to_enterprise(self):
+        self.assertEqual(self.client.get('/api/v1/skill-standards/').status_code, 403)
+        EnterpriseSubscription.objects.create(enterprise=self.enterprise, app_code='skill_assessment', status='active')
+        cache.clear()
+        data = self.client.get('/api/v1/skill-standards/').json()
+        self.assertEqual([row['id'] for row in data['results']], [self.standard.pk])
@@ -21,10 +21,10 @@ urlpatterns = [
     path('assessment-plans/<int:pk>/', views.AssessmentPlanDetailView.as_view(), name='assessment_plan_detail'),
     path('assessment-plans/<int:pk>/update/', views.AssessmentPlanUpdateView.as_view(), name='assessment_plan_update'),
     
-    # 认定记录 - 暂时注释，因为相关视图已禁用
-    # path('assessment-records/', views.AssessmentRecordListView.as_view(), name='assessment_record_list'),
-    # path('assessment-records/create/', views.AssessmentRecordCreateView.as_view(), name='assessment_record_create'),
-    # path('assessment-records/<int:pk>/update/', views.AssessmentRecordUpdateView.as_view(), name='assessment_record_update'),
+    # 认定记录
+    path('assessment-records/', views.AssessmentRecordListView.as_view(), name='assessment_record_list'),
+    path('assessment-records/create/', views.AssessmentRecordCreateView.as_view(), name='assessment_record_create'),
+    path('assessment-records/<int:pk>/update/', views.AssessmentRecordUpdateView.as_view(), name='assessment_record_update'),
     
     # 统计分析
     path('statistics/', views.AssessmentStatisticsView.as_view(), name='statistics'),
@@ -3,7 +3,10 @@ from django.urls import reverse_lazy
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, TemplateView
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from .models import SkillStandard, AssessmentPlan
+from JYXT.core.pagination import KeysetPaginationMixin
+from . import statistics
+from .forms import StatisticsFilterForm
+from .models import SkillStandard, AssessmentPlan, AssessmentRecord
 
 # 使用简单的视图基类，先让系统运行起来
 class BaseView(LoginRequiredMixin):
@@ -13,20 +16,11 @@ class BaseView(LoginRequiredMixin):
 class SkillAssessmentDashboardView(BaseView, TemplateView):
     """职业技能认定仪表盘"""
     template_name = 'skill_assessment/dashboard.html'
+    replica_reads = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        enterprise = getattr(self.request, 'enterprise', None)
-        
-        if enterprise:
-            # 统计信息
-            context['total_standards'] = SkillStandard.objects.filter(enterprise=enterprise).count()
-            context['active_plans'] = AssessmentPlan.objects.filter(
-                enterprise=enterprise, 
-            ).count()
-            # 由于AssessmentRecord模型已被删除，暂时使用默认值
-            context['total_records'] = 0
-        
+        # 技能标准、认定计划、认定记录的统计由仪表盘小部件提供（见 widgets.py）
         return context
 
 # 技能标准相关视图
@@ -131,85 +125,91 @@ class AssessmentPlanDetailView(BaseView, DetailView):
     model = AssessmentPlan
     template_name = 'skill_assessment/assessment_plan_detail.html'
 
-# 认定记录相关视图 - 暂时注释，因为AssessmentRecord模型不存在
-# class AssessmentRecordListView(BaseView, ListView):
-#     """认定记录列表"""
-#     model = AssessmentRecord
-#     template_name = 'skill_assessment/assessment_record_list.html'
-#     context_object_name = 'assessment_records'
-#     
-#     def get_queryset(self):
-#         enterprise = getattr(self.request, 'enterprise', None)
-#         if enterprise:
-#             return AssessmentRecord.objects.filter(enterprise=enterprise)
-#         return AssessmentRecord.objects.none()
-# 
-# class AssessmentRecordCreateView(BaseView, CreateView):
-#     """创建认定记录"""
-#     model = AssessmentRecord
-#     template_name = 'skill_assessment/assessment_record_form.html'
-#     fields = ['assessment_plan', 'participant_name', 'participant_id', 'score', 'result']
-#     
-#     def form_valid(self, form):
-#         enterprise = getattr(self.request, 'enterprise', None)
-#         if enterprise:
-#             form.instance.enterprise = enterprise
-#             messages.success(self.request, "认定记录创建成功")
-#             return super().form_valid(form)
-#         else:
-#             messages.error(self.request, "请先选择企业")
-#             return self.form_invalid(form)
-#     
-#     def get_success_url(self):
-#         return reverse_lazy('skill_assessment:assessment_record_list')
-#     
-#     def get_form(self, form_class=None):
-#         form = super().get_form(form_class)
-#         # 只显示当前企业的认定计划
-#         enterprise = getattr(self.request, 'enterprise', None)
-#         if enterprise:
-#             form.fields['assessment_plan'].queryset = AssessmentPlan.objects.filter(enterprise=enterprise)
-#         return form
-# 
-# class AssessmentRecordUpdateView(BaseView, UpdateView):
-#     """更新认定记录"""
-#     model = AssessmentRecord
-#     template_name = 'skill_assessment/assessment_record_form.html'
-#     fields = ['assessment_plan', 'participant_name', 'participant_id', 'score', 'result']
-#     
-#     def get_success_url(self):
-#         messages.success(self.request, "认定记录更新成功")
-#         return reverse_lazy('skill_assessment:assessment_record_list')
+# 认定记录相关视图
+class AssessmentRecordListView(BaseView, KeysetPaginationMixin, ListView):
+    """认定记录列表"""
+    model = AssessmentRecord
+    template_name = 'skill_assessment/assessment_record_list.html'
+    context_object_name = 'assessment_records'
+    paginate_by = 50
+    paginate_count = False
+    keyset_ordering = ('-assessment_date', '-id')
+    
+    def get_queryset(self):
+        enterprise = getattr(self.request, 'enterprise', None)
+        if enterprise:
+            return AssessmentRecord.objects.filter(enterprise=enterprise).select_related(
+                'assessment_plan__skill_standard'
+            )
+        return AssessmentRecord.objects.none()
+
+class AssessmentRecordFormMixin:
+    """认定记录表单（只能选择当前企业的认定计划）"""
+    model = AssessmentRecord
+    template_name = 'skill_assessment/assessment_record_form.html'
+    fields = ['assessment_plan', 'participant_name', 'participant_id', 'participant_department',
+              'assessment_date', 'score', 'result', 'comments', 'certificate_number']
+    
+    def get_queryset(self):
+        enterprise = getattr(self.request, 'enterprise', None)
+        if enterprise:
+            return AssessmentRecord.objects.filter(enterprise=enterprise)
+        return AssessmentRecord.objects.none()
+    
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        enterprise = getattr(self.request, 'enterprise', None)
+        form.fields['assessment_plan'].queryset = AssessmentPlan.objects.filter(enterprise=enterprise)
+        form.fields['assessment_date'].widget.input_type = 'date'
+        for field in form.fields.values():
+            field.widget.attrs.setdefault('class', 'form-control')
+        return form
+    
+    def get_success_url(self):
+        return reverse_lazy('skill_assessment:assessment_record_list')
+
+class AssessmentRecordCreateView(BaseView, AssessmentRecordFormMixin, CreateView):
+    """创建认定记录"""
+    
+    def form_valid(self, form):
+        enterprise = getattr(self.request, 'enterprise', None)
+        if enterprise:
+            form.instance.enterprise = enterprise
+            messages.success(self.request, "认定记录创建成功")
+            return super().form_valid(form)
+        else:
+            messages.error(self.request, "请先选择企业")
+            return self.form_invalid(form)
+
+class AssessmentRecordUpdateView(BaseView, AssessmentRecordFormMixin, UpdateView):
+    """更新认定记录"""
+    
+    def form_valid(self, form):
+        messages.success(self.request, "认定记录更新成功")
+        return super().form_valid(form)
 
 class AssessmentStatisticsView(BaseView, TemplateView):
-    """认定统计"""
+    """认定统计（读取预先汇总的统计计数，按技能标准、等级分组）"""
     template_name = 'skill_assessment/statistics.html'
+    replica_reads = True
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         enterprise = getattr(self.request, 'enterprise', None)
+        form = StatisticsFilterForm(self.request.GET or None)
+        context['filter_form'] = form
         
         if enterprise:
-            # 基础统计 - 暂时注释，因为AssessmentRecord模型不存在
-            # total_records = AssessmentRecord.objects.filter(enterprise=enterprise)
-            # context['total_count'] = total_records.count()
-            # context['passed_count'] = total_records.filter(result='passed').count()
-            
-            # 按技能标准统计 - 暂时注释，因为AssessmentRecord模型不存在
-            # skill_stats = []
-            # standards = SkillStandard.objects.filter(enterprise=enterprise)
-            # for standard in standards:
-            #     records = total_records.filter(assessment_plan__skill_standard=standard)
-            #     if records.exists():
-            #         skill_stats.append({
-            #             'standard': standard,
-            #             'total': records.count(),
-            #             'passed': records.filter(result='passed').count(),
-            #         })
-            
-            # 提供默认值避免模板错误
+            dates = form.cleaned_data if form.is_valid() else {}
+            summary = statistics.summarize(enterprise, dates.get('start'), dates.get('end'))
+            context['total_count'] = summary['total']
+            context['passed_count'] = summary['passed']
+            context['pass_rate'] = summary['pass_rate']
+            context['skill_stats'] = summary['by_standard']
+            context['level_stats'] = summary['by_level']
+        else:
             context['total_count'] = 0
             context['passed_count'] = 0
             context['skill_stats'] = []
         
-        return context
\ No newline at end of file
+        return context
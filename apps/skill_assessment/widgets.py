@@ -0,0 +1,66 @@
+# apps/skill_assessment/widgets.py
+"""职业技能认定仪表盘小部件"""
+from django.db.models import Sum
+
+from JYXT.core.widgets import CountWidget, widget_registry
+
+from .models import AssessmentPlan, AssessmentStatistic, SkillStandard
+
+
+@widget_registry.register
+class SkillStandardCountWidget(CountWidget):
+    """技能标准数量"""
+    code = 'skill_assessment.standards'
+    dashboard = 'skill_assessment'
+    title = '技能标准'
+    order = 10
+    app_code = 'skill_assessment'
+    depends_on = ['skill_assessment.SkillStandard']
+    icon = 'fas fa-graduation-cap'
+    color = 'info'
+    url_name = 'skill_assessment:skill_standard_list'
+
+    def get_queryset(self, enterprise):
+        return SkillStandard.objects.filter(enterprise=enterprise)
+
+
+@widget_registry.register
+class AssessmentPlanCountWidget(CountWidget):
+    """认定计划数量"""
+    code = 'skill_assessment.plans'
+    dashboard = 'skill_assessment'
+    title = '认定计划'
+    order = 20
+    app_code = 'skill_assessment'
+    depends_on = ['skill_assessment.AssessmentPlan']
+    icon = 'fas fa-calendar-alt'
+    color = 'success'
+    url_name = 'skill_assessment:assessment_plan_list'
+
+    def get_queryset(self, enterprise):
+        return AssessmentPlan.objects.filter(enterprise=enterprise)
+
+
+@widget_registry.register
+class AssessmentRecordCountWidget(CountWidget):
+    """认定记录数量（由认定统计计数汇总）"""
+    code = 'skill_assessment.records'
+    dashboard = 'skill_assessment'
+    title = '认定记录'
+    order = 30
+    app_code = 'skill_assessment'
+    depends_on = ['skill_assessment.AssessmentRecord']
+    icon = 'fas fa-clipboard-list'
+    color = 'warning'
+    url_name = 'skill_assessment:assessment_record_list'
+
+    def get_queryset(self, enterprise):
+        return AssessmentStatistic.objects.filter(enterprise=enterprise)
+
+    def compute(self, enterprise):
+        total = self.get_queryset(enterprise).aggregate(total=Sum('total'))['total']
+        return {'value': total or 0}
+
+    async def acompute(self, enterprise):
+        total = (await self.get_queryset(enterprise).aaggregate(total=Sum('total')))['total']
+        return {'value': total or 0}
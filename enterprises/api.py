@@ -0,0 +1,57 @@
+# enterprises/api.py
+"""企业、部门的只读接口"""
+from JYXT.core.api import ApiView
+from JYXT.core.tenant import get_enterprise_choices
+
+from .models import Department, Enterprise
+
+
+class EnterpriseApiView(ApiView):
+    """用户任职的企业（系统管理员为全部企业）"""
+    model = Enterprise
+    required_role = None
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'unified_social_credit_code': 'unified_social_credit_code',
+        'enterprise_type': 'enterprise_type',
+        'legal_representative': 'legal_representative',
+        'contact_address': 'contact_address',
+        'contact_phone': 'contact_phone',
+        'contact_email': 'contact_email',
+        'website': 'website',
+        'logo': 'logo',
+        'is_active': 'is_active',
+        'updated_at': 'updated_at',
+    }
+
+    def get_queryset(self):
+        if self.request.user.is_superuser:
+            return Enterprise.objects.all()
+        # 在职企业列表登录时已存入session
+        return Enterprise.objects.filter(pk__in=[choice['id'] for choice in get_enterprise_choices(self.request)])
+
+    def serialize(self, row, fields):
+        data = super().serialize(row, fields)
+        if 'logo' in data:
+            data['logo'] = Enterprise._meta.get_field('logo').storage.url(data['logo']) if data['logo'] else ''
+        return data
+
+
+class DepartmentApiView(ApiView):
+    """当前企业的部门"""
+    model = Department
+    fields = {
+        'id': 'id',
+        'name': 'name',
+        'code': 'code',
+        'full_name': 'full_name',
+        'parent': 'parent_id',
+        'manager': 'manager_id',
+        'description': 'description',
+        'is_active': 'is_active',
+        'updated_at': 'updated_at',
+    }
+
+    def get_queryset(self):
+        return Department.objects.filter(enterprise=self.request.enterprise)
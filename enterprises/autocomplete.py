@@ -0,0 +1,20 @@
+# enterprises/autocomplete.py
+"""部门选择框的自动补全来源"""
+from JYXT.core.autocomplete import AutocompleteSource, autocomplete_registry
+
+from .models import Department
+
+
+@autocomplete_registry.register
+class DepartmentSource(AutocompleteSource):
+    """企业内启用的部门，按部门名称前缀匹配，显示完整路径"""
+    name = 'enterprises.departments'
+    search_fields = ['name']
+    depends_on = ['enterprises.Department']
+
+    def get_queryset(self, enterprise):
+        return Department.objects.filter(enterprise=enterprise, is_active=True)
+
+    def get_results(self, queryset):
+        for pk, name, full_name in queryset.values_list('id', 'name', 'full_name'):
+            yield {'id': pk, 'text': full_name or name}
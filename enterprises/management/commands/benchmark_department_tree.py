@@ -0,0 +1,128 @@
+# enterprises/management/commands/benchmark_department_tree.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from enterprises.models import Department, Enterprise
+from staff.models import Staff
+
+
+class _Rollback(Exception):
+    """用于在基准测试结束后回滚全部合成数据"""
+
+
+class Command(BaseCommand):
+    help = '部门子树用户查询基准测试（在事务中生成合成企业数据，结束后回滚）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--departments', type=int, default=5000, help='部门数量（默认5000）')
+        parser.add_argument('--staff', type=int, default=100000, help='员工数量（默认100000）')
+        parser.add_argument('--branching', type=int, default=8, help='每个部门的子部门数（默认8）')
+        parser.add_argument('--repeat', type=int, default=5, help='每项测试重复次数（默认5）')
+        parser.add_argument('--legacy', action='store_true', help='同时测试逐个部门递归查询的旧实现')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                enterprise = self._build_dataset(options)
+                self._run(enterprise, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+        self.stdout.write(self.style.SUCCESS('基准测试完成，合成数据已回滚'))
+
+    def _build_dataset(self, options):
+        started = time.perf_counter()
+        enterprise = Enterprise.objects.create(
+            name=f'基准测试企业{int(started * 1000)}',
+            unified_social_credit_code=f'BENCH{int(started * 1000) % 10 ** 13:013d}',
+        )
+
+        # 按层级批量创建部门树：第 i 个部门的上级是第 (i-1)//branching 个部门
+        branching = options['branching']
+        departments = []
+        level = [Department(name='部门0', enterprise=enterprise)]
+        while level:
+            Department.objects.bulk_create(level, batch_size=1000)
+            departments.extend(level)
+            next_level = []
+            for parent in level:
+                for _ in range(branching):
+                    if len(departments) + len(next_level) >= options['departments']:
+                        break
+                    index = len(departments) + len(next_level)
+                    next_level.append(Department(name=f'部门{index}', enterprise=enterprise, parent=parent))
+            level = next_level
+        if departments[0].pk is None:
+            departments = list(Department.objects.filter(enterprise=enterprise).order_by('pk'))
+        Department.rebuild_paths(Department.objects.filter(enterprise=enterprise))
+
+        # 批量创建用户和员工，均匀分布到各部门
+        prefix = enterprise.unified_social_credit_code
+        users = User.objects.bulk_create(
+            [User(username=f'{prefix}_{i}', password='!') for i in range(options['staff'])],
+            batch_size=2000,
+        )
+        if users and users[0].pk is None:
+            users = list(User.objects.filter(username__startswith=f'{prefix}_').order_by('pk'))
+        Staff.objects.bulk_create(
+            [
+                Staff(user=user, enterprise=enterprise, department=departments[i % len(departments)])
+                for i, user in enumerate(users)
+            ],
+            batch_size=2000,
+        )
+
+        self.stdout.write(
+            f'生成数据：{len(departments)} 个部门，{len(users)} 名员工，'
+            f'耗时 {time.perf_counter() - started:.1f}s'
+        )
+        return enterprise
+
+    def _measure(self, label, func, repeat):
+        timings = []
+        result = None
+        for _ in range(repeat):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                result = func()
+                timings.append(time.perf_counter() - started)
+        timings.sort()
+        self.stdout.write(
+            f'{label:<32} 结果={result:<8} SQL数={len(queries):<6} '
+            f'中位数={timings[len(timings) // 2] * 1000:.1f}ms 最小={timings[0] * 1000:.1f}ms'
+        )
+
+    def _run(self, enterprise, options):
+        repeat = options['repeat']
+        departments = Department.objects.filter(enterprise=enterprise)
+        root = departments.get(parent__isnull=True)
+        middle = departments.filter(depth=1).first() or root
+        leaf = departments.order_by('-depth', 'pk').first()
+
+        for label, department in (('根部门', root), ('二级部门', middle), ('末级部门', leaf)):
+            self._measure(f'{label} 用户数', department.get_department_user_count, repeat)
+            self._measure(
+                f'{label} 用户ID列表',
+                lambda d=department: len(list(d.get_department_users().values_list('id', flat=True))),
+                repeat,
+            )
+        self._measure(
+            '根部门 各子部门用户数',
+            lambda: len(list(root.children.with_user_count().values_list('pk', 'user_count'))),
+            repeat,
+        )
+
+        if options['legacy']:
+            self._measure('旧实现 二级部门子部门递归', lambda: len(self._legacy_children(middle)), 1)
+
+    def _legacy_children(self, department):
+        """旧实现：每个部门一次查询递归获取子部门"""
+        children = []
+        for child in department.children.all():
+            children.append(child)
+            children.extend(self._legacy_children(child))
+        return children
@@ -0,0 +1,22 @@
+# enterprises/management/commands/rebuild_department_paths.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from enterprises.models import Department
+
+class Command(BaseCommand):
+    help = '回填/重建部门的物化路径（层级路径、层级深度、完整名称）'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--enterprise', type=int, help='只重建指定企业ID的部门')
+    
+    def handle(self, *args, **options):
+        queryset = Department.objects.all()
+        if options.get('enterprise'):
+            queryset = queryset.filter(enterprise_id=options['enterprise'])
+        
+        with transaction.atomic():
+            updated = Department.rebuild_paths(queryset)
+        
+        self.stdout.write(
+            self.style.SUCCESS(f'部门路径重建完成，共更新 {updated} 个部门')
+        )
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.6 on 2026-10-17 13:35
+
+from django.db import migrations, models
+
+
+def backfill_department_paths(apps, schema_editor):
+    """按层级回填已有部门的物化路径"""
+    Department = apps.get_model('enterprises', 'Department')
+    departments = list(Department.objects.all())
+    children = {}
+    for department in departments:
+        children.setdefault(department.parent_id, []).append(department)
+    
+    queue = list(children.get(None, []))
+    parents = {}
+    for department in queue:
+        parent = parents.get(department.parent_id)
+        if parent is None:
+            department.path, department.depth, department.full_name = f'/{department.pk}/', 0, department.name
+        else:
+            department.path = f'{parent.path}{department.pk}/'
+            department.depth = parent.depth + 1
+            department.full_name = f'{parent.full_name} - {department.name}'
+        parents[department.pk] = department
+        queue.extend(children.get(department.pk, []))
+    
+    Department.objects.bulk_update(queue, ['path', 'depth', 'full_name'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0005_department'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='department',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name='层级深度'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='full_name',
+            field=models.CharField(blank=True, default='', editable=False, help_text='包含上级部门的完整名称，如：公司总部 - 技术部 - 前端开发组', max_length=1000, verbose_name='完整名称'),
+        ),
+        migrations.AddField(
+            model_name='department',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, help_text='从根部门到本部门的ID路径，如 /1/5/9/', max_length=255, verbose_name='层级路径'),
+        ),
+        migrations.RunPython(backfill_department_paths, migrations.RunPython.noop),
+    ]
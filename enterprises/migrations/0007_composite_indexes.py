@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0006_department_materialized_path'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['enterprise', 'parent', 'is_active'], name='departments_children_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='enterprisesubscription',
+            index=models.Index(fields=['enterprise', 'status', 'app_code'], name='ent_subs_status_idx'),
+        ),
+    ]
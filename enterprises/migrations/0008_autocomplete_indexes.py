@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0007_composite_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['enterprise', 'name'], name='departments_name_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:59
+
+import enterprises.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0008_autocomplete_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='department',
+            name='path',
+            field=enterprises.models.PathField(blank=True, db_index=True, default='', editable=False, help_text='从根部门到本部门的ID路径，如 /1/5/9/', max_length=255, verbose_name='层级路径'),
+        ),
+    ]
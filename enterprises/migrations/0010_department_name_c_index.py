@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# 部门名称自动补全：PostgreSQL 下前缀范围条件和排序按 "C" 排序规则（见 JYXT.core.autocomplete.prefix_q），
+# 需要相同排序规则的表达式索引；SQLite 的 (enterprise, name) 索引本身即按字节序
+CREATE_SQL = 'CREATE INDEX IF NOT EXISTS departments_name_c_idx ON departments (enterprise_id, (name COLLATE "C"))'
+DROP_SQL = 'DROP INDEX IF EXISTS departments_name_c_idx'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0009_department_path_collation'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-17 15:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0010_department_name_c_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='department',
+            index=models.Index(fields=['enterprise', 'path'], name='departments_tree_idx'),
+        ),
+    ]
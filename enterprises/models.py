@@ -1,6 +1,56 @@
 # enterprises/models.py
 from django.db import models
 from django.core.validators import RegexValidator
+from django.core.exceptions import ValidationError
+from django.db.models.functions import Coalesce, Concat, Length, Now, Substr
+
+
+class PathField(models.CharField):
+    """物化路径字段：按字节序比较
+
+    子树查询使用 [路径, 路径去掉末尾'/'后加'0') 的范围条件，依赖'/'排在数字之前的字节序。
+    PostgreSQL 的默认排序规则（如 zh_CN.UTF-8）会忽略标点，因此该列使用 "C" 排序规则（索引也随之按字节序）；
+    SQLite 的默认排序规则 BINARY 本身就是字节序。
+    """
+    
+    def db_parameters(self, connection):
+        db_params = super().db_parameters(connection)
+        if connection.vendor == 'postgresql' and not self.db_collation:
+            db_params['collation'] = 'C'
+        return db_params
+
+
+def _subtree_upper_bound(path):
+    """子树路径范围的上界表达式：路径去掉末尾'/'后加'0'（与 Department.subtree_q 一致）"""
+    return Concat(Substr(path, 1, Length(path) - 1), models.Value('0'), output_field=models.CharField())
+
+
+class DepartmentQuerySet(models.QuerySet):
+    """部门查询集"""
+    
+    def visible(self):
+        """启用且所有上级部门也都启用的部门（停用部门的下级不显示）"""
+        inactive_ancestors = Department.objects.filter(
+            enterprise=models.OuterRef('enterprise'),
+            is_active=False,
+            path__lte=models.OuterRef('path'),
+        ).annotate(
+            path_upper=_subtree_upper_bound('path')
+        ).filter(path_upper__gt=models.OuterRef('path'))
+        return self.filter(is_active=True).exclude(models.Exists(inactive_ancestors))
+    
+    def with_user_count(self):
+        """附加各部门（含下级部门）的用户数（user_count），每行一个走路径索引的范围子查询"""
+        from staff.models import Staff
+        
+        staff_count = Staff.objects.filter(
+            enterprise=models.OuterRef('enterprise'),
+            department__path__gte=models.OuterRef('path'),
+            department__path__lt=_subtree_upper_bound(models.OuterRef('path')),
+        ).order_by().annotate(
+            total=models.Func(models.F('id'), function='COUNT')
+        ).values('total')
+        return self.annotate(user_count=Coalesce(models.Subquery(staff_count), 0))
 
 class Department(models.Model):
     """企业部门模型"""
@@ -71,55 +121,242 @@ class Department(models.Model):
         help_text='停用后，部门将不会在列表中显示'
     )
     
+    # 物化路径（由save维护，不可手工编辑）
+    path = PathField(
+        '层级路径',
+        max_length=255,
+        blank=True,
+        default='',
+        db_index=True,
+        editable=False,
+        help_text='从根部门到本部门的ID路径，如 /1/5/9/'
+    )
+    depth = models.PositiveSmallIntegerField('层级深度', default=0, editable=False)
+    full_name = models.CharField(
+        '完整名称',
+        max_length=1000,
+        blank=True,
+        default='',
+        editable=False,
+        help_text='包含上级部门的完整名称，如：公司总部 - 技术部 - 前端开发组'
+    )
+    
     # 时间戳
     created_at = models.DateTimeField('创建时间', auto_now_add=True)
     updated_at = models.DateTimeField('更新时间', auto_now=True)
     
+    # 完整名称中的层级分隔符
+    PATH_SEPARATOR = ' - '
+    
+    objects = DepartmentQuerySet.as_manager()
+    
     class Meta:
         db_table = 'departments'
         verbose_name = '部门'
         verbose_name_plural = '部门管理'
         unique_together = ['name', 'enterprise', 'parent']  # 确保同一企业下同一父部门中部门名称唯一
         ordering = ['name']
+        indexes = [
+            # 企业内某个部门的（启用的）下级部门
+            models.Index(fields=['enterprise', 'parent', 'is_active'], name='departments_children_idx'),
+            # 自动补全按部门名称前缀查找
+            models.Index(fields=['enterprise', 'name'], name='departments_name_idx'),
+            # 部门列表按层级（路径）顺序翻页
+            models.Index(fields=['enterprise', 'path'], name='departments_tree_idx'),
+        ]
     
     def __str__(self):
         # 显示完整的部门路径，包括父部门
-        if self.parent:
-            return f"{self.parent} - {self.name}"
-        return self.name
+        return self.full_path
     
     @property
     def full_path(self):
         """获取部门的完整路径，如：公司总部 - 技术部 - 前端开发组"""
+        if self.full_name:
+            return self.full_name
         if self.parent:
-            return f"{self.parent.full_path} - {self.name}"
+            return f"{self.parent.full_path}{self.PATH_SEPARATOR}{self.name}"
         return self.name
     
+    @staticmethod
+    def subtree_q(path, prefix=''):
+        """匹配路径 path 下整棵子树（含自身）的查询条件
+
+        以范围查询代替 LIKE，任何数据库都能使用路径索引：
+        路径以'/'结尾，而'0'是'/'之后的下一个字符，
+        因此 [path, path去掉末尾'/'后加'0') 恰好覆盖该子树的所有路径。
+        """
+        return models.Q(**{
+            f'{prefix}path__gte': path,
+            f'{prefix}path__lt': path[:-1] + '0',
+        })
+    
+    @property
+    def ancestor_ids(self):
+        """上级部门ID列表，从根部门开始（不含自身）"""
+        return [int(part) for part in self.path.strip('/').split('/')[:-1] if part]
+    
+    def _compute_tree_fields(self):
+        """根据上级部门计算本部门的路径、深度和完整名称"""
+        parent = self.parent
+        if parent is None:
+            return f'/{self.pk}/', 0, self.name
+        if parent.path:
+            parent_path, parent_depth, parent_full_name = parent.path, parent.depth, parent.full_name
+        else:
+            # 上级部门尚未回填路径（见 rebuild_department_paths 命令）
+            parent_path, parent_depth, parent_full_name = parent._compute_tree_fields()
+        return (
+            f'{parent_path}{self.pk}/',
+            parent_depth + 1,
+            f'{parent_full_name}{self.PATH_SEPARATOR}{self.name}',
+        )
+    
+    def save(self, *args, **kwargs):
+        """保存部门，同时维护本部门及所有下级部门的物化路径"""
+        if self.pk is None:
+            super().save(*args, **kwargs)
+            self.path, self.depth, self.full_name = self._compute_tree_fields()
+            Department.objects.filter(pk=self.pk).update(
+                path=self.path, depth=self.depth, full_name=self.full_name
+            )
+            return
+        
+        old_path, old_depth, old_full_name = self.path, self.depth, self.full_name
+        self.path, self.depth, self.full_name = self._compute_tree_fields()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'path', 'depth', 'full_name'}
+        super().save(*args, **kwargs)
+        
+        # 移动或改名后，用一条UPDATE改写所有下级部门的路径前缀（同时更新修改时间，接口的ETag随之变化）
+        if old_path and (old_path, old_full_name) != (self.path, self.full_name):
+            Department.objects.filter(self.subtree_q(old_path)).exclude(pk=self.pk).update(
+                path=Concat(models.Value(self.path), Substr('path', len(old_path) + 1)),
+                depth=models.F('depth') + (self.depth - old_depth),
+                full_name=Concat(models.Value(self.full_name), Substr('full_name', len(old_full_name) + 1)),
+                updated_at=Now(),
+            )
+        
+        # 会话中的在职企业列表带有员工的部门名称，改名或移动后递增本企业的部门版本号使其重新计算
+        if old_full_name != self.full_name:
+            from JYXT.core import tenant
+            
+            tenant.invalidate_departments(self.enterprise_id)
+    
+    def clean(self):
+        """校验上级部门：必须属于同一企业，且不能是自身或自己的下级部门"""
+        super().clean()
+        parent = self.parent
+        if parent is None:
+            return
+        if self.enterprise_id and parent.enterprise_id != self.enterprise_id:
+            raise ValidationError({'parent': '上级部门必须属于同一企业'})
+        if self.pk and self.path and parent.path.startswith(self.path):
+            raise ValidationError({'parent': '上级部门不能是本部门或其下级部门'})
+    
+    def get_descendants(self, include_self=False):
+        """获取所有下级部门的查询集（一条查询，按层级路径排序）"""
+        queryset = Department.objects.filter(self.subtree_q(self.path))
+        if not include_self:
+            queryset = queryset.exclude(pk=self.pk)
+        return queryset.order_by('path')
+    
+    def get_ancestors(self):
+        """获取所有上级部门的查询集，从根部门开始（一条查询）"""
+        return Department.objects.filter(pk__in=self.ancestor_ids).order_by('depth')
+    
     def get_all_children(self):
         """获取所有子部门（包括子部门的子部门）"""
-        children = []
-        for child in self.children.all():
-            children.append(child)
-            children.extend(child.get_all_children())
-        return children
+        return list(self.get_descendants())
+    
+    @classmethod
+    def rebuild_paths(cls, queryset=None):
+        """按层级重新计算部门的物化路径（用于回填历史数据），返回更新的部门数"""
+        from django.utils import timezone
+        
+        now = timezone.now()
+        departments = list((queryset if queryset is not None else cls.objects.all()).order_by())
+        children = {}
+        for department in departments:
+            children.setdefault(department.parent_id, []).append(department)
+        by_id = {department.pk: department for department in departments}
+        
+        changed = []
+        # 从根部门（或上级不在本批次中的部门）开始广度优先遍历
+        queue = [d for d in departments if d.parent_id is None or d.parent_id not in by_id]
+        for department in queue:
+            parent = by_id.get(department.parent_id)
+            if parent is None and department.parent_id is not None:
+                parent = cls.objects.get(pk=department.parent_id)
+            if parent is None:
+                values = (f'/{department.pk}/', 0, department.name)
+            else:
+                values = (
+                    f'{parent.path}{department.pk}/',
+                    parent.depth + 1,
+                    f'{parent.full_name}{cls.PATH_SEPARATOR}{department.name}',
+                )
+            if values != (department.path, department.depth, department.full_name):
+                department.path, department.depth, department.full_name = values
+                department.updated_at = now
+                changed.append(department)
+            queue.extend(children.get(department.pk, []))
+        
+        # bulk_update 不会自动更新 auto_now 字段
+        cls.objects.bulk_update(changed, ['path', 'depth', 'full_name', 'updated_at'], batch_size=500)
+        return len(changed)
+    
+    def get_department_staff(self):
+        """获取该部门及其所有子部门的员工（一条SQL，与部门树大小无关）"""
+        from staff.models import Staff
+        
+        return Staff.objects.filter(
+            self.subtree_q(self.path, prefix='department__'),
+            enterprise_id=self.enterprise_id,
+        )
     
     def get_department_users(self):
         """获取该部门及其所有子部门的用户"""
         from accounts.models import User
-        from staff.models import Staff
         
-        # 获取当前部门的用户
-        staff_members = Staff.objects.filter(department=self, enterprise=self.enterprise)
-        user_ids = staff_members.values_list('user_id', flat=True)
-        users = User.objects.filter(id__in=user_ids)
+        return User.objects.filter(id__in=self.get_department_staff().values('user_id'))
+    
+    def get_department_user_count(self):
+        """统计该部门及其所有子部门的用户数，不加载用户对象"""
+        return self.get_department_staff().values('user_id').distinct().count()
+
+class EnterpriseQuerySet(models.QuerySet):
+    """企业查询集 - 以子查询批量附加列表页需要的关联信息，避免逐个企业查询"""
+    
+    def with_admin_username(self):
+        """附加企业管理员用户名（admin_username），没有管理员时为'-'"""
+        from accounts.models import User
+        
+        admin_username = User.objects.filter(
+            staff_members__enterprise=models.OuterRef('pk'),
+            user_type=User.ENTERPRISE_ADMIN,
+        ).order_by('pk').values('username')[:1]
+        return self.annotate(
+            admin_username=Coalesce(models.Subquery(admin_username), models.Value('-'))
+        )
+    
+    def with_counts(self):
+        """附加员工数（staff_count）、部门数（department_count）和有效订阅数（active_subscription_count）"""
+        from staff.models import Staff
         
-        # 获取所有子部门的用户
-        for child in self.get_all_children():
-            child_staff_members = Staff.objects.filter(department=child, enterprise=self.enterprise)
-            child_user_ids = child_staff_members.values_list('user_id', flat=True)
-            users = users | User.objects.filter(id__in=child_user_ids)
+        def count_of(queryset):
+            counted = queryset.filter(enterprise=models.OuterRef('pk')).order_by().values(
+                'enterprise'
+            ).annotate(total=models.Count('pk')).values('total')
+            return Coalesce(models.Subquery(counted, output_field=models.IntegerField()), 0)
         
-        return users
+        active_subscriptions = EnterpriseSubscription.objects.active()
+        return self.annotate(
+            staff_count=count_of(Staff.objects.all()),
+            department_count=count_of(Department.objects.all()),
+            active_subscription_count=count_of(active_subscriptions),
+        )
 
 class Enterprise(models.Model):
     """企业模型 - 基于营业执照信息"""
@@ -166,6 +403,8 @@ class Enterprise(models.Model):
     created_at = models.DateTimeField('创建时间', auto_now_add=True)
     updated_at = models.DateTimeField('更新时间', auto_now=True)
     
+    objects = EnterpriseQuerySet.as_manager()
+    
     class Meta:
         db_table = 'enterprises'
         verbose_name = '企业'
@@ -204,6 +443,18 @@ class Enterprise(models.Model):
         
         return username
 
+class EnterpriseSubscriptionQuerySet(models.QuerySet):
+    """企业订阅查询集"""
+    
+    def active(self):
+        """有效的订阅：状态为激活且未过期（与 EnterpriseSubscription.is_active 一致）"""
+        from django.utils import timezone
+        
+        return self.filter(
+            models.Q(expires_at__isnull=True) | models.Q(expires_at__gte=timezone.now()),
+            status='active',
+        )
+
 class EnterpriseSubscription(models.Model):
     """企业应用订阅关系"""
     SUBSCRIPTION_STATUS = [
@@ -220,11 +471,17 @@ class EnterpriseSubscription(models.Model):
     expires_at = models.DateTimeField('过期时间', null=True, blank=True)
     config = models.JSONField('配置', default=dict, blank=True)
     
+    objects = EnterpriseSubscriptionQuerySet.as_manager()
+    
     class Meta:
         db_table = 'enterprise_subscriptions'
         verbose_name = '企业订阅'
         verbose_name_plural = '企业订阅管理'
         unique_together = ['enterprise', 'app_code']
+        indexes = [
+            # 企业有效订阅的应用代码（按企业和状态过滤，只读索引即可得到应用代码）
+            models.Index(fields=['enterprise', 'status', 'app_code'], name='ent_subs_status_idx'),
+        ]
     
     def __str__(self):
         return f"{self.enterprise.name} - {self.app_code}"
@@ -1,3 +1,375 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from JYXT.core.testing import TenantTestMixin
+from accounts.models import User
+from staff.models import Staff, StaffRole
+from .models import Department, Enterprise, EnterpriseSubscription
+
+
+class EnterpriseListViewTests(TestCase):
+    """企业列表视图测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(username='root', password='root')
+
+    def setUp(self):
+        self.client.force_login(self.superuser)
+
+    def _create_enterprises(self, count):
+        start = Enterprise.objects.count()
+        for i in range(start, start + count):
+            enterprise = Enterprise.objects.create(name=f'企业{i}', unified_social_credit_code=f'{i:018d}')
+            admin = User.objects.create(username=f'jy{i}', user_type=User.ENTERPRISE_ADMIN)
+            Staff.objects.create(user=admin, enterprise=enterprise)
+            Staff.objects.create(user=User.objects.create(username=f'u{i}'), enterprise=enterprise)
+            Department.objects.create(name='技术部', enterprise=enterprise)
+            EnterpriseSubscription.objects.create(enterprise=enterprise, app_code='skill_assessment', status='active')
+
+    def _count_list_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('enterprises:enterprise_list'))
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_query_count_independent_of_enterprise_count(self):
+        self._create_enterprises(2)
+        small, _ = self._count_list_queries()
+        self._create_enterprises(10)
+        large, _ = self._count_list_queries()
+        self.assertEqual(small, large)
+
+    def test_admin_username_and_counts(self):
+        self._create_enterprises(1)
+        Enterprise.objects.create(name='无管理员企业', unified_social_credit_code='X' * 18)
+        _, response = self._count_list_queries()
+        enterprises = {e.name: e for e in response.context['enterprises']}
+        self.assertEqual(enterprises['企业0'].admin_username, 'jy0')
+        self.assertEqual(enterprises['企业0'].staff_count, 2)
+        self.assertEqual(enterprises['企业0'].department_count, 1)
+        self.assertEqual(enterprises['企业0'].active_subscription_count, 1)
+        self.assertEqual(enterprises['无管理员企业'].admin_username, '-')
+        self.assertEqual(enterprises['无管理员企业'].staff_count, 0)
+
+
+class DepartmentTreeTests(TenantTestMixin, TestCase):
+    """部门物化路径测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+
+    def setUp(self):
+        self.root = Department.objects.create(name='总部', enterprise=self.enterprise)
+        self.tech = Department.objects.create(name='技术部', enterprise=self.enterprise, parent=self.root)
+        self.web = Department.objects.create(name='前端组', enterprise=self.enterprise, parent=self.tech)
+        self.sales = Department.objects.create(name='销售部', enterprise=self.enterprise, parent=self.root)
+
+    def test_paths_on_create(self):
+        self.assertEqual(self.web.path, f'/{self.root.pk}/{self.tech.pk}/{self.web.pk}/')
+        self.assertEqual(self.web.depth, 2)
+        self.assertEqual(str(self.web), '总部 - 技术部 - 前端组')
+
+    def test_subtree_and_ancestors_single_query(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.root.get_all_children()), {self.tech, self.web, self.sales})
+        with self.assertNumQueries(1):
+            self.assertEqual(list(self.web.get_ancestors()), [self.root, self.tech])
+
+    def test_move_rewrites_descendants(self):
+        self.tech.parent = self.sales
+        self.tech.save()
+        self.web.refresh_from_db()
+        self.assertEqual(self.web.path, f'/{self.root.pk}/{self.sales.pk}/{self.tech.pk}/{self.web.pk}/')
+        self.assertEqual(self.web.depth, 3)
+        self.assertEqual(self.web.full_name, '总部 - 销售部 - 技术部 - 前端组')
+
+    def test_rename_rewrites_descendant_names(self):
+        self.root.name = '集团'
+        self.root.save()
+        self.web.refresh_from_db()
+        self.assertEqual(self.web.full_name, '集团 - 技术部 - 前端组')
+
+    def test_cycle_rejected(self):
+        from django.core.exceptions import ValidationError
+
+        self.tech.parent = self.web
+        with self.assertRaises(ValidationError):
+            self.tech.clean()
+
+    def test_rebuild_paths(self):
+        Department.objects.update(path='', depth=0, full_name='')
+        self.assertEqual(Department.rebuild_paths(), 4)
+        self.web.refresh_from_db()
+        self.assertEqual(self.web.full_name, '总部 - 技术部 - 前端组')
+
+    def test_path_compared_bytewise_on_postgresql(self):
+        from unittest import mock
+
+        from django.db import connections
+
+        field = Department._meta.get_field('path')
+        self.assertIsNone(field.db_parameters(connection)['collation'])
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            self.assertEqual(field.db_parameters(connection)['collation'], 'C')
+
+    def test_department_users_single_query(self):
+        users = [User.objects.create(username=f'user{i}') for i in range(3)]
+        Staff.objects.create(user=users[0], enterprise=self.enterprise, department=self.root)
+        Staff.objects.create(user=users[1], enterprise=self.enterprise, department=self.web)
+        Staff.objects.create(user=users[2], enterprise=self.enterprise, department=self.sales)
+        with self.assertNumQueries(1):
+            self.assertEqual(set(self.tech.get_department_users()), {users[1]})
+        with self.assertNumQueries(1):
+            self.assertEqual(self.root.get_department_user_count(), 3)
+        with self.assertNumQueries(1):
+            counts = dict(self.root.children.with_user_count().values_list('pk', 'user_count'))
+        self.assertEqual(counts, {self.tech.pk: 1, self.sales.pk: 1})
+
+    def test_list_view_tree_order_and_counts(self):
+        admin = self.create_user('admin', 'admin', user_type=User.ENTERPRISE_ADMIN)
+        self.create_staff(admin, self.enterprise, role_type=StaffRole.ENTERPRISE_ADMIN, department=self.web)
+        hidden = Department.objects.create(name='停用部', enterprise=self.enterprise, parent=self.root, is_active=False)
+        Department.objects.create(name='停用部下级', enterprise=self.enterprise, parent=hidden)
+
+        self.client.force_login(admin)
+        response = self.client.get(reverse('enterprises:department_list'))
+        departments = list(response.context['departments'])
+        self.assertEqual(departments, [self.root, self.tech, self.web, self.sales])
+        self.assertEqual([d.user_count for d in departments], [1, 1, 1, 0])
+        self.assertEqual(response.context['paginator'].count, 4)
+
+    def test_list_view_keeps_children_after_parent(self):
+        admin = self.create_admin(self.enterprise)
+        # 同级部门名称为另一部门名称加空格和排在'-'之前的字符：按完整名称排序时会插到下级部门之前
+        north = Department.objects.create(name='华北组', enterprise=self.enterprise, parent=self.sales)
+        sibling = Department.objects.create(name='销售部 +华南', enterprise=self.enterprise, parent=self.root)
+
+        self.client.force_login(admin)
+        departments = list(self.client.get(reverse('enterprises:department_list')).context['departments'])
+        position = departments.index(self.sales)
+        self.assertEqual(departments[position + 1], north)
+        self.assertIn(sibling, departments)
+
+    def test_detail_view_counts_direct_children(self):
+        admin = self.create_user('admin', 'admin', user_type=User.ENTERPRISE_ADMIN)
+        self.create_staff(admin, self.enterprise, role_type=StaffRole.ENTERPRISE_ADMIN, department=self.web)
+        self.client.force_login(admin)
+        response = self.client.get(reverse('enterprises:department_detail', args=[self.root.pk]))
+        counts = {d.pk: d.user_count for d in response.context['sub_departments']}
+        self.assertEqual(counts, {self.tech.pk: 1, self.sales.pk: 0})
+
+
+class AutocompleteTests(TenantTestMixin, TestCase):
+    """部门、用户自动补全测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        cls.other = cls.create_enterprise('企业B')
+        cls.root = Department.objects.create(name='总部', enterprise=cls.enterprise)
+        cls.tech = Department.objects.create(name='技术部', enterprise=cls.enterprise, parent=cls.root)
+        Department.objects.create(name='技术部', enterprise=cls.other)
+        cls.admin = cls.create_admin(cls.enterprise, '13900000000', first_name='管理员')
+        cls.zhang = User.objects.create(username='13800000001', first_name='张三')
+        Staff.objects.create(user=cls.zhang, enterprise=cls.enterprise, department=cls.tech)
+        resigned = User.objects.create(username='13800000002', first_name='张四')
+        Staff.objects.create(user=resigned, enterprise=cls.enterprise, employment_status=Staff.RESIGNED)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def _search(self, source, **params):
+        response = self.client.get(reverse('autocomplete', args=[source]), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_departments_prefix_match_in_current_enterprise(self):
+        data = self._search('enterprises.departments', q='技术')
+        self.assertEqual(data['results'], [{'id': self.tech.pk, 'text': '总部 - 技术部'}])
+        self.assertFalse(data['pagination']['more'])
+        self.assertEqual(self._search('enterprises.departments', q='术部')['results'], [])
+
+    def test_prefix_range_uses_c_collation_on_postgresql(self):
+        from unittest import mock
+
+        from django.db import connections
+
+        from JYXT.core.autocomplete import prefix_q
+
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            condition = prefix_q('name', '技术')
+        self.assertIn('COLLATE "C" >=', str(Department.objects.filter(condition).query))
+        self.assertNotIn('COLLATE', str(Department.objects.filter(prefix_q('name', '技术')).query))
+
+    def test_prefix_order_matches_range_collation(self):
+        from unittest import mock
+
+        from django.db import connections
+
+        from JYXT.core.autocomplete import prefix_order
+
+        with mock.patch.object(connections['default'], 'vendor', 'postgresql'):
+            order = prefix_order('name')
+        self.assertIn('ORDER BY "departments"."name" COLLATE "C"', str(Department.objects.order_by(order).query))
+
+    def test_pagination(self):
+        Department.objects.bulk_create(
+            [Department(name=f'分部{i:02d}', enterprise=self.enterprise) for i in range(25)]
+        )
+        first = self._search('enterprises.departments', q='分部')
+        second = self._search('enterprises.departments', q='分部', page=2)
+        self.assertEqual(len(first['results']), 20)
+        self.assertTrue(first['pagination']['more'])
+        self.assertEqual([item['text'] for item in second['results']], [f'分部{i}' for i in range(20, 25)])
+        self.assertFalse(second['pagination']['more'])
+
+    def test_results_cached_until_department_changes(self):
+        self._search('enterprises.departments', q='技术')
+        # 只剩会话和用户的查询
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self._search('enterprises.departments', q='技术')['results']), 1)
+        self.tech.name = '研发部'
+        self.tech.save()
+        self.assertEqual(self._search('enterprises.departments', q='技术')['results'], [])
+        self.assertEqual(len(self._search('enterprises.departments', q='研发')['results']), 1)
+
+    def test_users_by_name_or_phone_prefix(self):
+        self.assertEqual(
+            self._search('staff.users', q='张')['results'], [{'id': self.zhang.pk, 'text': '张三 (13800000001)'}]
+        )
+        self.assertEqual([item['id'] for item in self._search('staff.users', q='138')['results']], [self.zhang.pk])
+        self.zhang.first_name = '李三'
+        self.zhang.save()
+        self.assertEqual(self._search('staff.users', q='张')['results'], [])
+
+    def test_login_save_skips_user_invalidation(self):
+        from django.utils import timezone
+
+        self.zhang.last_login = timezone.now()
+        # 只有UPDATE，不查询用户的任职企业
+        with self.assertNumQueries(1):
+            self.zhang.save(update_fields=['last_login'])
+
+    def test_users_invalidated_by_import(self):
+        import io
+
+        from staff.importers import StaffImporter, read_rows
+
+        self.assertEqual(len(self._search('staff.users', q='张')['results']), 1)
+        rows = read_rows(io.BytesIO('姓名,手机号\n张小明,13800000003\n'.encode('utf-8')), 'staff.csv')
+        with self.captureOnCommitCallbacks(execute=True):
+            StaffImporter(self.enterprise, workers=0).run(rows)
+        self.assertEqual(len(self._search('staff.users', q='张')['results']), 2)
+
+    def test_users_require_enterprise_admin(self):
+        self.client.force_login(self.zhang)
+        self.assertEqual(self._search('enterprises.departments', q='技术')['results'][0]['id'], self.tech.pk)
+        response = self.client.get(reverse('autocomplete', args=['staff.users']), {'q': '张'})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(self.client.get(reverse('autocomplete', args=['unknown'])).status_code, 404)
+
+    def test_department_form_renders_only_selected_options(self):
+        department = Department.objects.create(
+            name='销售部', enterprise=self.enterprise, parent=self.root, manager=self.zhang
+        )
+        url = reverse('enterprises:department_update', args=[department.pk])
+        # 预热会话中的企业和角色缓存
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as before:
+            response = self.client.get(url)
+        self.assertContains(response, f'<option value="{self.zhang.pk}" selected>张三</option>', html=True)
+        self.assertContains(response, 'data-autocomplete-url="/autocomplete/staff.users/"')
+        self.assertNotContains(response, '技术部')
+
+        Department.objects.bulk_create(
+            [Department(name=f'分部{i}', enterprise=self.enterprise) for i in range(30)]
+        )
+        for i in range(10):
+            Staff.objects.create(user=User.objects.create(username=f'user{i}'), enterprise=self.enterprise)
+        with CaptureQueriesContext(connection) as after:
+            self.client.get(url)
+        self.assertEqual(len(before), len(after))
+
+        response = self.client.post(url, {'name': '销售部', 'parent': self.tech.pk, 'manager': self.admin.pk, 'is_active': 'on'})
+        self.assertEqual(response.status_code, 302)
+        department.refresh_from_db()
+        self.assertEqual((department.parent, department.manager), (self.tech, self.admin))
+
+
+class DepartmentApiTests(TenantTestMixin, TestCase):
+    """部门、企业只读JSON接口测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        cls.other = cls.create_enterprise('企业B')
+        cls.admin = cls.create_admin(cls.enterprise)
+        cls.member = cls.create_user('13800000001', first_name='张三')
+        cls.create_staff(cls.member, cls.enterprise)
+        cls.departments = [Department.objects.create(name=f'部门{i}', enterprise=cls.enterprise) for i in range(5)]
+        Department.objects.create(name='其他企业部门', enterprise=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_sparse_fields_and_cursor_pagination(self):
+        response = self.client.get('/api/v1/departments/', {'fields': 'name', 'page_size': 2})
+        data = response.json()
+        self.assertEqual(data['results'], [{'name': '部门0', 'id': self.departments[0].pk},
+                                           {'name': '部门1', 'id': self.departments[1].pk}])
+        self.assertIsNone(data['previous'])
+        names = [row['name'] for row in data['results']]
+        while data['next']:
+            data = self.client.get('/api/v1/departments/', {'fields': 'name', 'page_size': 2, 'cursor': data['next']}).json()
+            names += [row['name'] for row in data['results']]
+        self.assertEqual(names, [f'部门{i}' for i in range(5)])
+
+        response = self.client.get('/api/v1/departments/', {'fields': 'name,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get('/api/v1/departments/', {'cursor': 'bad'}).status_code, 400)
+
+    def test_list_etag_changes_on_update_and_delete(self):
+        response = self.client.get('/api/v1/departments/')
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEqual(self.client.get('/api/v1/departments/', headers={'if-none-match': etag}).status_code, 304)
+
+        self.departments[0].description = '新的描述'
+        self.departments[0].save()
+        response = self.client.get('/api/v1/departments/', headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        self.departments[4].delete()
+        self.assertEqual(self.client.get('/api/v1/departments/', headers={'if-none-match': etag}).status_code, 200)
+
+    def test_detail_etag_changes_when_parent_renamed(self):
+        child = Department.objects.create(name='小组', enterprise=self.enterprise, parent=self.departments[0])
+        Department.objects.filter(pk=child.pk).update(updated_at='2000-01-01T00:00:00Z')
+        url = f'/api/v1/departments/{child.pk}/'
+        etag = self.client.get(url)['ETag']
+        self.departments[0].name = '部门零'
+        self.departments[0].save()
+        response = self.client.get(url, headers={'if-none-match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['full_name'], '部门零 - 小组')
+
+    def test_gzip(self):
+        response = self.client.get('/api/v1/departments/', headers={'accept-encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_member_scope_and_authentication(self):
+        self.client.force_login(self.member)
+        self.assertEqual(len(self.client.get('/api/v1/departments/').json()['results']), 5)
+        enterprises = self.client.get('/api/v1/enterprises/', {'fields': 'name'}).json()['results']
+        self.assertEqual(enterprises, [{'name': '企业A', 'id': self.enterprise.pk}])
+
+        self.client.logout()
+        self.assertEqual(self.client.get('/api/v1/departments/').status_code, 401)
@@ -5,13 +5,16 @@ from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.shortcuts import redirect
 from django.core.exceptions import PermissionDenied
-from django.forms import ModelChoiceField
+from JYXT.core import authz
+from JYXT.core.autocomplete import AutocompleteModelChoiceField
+from JYXT.core.pagination import KeysetPaginationMixin
 from JYXT.core.permissions import SuperUserRequiredMixin, EnterpriseRequiredMixin, EnterpriseAdminRequiredMixin
+from JYXT.core.tenant import get_enterprise_choices
 from .models import Enterprise, EnterpriseSubscription, Department
 from accounts.models import User
 
-# 自定义的ModelChoiceField，用于在表单中显示用户的姓名作为标签
-class UserNameChoiceField(ModelChoiceField):
+# 通过自动补全选择用户的字段，用于在表单中显示用户的姓名作为标签
+class UserNameChoiceField(AutocompleteModelChoiceField):
     def label_from_instance(self, obj):
         # 使用用户的姓名作为标签，如果没有姓名则使用用户名
         full_name = f"{obj.first_name}{obj.last_name}"
@@ -23,31 +26,23 @@ class EnterpriseBaseView(LoginRequiredMixin):
     """基础视图类"""
     pass
 
-class EnterpriseListView(SuperUserRequiredMixin, ListView):
+class EnterpriseListView(SuperUserRequiredMixin, KeysetPaginationMixin, ListView):
     """企业列表（超级管理员视图）"""
     model = Enterprise
     template_name = 'enterprises/enterprise_list.html'
     context_object_name = 'enterprises'
     paginate_by = 20
+    keyset_ordering = ('-created_at', '-id')
+    
+    # 是否附加员工数、部门数、有效订阅数
+    annotate_counts = True
     
     def get_queryset(self):
-        """重写get_queryset方法，预加载企业管理员信息"""
-        # 使用prefetch_related优化查询，预加载关联的用户
-        queryset = super().get_queryset()
-        # 我们不能在模板中直接过滤，但可以在视图中添加属性
-        # 在视图层面，我们不需要做特殊处理，而是在模板中使用一个辅助方法
+        """以子查询批量附加企业管理员用户名（及统计数），列表查询数与企业数量无关"""
+        queryset = super().get_queryset().with_admin_username()
+        if self.annotate_counts:
+            queryset = queryset.with_counts()
         return queryset
-    
-    def get_context_data(self, **kwargs):
-        """重写get_context_data方法，为每个企业添加管理员信息"""
-        context = super().get_context_data(**kwargs)
-        # 为每个企业添加管理员信息
-        for enterprise in context['enterprises']:
-            # 获取企业管理员用户 - 通过Staff模型关联
-            admin = User.objects.filter(staff_members__enterprise=enterprise, user_type='enterprise_admin').first()
-            # 将管理员信息添加到企业对象上，方便在模板中使用
-            enterprise.admin_username = admin.username if admin else '-'  
-        return context
 
 class EnterpriseCreateView(SuperUserRequiredMixin, CreateView):
     """创建企业"""
@@ -191,11 +186,10 @@ class EnterpriseUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
         if user.is_superuser:
             return queryset
         
-        # 企业管理员只能编辑自己的企业
-        if user.is_enterprise_admin:
-            # 通过staff模型获取企业信息
-            if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-                return queryset.filter(id=user.staff.enterprise.id)
+        # 企业管理员只能编辑当前企业（session中选择的企业）
+        enterprise = self.request.enterprise
+        if enterprise and authz.is_enterprise_admin(self.request):
+            return queryset.filter(id=enterprise.id)
         
         # 其他用户没有权限编辑任何企业
         return queryset.none()
@@ -269,10 +263,9 @@ class SelectEnterpriseView(EnterpriseBaseView, ListView):
         if user.user_type == 'super_admin':
             return Enterprise.objects.filter(is_active=True)
         else:
-            # 普通用户只能看到自己所属的企业
-            if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-                return Enterprise.objects.filter(id=user.staff.enterprise.id, is_active=True)
-            return Enterprise.objects.none()
+            # 普通用户只能看到自己在职的企业
+            choices = get_enterprise_choices(self.request)
+            return Enterprise.objects.filter(id__in=[choice['id'] for choice in choices], is_active=True)
     
     def post(self, request, *args, **kwargs):
         """处理企业选择"""
@@ -305,57 +298,46 @@ class BaseDepartmentView(LoginRequiredMixin):
     context_object_name = 'department'
     
     def get_queryset(self):
-        """限制查询集为当前用户所在企业的部门"""
+        """限制查询集为当前企业（session中选择的企业）的部门"""
         queryset = super().get_queryset()
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            queryset = queryset.filter(enterprise=user.staff.enterprise)
+        enterprise = self.request.enterprise
+        if enterprise:
+            queryset = queryset.filter(enterprise=enterprise)
         else:
             queryset = queryset.none()
         return queryset
 
-class DepartmentListView(EnterpriseAdminRequiredMixin, BaseDepartmentView, ListView):
+class DepartmentListView(EnterpriseAdminRequiredMixin, BaseDepartmentView, KeysetPaginationMixin, ListView):
     """部门列表视图"""
     template_name = 'enterprises/department_list.html'
     context_object_name = 'departments'
     paginate_by = 20
+    # 按物化路径（字节序）排序即为按层级深度优先展开：下级部门紧跟在上级部门之后，
+    # 同级部门按路径中的部门ID排列；(enterprise, path) 索引直接提供该顺序，翻页不需要排序整个企业的部门
+    keyset_ordering = ('path', 'id')
     
     def get_queryset(self):
-        """获取当前企业的部门列表，按层级关系排序"""
-        queryset = super().get_queryset()
-        # 只显示启用的部门
-        queryset = queryset.filter(is_active=True)
-        # 先获取所有根部门
-        root_departments = queryset.filter(parent__isnull=True)
-        # 然后递归获取子部门并组织
-        departments = []
-        for root_dept in root_departments.order_by('name'):
-            departments.append(root_dept)
-            departments.extend(self._get_nested_departments(root_dept, queryset))
-        return departments
+        """获取当前企业启用的部门列表，按层级关系排序（停用部门的下级不显示）"""
+        return super().get_queryset().visible()
     
-    def _get_nested_departments(self, parent, queryset, level=1):
-        """递归获取子部门"""
-        nested_departments = []
-        # 从查询集中获取当前父部门的子部门
-        children = queryset.filter(parent=parent).order_by('name')
-        for child in children:
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, departments, is_paginated = super().paginate_queryset(queryset, page_size)
+        # 只统计当前页部门（含下级部门）的用户数，翻页代价与企业部门总数无关
+        user_counts = dict(
+            Department.objects.filter(pk__in=[department.pk for department in departments])
+            .with_user_count().values_list('pk', 'user_count')
+        )
+        for department in departments:
             # 添加层级标记，方便前端显示
-            child.level = level
-            nested_departments.append(child)
-            # 递归获取下一级子部门
-            nested_departments.extend(self._get_nested_departments(child, queryset, level + 1))
-        return nested_departments
+            department.level = department.depth
+            department.user_count = user_counts.get(department.pk, 0)
+        return paginator, page, departments, is_paginated
     
     def get_context_data(self, **kwargs):
         """添加额外上下文数据"""
         context = super().get_context_data(**kwargs)
         # 添加企业信息
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            context['current_enterprise'] = user.staff.enterprise
-        else:
-            context['current_enterprise'] = None
+        context['current_enterprise'] = self.request.enterprise
         return context
 
 class DepartmentCreateView(EnterpriseAdminRequiredMixin, BaseDepartmentView, CreateView):
@@ -367,23 +349,32 @@ class DepartmentCreateView(EnterpriseAdminRequiredMixin, BaseDepartmentView, Cre
     def get_form(self, form_class=None):
         """自定义表单，限制可选的父部门和负责人范围"""
         form = super().get_form(form_class)
-        user = self.request.user
+        enterprise = self.request.enterprise
         
         # 限制父部门只能是当前企业的部门
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            form.fields['parent'].queryset = Department.objects.filter(
-                enterprise=user.staff.enterprise,
-                is_active=True
-            ).exclude(id=self.kwargs.get('pk'))  # 防止自引用（更新时）
+        if enterprise:
+            # 上级部门和负责人通过自动补全选择，表单只查询已选中的值
+            form.fields['parent'] = AutocompleteModelChoiceField(
+                'enterprises.departments',
+                queryset=Department.objects.filter(
+                    enterprise=enterprise,
+                    is_active=True
+                ).exclude(id=self.kwargs.get('pk')),  # 防止自引用（更新时）
+                required=False,
+                label=form.fields['parent'].label,
+                empty_label='请选择'
+            )
             
             # 限制负责人只能是当前企业的用户
             form.fields['manager'] = UserNameChoiceField(
+                'staff.users',
                 queryset=User.objects.filter(
-                    staff_members__enterprise=user.staff.enterprise,
+                    staff_members__enterprise=enterprise,
                     is_active=True
-                ),
+                ).distinct(),
                 required=False,
-                label='部门负责人'
+                label='部门负责人',
+                empty_label='请选择'
             )
         else:
             # 如果用户没有关联的企业，设置空查询集
@@ -393,10 +384,8 @@ class DepartmentCreateView(EnterpriseAdminRequiredMixin, BaseDepartmentView, Cre
         return form
     
     def form_valid(self, form):
-        """保存部门时自动设置所属企业"""
-        user = self.request.user
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            form.instance.enterprise = user.staff.enterprise
+        """保存部门时自动设置为当前企业"""
+        form.instance.enterprise = self.request.enterprise
         response = super().form_valid(form)
         
         # 添加成功消息
@@ -426,30 +415,35 @@ class DepartmentUpdateView(EnterpriseAdminRequiredMixin, BaseDepartmentView, Upd
     def get_form(self, form_class=None):
         """自定义表单，限制可选的父部门和负责人范围"""
         form = super().get_form(form_class)
-        user = self.request.user
+        enterprise = self.request.enterprise
         
         # 限制父部门只能是当前企业的部门，并且不能是自己或自己的子部门
-        current_department = self.get_object()
-        excluded_ids = [current_department.id]
-        # 添加所有子部门的ID到排除列表
-        for child in current_department.get_all_children():
-            excluded_ids.append(child.id)
-        
-        # 限制父部门只能是当前企业的部门
-        if hasattr(user, 'staff') and user.staff and user.staff.enterprise:
-            form.fields['parent'].queryset = Department.objects.filter(
-                enterprise=user.staff.enterprise,
-                is_active=True
-            ).exclude(id__in=excluded_ids)
+        current_department = self.object
+        
+        # 限制父部门只能是当前企业的部门（按物化路径排除整棵子树）
+        if enterprise:
+            # 上级部门和负责人通过自动补全选择，表单只查询已选中的值
+            form.fields['parent'] = AutocompleteModelChoiceField(
+                'enterprises.departments',
+                queryset=Department.objects.filter(
+                    enterprise=enterprise,
+                    is_active=True
+                ).exclude(Department.subtree_q(current_department.path)),
+                required=False,
+                label=form.fields['parent'].label,
+                empty_label='请选择'
+            )
             
             # 限制负责人只能是当前企业的用户
             form.fields['manager'] = UserNameChoiceField(
+                'staff.users',
                 queryset=User.objects.filter(
-                    staff_members__enterprise=user.staff.enterprise,
+                    staff_members__enterprise=enterprise,
                     is_active=True
-                ),
+                ).distinct(),
                 required=False,
-                label='部门负责人'
+                label='部门负责人',
+                empty_label='请选择'
             )
         else:
             # 如果用户没有关联的企业，设置空查询集
@@ -487,13 +481,15 @@ class DepartmentDetailView(EnterpriseAdminRequiredMixin, BaseDepartmentView, Det
     def get_context_data(self, **kwargs):
         """添加部门的用户和子部门信息"""
         context = super().get_context_data(**kwargs)
-        department = self.get_object()
+        department = self.object
         
-        # 获取部门的用户
+        # 获取部门的用户（一条SQL覆盖整棵子树）
         context['department_users'] = department.get_department_users()
         
-        # 获取部门的子部门
-        context['sub_departments'] = department.children.filter(is_active=True)
+        # 获取部门的直属子部门，附加各子部门（含下级部门）的用户数（每个子部门一个路径范围子查询）
+        context['sub_departments'] = (
+            department.children.filter(is_active=True).select_related('manager').with_user_count()
+        )
         
         return context
 
@@ -505,16 +501,16 @@ class DepartmentDeleteView(EnterpriseAdminRequiredMixin, BaseDepartmentView, Del
     def get_context_data(self, **kwargs):
         """添加额外的上下文数据"""
         context = super().get_context_data(**kwargs)
-        department = self.get_object()
+        department = self.object
         
         # 计算子部门数量
         context['sub_department_count'] = department.children.filter(is_active=True).count()
         
-        # 计算部门用户数量
-        context['department_user_count'] = department.get_department_users().count()
+        # 计算部门用户数量（不加载用户对象）
+        context['department_user_count'] = department.get_department_user_count()
         
         # 检查是否有子部门
-        context['has_sub_departments'] = department.children.filter(is_active=True).exists()
+        context['has_sub_departments'] = context['sub_department_count'] > 0
         
         return context
     
@@ -0,0 +1,31 @@
+# staff/api.py
+"""员工的只读接口"""
+from JYXT.core import authz
+from JYXT.core.api import ApiView
+
+from .models import Staff
+
+
+class StaffApiView(ApiView):
+    """当前企业的员工（企业管理员）
+
+    用户名和姓名来自用户表：用户保存（staff.signals）和批量导入（StaffImporter）时同步更新员工记录的 updated_at。
+    """
+    model = Staff
+    required_role = authz.ENTERPRISE_ADMIN
+    fields = {
+        'id': 'id',
+        'user': 'user_id',
+        'username': 'user__username',
+        'name': 'user__first_name',
+        'department': 'department_id',
+        'position': 'position',
+        'work_phone': 'work_phone',
+        'enterprise_phone': 'enterprise_phone',
+        'enterprise_email': 'enterprise_email',
+        'employment_status': 'employment_status',
+        'updated_at': 'updated_at',
+    }
+
+    def get_queryset(self):
+        return Staff.objects.filter(enterprise=self.request.enterprise)
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class StaffConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'staff'
+
+    def ready(self):
+        # 注册搜索索引同步信号
+        import staff.signals
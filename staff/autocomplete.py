@@ -0,0 +1,41 @@
+# staff/autocomplete.py
+"""用户选择框的自动补全来源"""
+from JYXT.core import authz
+from JYXT.core.autocomplete import AutocompleteSource, autocomplete_registry, prefix_q
+
+from .models import Staff, StaffSearchDocument
+
+
+@autocomplete_registry.register
+class EmployedUserSource(AutocompleteSource):
+    """企业内在职且已激活的用户（如部门负责人）
+
+    从员工搜索文档的窄表查询：输入数字时按用户名（手机号）前缀匹配，否则按姓名前缀匹配。
+    """
+    name = 'staff.users'
+    search_fields = ['name']
+    required_role = authz.ENTERPRISE_ADMIN
+    depends_on = ['staff.Staff', 'accounts.User']
+    # 只有姓名、用户名和激活状态影响结果（登录时只保存 last_login，不查询任职企业）
+    depends_on_fields = {'accounts.User': {'first_name', 'username', 'is_active'}}
+
+    def get_queryset(self, enterprise):
+        return StaffSearchDocument.objects.filter(
+            enterprise=enterprise, staff__employment_status=Staff.EMPLOYED, staff__user__is_active=True,
+        )
+
+    def filter_query(self, queryset, query):
+        if query.isdigit():
+            return queryset.filter(prefix_q('staff__user__username', query))
+        return super().filter_query(queryset, query)
+
+    def get_results(self, queryset):
+        # 同一用户在一个企业中只有一条员工记录（unique_together），不会重复
+        for user_id, name, username in queryset.values_list('staff__user_id', 'name', 'staff__user__username'):
+            yield {'id': user_id, 'text': name if name == username else f'{name} ({username})'}
+
+    def get_enterprise_ids(self, sender, instance):
+        if sender is Staff:
+            return super().get_enterprise_ids(sender, instance)
+        # 用户姓名或状态变更影响其任职的所有企业
+        return list(Staff.objects.filter(user=instance).values_list('enterprise_id', flat=True).distinct())
@@ -3,6 +3,7 @@ from django.conf import settings
 from accounts.models import User
 from .models import Staff
 from enterprises.models import Department
+from JYXT.core.autocomplete import AutocompleteModelChoiceField
 
 class StaffProfileForm(forms.Form):
     """员工个人资料表单 - 用于用户编辑自己的资料"""
@@ -49,7 +50,8 @@ class StaffCreateForm(forms.Form):
     work_phone = forms.CharField(max_length=20, required=False, label='办公电话')
     enterprise_phone = forms.CharField(max_length=20, required=True, label='手机号')
     enterprise_email = forms.EmailField(required=False, label='企业邮箱')
-    department = forms.ModelChoiceField(
+    department = AutocompleteModelChoiceField(
+        'enterprises.departments',
         queryset=Department.objects.filter(is_active=True).order_by('name'),
         required=False, 
         label='部门',
@@ -73,9 +75,9 @@ class StaffCreateForm(forms.Form):
         # 用户类型字段已从表单中移除，在视图中直接设置为enterprise_user
             
         # 根据当前用户的企业过滤部门选项
-        if hasattr(self.request.user, 'staff') and self.request.user.staff and self.request.user.staff.enterprise:
+        if getattr(self.request, 'enterprise', None):
             self.fields['department'].queryset = Department.objects.filter(
-                enterprise=self.request.user.staff.enterprise, 
+                enterprise=self.request.enterprise, 
                 is_active=True
             ).order_by('name')
 
@@ -91,7 +93,8 @@ class StaffUpdateForm(forms.Form):
     work_phone = forms.CharField(max_length=20, required=False, label='办公电话')
     enterprise_phone = forms.CharField(max_length=20, required=True, label='手机号')
     enterprise_email = forms.EmailField(required=False, label='企业邮箱')
-    department = forms.ModelChoiceField(
+    department = AutocompleteModelChoiceField(
+        'enterprises.departments',
         queryset=Department.objects.filter(is_active=True).order_by('name'),
         required=False, 
         label='部门',
@@ -129,8 +132,18 @@ class StaffUpdateForm(forms.Form):
         # 用户类型字段已从表单中移除，在视图中直接设置为enterprise_user
         
         # 根据当前用户的企业过滤部门选项
-            if hasattr(self.request.user, 'staff') and self.request.user.staff and self.request.user.staff.enterprise:
+            if getattr(self.request, 'enterprise', None):
                 self.fields['department'].queryset = Department.objects.filter(
-                    enterprise=self.request.user.staff.enterprise, 
+                    enterprise=self.request.enterprise, 
                     is_active=True
-                ).order_by('name')
\ No newline at end of file
+                ).order_by('name')
+
+class StaffImportForm(forms.Form):
+    """员工批量导入表单"""
+    file = forms.FileField(label='导入文件', help_text='支持CSV或XLSX格式，表头：姓名、手机号、个人邮箱、办公电话、企业邮箱、部门、职位')
+    
+    def clean_file(self):
+        file = self.cleaned_data['file']
+        if not file.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError('仅支持CSV或XLSX格式的文件')
+        return file
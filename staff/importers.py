@@ -0,0 +1,344 @@
+# staff/importers.py
+"""员工批量导入
+
+从CSV/XLSX文件流式读取员工数据，按批次校验并批量写入User/Staff/StaffRole：
+- 每批次只用一次查询按手机号（即用户名）匹配已有用户，一次查询匹配已有员工记录；
+- 员工搜索文档随同批次一次写入；
+- 新用户的默认密码在进程池中并行加密（进程数由 STAFF_IMPORT_HASH_WORKERS 限制，默认2个，
+  只在批次中有多个新用户时才创建进程池）；
+- 单行数据错误只记录到结果中，不会中断整个导入。
+"""
+import csv
+import io
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import DatabaseError, transaction
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from JYXT.core import autocomplete, tenant, widgets
+from accounts.models import User
+from enterprises.models import Department
+from . import search
+from .models import Staff, StaffRole
+
+# 导入文件的表头与字段对应关系
+COLUMNS = {
+    '姓名': 'first_name',
+    '手机号': 'enterprise_phone',
+    '个人邮箱': 'email',
+    '办公电话': 'work_phone',
+    '企业邮箱': 'enterprise_email',
+    '部门': 'department',
+    '职位': 'position',
+}
+
+REQUIRED_COLUMNS = ('姓名', '手机号')
+
+# 密码加密的默认进程数
+DEFAULT_HASH_WORKERS = 2
+
+# 手机号（同时作为用户名）只允许数字，可带国际区号前缀"+"
+PHONE_PATTERN = re.compile(r'^\+?\d+$')
+
+# 页面上传时同步导入的默认最大行数，更大的文件使用 manage.py import_staff 导入
+DEFAULT_WEB_MAX_ROWS = 200
+
+
+class StaffImportError(Exception):
+    """导入文件无法读取（格式不支持、缺少必填列等）"""
+
+
+@dataclass
+class StaffImportResult:
+    """导入结果"""
+    created_users: int = 0
+    created_staff: int = 0
+    updated_staff: int = 0
+    errors: list = field(default_factory=list)  # [(行号, 错误信息)]
+
+    @property
+    def success_count(self):
+        return self.created_staff + self.updated_staff
+
+
+def default_password(phone):
+    """默认密码为手机号后六位，与手工创建员工时的规则一致"""
+    return phone[-6:] if len(phone) >= 6 else '123456'
+
+
+def _init_worker():
+    """进程池子进程初始化（spawn方式启动时需要重新加载Django）"""
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+
+def read_rows(file, filename):
+    """按文件扩展名流式读取数据行，产出 (行号, {字段: 值})"""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == '.csv':
+        rows = _read_csv(file)
+    elif extension == '.xlsx':
+        rows = _read_xlsx(file)
+    else:
+        raise StaffImportError('仅支持CSV或XLSX格式的文件')
+
+    header = next(rows, None)
+    if header is None:
+        raise StaffImportError('导入文件为空')
+    header = [str(name or '').strip() for name in header]
+    missing = [name for name in REQUIRED_COLUMNS if name not in header]
+    if missing:
+        raise StaffImportError(f'导入文件缺少必填列：{"、".join(missing)}')
+
+    positions = {COLUMNS[name]: index for index, name in enumerate(header) if name in COLUMNS}
+    for line_number, values in enumerate(rows, start=2):
+        if not any(value not in (None, '') for value in values):
+            continue
+        yield line_number, {
+            field_name: _cell_text(values[index]) if index < len(values) else ''
+            for field_name, index in positions.items()
+        }
+
+
+def _cell_text(value):
+    """单元格值转为文本：XLSX中的数字单元格（如手机号）读取为int/float，整数值不能带".0"或科学计数法"""
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def _read_csv(file):
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, newline='', encoding='utf-8-sig') as handle:
+            yield from csv.reader(handle)
+    else:
+        yield from csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+
+
+def _read_xlsx(file):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise StaffImportError('导入XLSX文件需要安装openpyxl，请改用CSV文件或执行 pip install openpyxl')
+
+    workbook = load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+class StaffImporter:
+    """按批次导入员工到指定企业"""
+
+    def __init__(self, enterprise, chunk_size=500, workers=None):
+        self.enterprise = enterprise
+        self.chunk_size = chunk_size
+        if workers is None:
+            workers = getattr(settings, 'STAFF_IMPORT_HASH_WORKERS', DEFAULT_HASH_WORKERS)
+        self.workers = min(workers, os.cpu_count() or 1)
+        self._executor = None
+        self._departments = None
+        self._seen_phones = {}
+
+    def run(self, rows):
+        """导入数据行（(行号, 数据) 的可迭代对象），返回 StaffImportResult"""
+        result = StaffImportResult()
+        self._seen_phones = {}
+        try:
+            rows = iter(rows)
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    break
+                valid = self._validate(chunk, result)
+                if valid:
+                    self._save(valid, result)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+        return result
+
+    def _hash_passwords(self, passwords):
+        """加密一组默认密码，多个密码时在进程池中并行（进程池在第一次需要时创建）"""
+        if self.workers <= 1 or len(passwords) <= 1:
+            return [make_password(password) for password in passwords]
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        chunksize = max(1, len(passwords) // self.workers)
+        return list(self._executor.map(make_password, passwords, chunksize=chunksize))
+
+    def _department_lookup(self):
+        """企业部门按名称和完整名称索引（整个导入过程只查询一次）"""
+        if self._departments is None:
+            self._departments = {}
+            for department in Department.objects.filter(enterprise=self.enterprise, is_active=True):
+                self._departments.setdefault(department.name, department)
+                self._departments[department.full_name or department.name] = department
+        return self._departments
+
+    def _validate(self, chunk, result):
+        """逐行校验，返回通过校验的行"""
+        departments = self._department_lookup()
+        seen_phones = self._seen_phones
+        valid = []
+        for line_number, row in chunk:
+            try:
+                if not row.get('first_name'):
+                    raise ValidationError('姓名不能为空')
+                phone = row.get('enterprise_phone', '')
+                if not phone:
+                    raise ValidationError('手机号不能为空')
+                if len(phone) > 20:
+                    raise ValidationError('手机号不能超过20个字符')
+                if not PHONE_PATTERN.match(phone):
+                    raise ValidationError('手机号格式不正确')
+                if phone in seen_phones:
+                    raise ValidationError(f'手机号与第{seen_phones[phone]}行重复')
+                for email_field, label in (('email', '个人邮箱'), ('enterprise_email', '企业邮箱')):
+                    if row.get(email_field):
+                        try:
+                            validate_email(row[email_field])
+                        except ValidationError:
+                            raise ValidationError(f'{label}格式不正确')
+                department_name = row.get('department')
+                row['department'] = None
+                if department_name:
+                    row['department'] = departments.get(department_name)
+                    if row['department'] is None:
+                        raise ValidationError(f'部门"{department_name}"不存在')
+            except ValidationError as error:
+                result.errors.append((line_number, error.messages[0]))
+                continue
+            seen_phones[phone] = line_number
+            valid.append((line_number, row))
+        return valid
+
+    def _save(self, rows, result):
+        """保存一个批次；批量写入失败时逐行重试，定位出错的行"""
+        # 新用户的默认密码在写入事务之前加密
+        phones = [row['enterprise_phone'] for _, row in rows]
+        existing_users = {user.username: user for user in User.objects.filter(username__in=phones)}
+        new_phones = [phone for phone in phones if phone not in existing_users]
+        hashed = self._hash_passwords([default_password(phone) for phone in new_phones])
+        hashed_by_phone = dict(zip(new_phones, hashed))
+
+        try:
+            with transaction.atomic():
+                self._write(rows, existing_users, hashed_by_phone, result)
+        except DatabaseError:
+            if len(rows) == 1:
+                result.errors.append((rows[0][0], '保存失败，请检查数据是否与已有记录冲突'))
+                return
+            for row in rows:
+                self._save([row], result)
+
+    def _write(self, rows, existing_users, hashed_by_phone, result):
+        """批量写入一个批次的用户、员工和员工角色"""
+        new_users = [
+            User(
+                username=row['enterprise_phone'],
+                password=hashed_by_phone[row['enterprise_phone']],
+                first_name=row['first_name'],
+                email=row.get('email', ''),
+                user_type=User.ENTERPRISE_USER,
+            )
+            for _, row in rows
+            if row['enterprise_phone'] not in existing_users
+        ]
+        User.objects.bulk_create(new_users)
+        if new_users and new_users[0].pk is None:
+            # 数据库不支持批量插入后返回主键时，重新查询
+            new_users = list(User.objects.filter(username__in=[user.username for user in new_users]))
+        users = dict(existing_users)
+        users.update((user.username, user) for user in new_users)
+
+        # 已有用户更新姓名和邮箱（未提供的字段保持不变）
+        updated_users = []
+        for _, row in rows:
+            user = existing_users.get(row['enterprise_phone'])
+            if user is not None:
+                user.first_name = row['first_name']
+                user.email = row.get('email') or user.email
+                updated_users.append(user)
+        renamed_enterprise_ids = set()
+        if updated_users:
+            User.objects.bulk_update(updated_users, ['first_name', 'email'])
+            # 员工接口和用户选择框显示用户姓名：这些用户在其他企业的员工记录同样受影响
+            # （本企业的员工记录在下面批量更新）
+            other_staff = Staff.objects.filter(user__in=updated_users).exclude(enterprise=self.enterprise)
+            renamed_enterprise_ids = set(other_staff.values_list('enterprise_id', flat=True))
+            if renamed_enterprise_ids:
+                other_staff.update(updated_at=Now())
+
+        existing_staff = {
+            staff.user_id: staff
+            for staff in Staff.objects.filter(
+                enterprise=self.enterprise, user__in=[user.pk for user in users.values()]
+            )
+        }
+        new_staff, updated_staff = [], []
+        now = timezone.now()
+        for _, row in rows:
+            user = users[row['enterprise_phone']]
+            staff = existing_staff.get(user.pk) or Staff(enterprise=self.enterprise)
+            # 搜索文档需要用户，使用本批次已加载的用户，避免逐个查询
+            staff.user = user
+            staff.enterprise_phone = row['enterprise_phone']
+            staff.work_phone = row.get('work_phone', '')
+            staff.enterprise_email = row.get('enterprise_email', '')
+            staff.department = row['department']
+            staff.position = row.get('position', '')
+            staff.employment_status = Staff.EMPLOYED
+            # bulk_update 不会自动更新 auto_now 字段
+            staff.updated_at = now
+            (updated_staff if staff.pk else new_staff).append(staff)
+
+        Staff.objects.bulk_create(new_staff)
+        if new_staff and new_staff[0].pk is None:
+            new_staff = list(Staff.objects.select_related('user').filter(
+                enterprise=self.enterprise, user__in=[staff.user_id for staff in new_staff]
+            ))
+        if updated_staff:
+            Staff.objects.bulk_update(
+                updated_staff,
+                [
+                    'enterprise_phone', 'work_phone', 'enterprise_email', 'department', 'position',
+                    'employment_status', 'updated_at',
+                ],
+            )
+
+        # 新员工默认为普通员工；已有员工的角色保持不变
+        StaffRole.objects.bulk_create(
+            [StaffRole(staff=staff, role_type=StaffRole.REGULAR_STAFF, is_active=True) for staff in new_staff],
+            ignore_conflicts=True,
+        )
+
+        # 批量写入不会触发post_save信号：同步搜索文档，并在提交后使相关用户的企业解析缓存和仪表盘统计失效
+        search.index_staff(new_staff + updated_staff)
+        user_ids = [user.pk for user in users.values()]
+        transaction.on_commit(lambda: [tenant.invalidate_user(user_id) for user_id in user_ids])
+        transaction.on_commit(lambda: widgets.invalidate('staff.Staff', self.enterprise.pk))
+        autocomplete_enterprise_ids = renamed_enterprise_ids | {self.enterprise.pk}
+        transaction.on_commit(lambda: [
+            autocomplete.invalidate('staff.users', enterprise_id) for enterprise_id in autocomplete_enterprise_ids
+        ])
+
+        result.created_users += len(new_users)
+        result.created_staff += len(new_staff)
+        result.updated_staff += len(updated_staff)
@@ -0,0 +1,35 @@
+# staff/management/commands/import_staff.py
+from django.core.management.base import BaseCommand, CommandError
+from enterprises.models import Enterprise
+from staff.importers import StaffImporter, StaffImportError, read_rows
+
+class Command(BaseCommand):
+    help = '从CSV/XLSX文件批量导入员工（表头：姓名、手机号、个人邮箱、办公电话、企业邮箱、部门、职位）'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('file', help='CSV或XLSX文件路径')
+        parser.add_argument('--enterprise', type=int, required=True, help='导入到的企业ID')
+        parser.add_argument('--chunk-size', type=int, default=500, help='每批处理的行数（默认500）')
+        parser.add_argument('--workers', type=int, help='密码加密进程数（默认为 STAFF_IMPORT_HASH_WORKERS 或2，不超过CPU核数，1表示不使用进程池）')
+    
+    def handle(self, *args, **options):
+        try:
+            enterprise = Enterprise.objects.get(id=options['enterprise'])
+        except Enterprise.DoesNotExist:
+            raise CommandError(f"企业不存在: {options['enterprise']}")
+        
+        importer = StaffImporter(enterprise, chunk_size=options['chunk_size'], workers=options['workers'])
+        try:
+            result = importer.run(read_rows(options['file'], options['file']))
+        except (StaffImportError, OSError) as error:
+            raise CommandError(str(error))
+        
+        for line_number, message in result.errors:
+            self.stdout.write(self.style.WARNING(f'第{line_number}行: {message}'))
+        
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'导入完成：新建用户 {result.created_users} 个，新增员工 {result.created_staff} 名，'
+                f'更新员工 {result.updated_staff} 名，失败 {len(result.errors)} 行'
+            )
+        )
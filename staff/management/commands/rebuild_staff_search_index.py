@@ -0,0 +1,19 @@
+# staff/management/commands/rebuild_staff_search_index.py
+from django.core.management.base import BaseCommand
+
+from staff import search
+from staff.models import Staff
+
+
+class Command(BaseCommand):
+    help = '重建员工搜索索引（绕过模型批量导入员工数据，或安装pypinyin后需要执行）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--enterprise', type=int, help='只重建指定企业ID的员工')
+
+    def handle(self, *args, **options):
+        queryset = Staff.objects.all()
+        if options['enterprise']:
+            queryset = queryset.filter(enterprise_id=options['enterprise'])
+        count = search.rebuild_index(queryset)
+        self.stdout.write(self.style.SUCCESS(f'已重建 {count} 名员工的搜索索引'))
@@ -0,0 +1,122 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# 迁移中使用的索引SQL和搜索内容生成规则是创建时的副本，不随 staff.search 的修改而变化
+SQLITE_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS staff_search_fts USING fts5(
+        name, content, enterprise_id UNINDEXED,
+        content='staff_search', content_rowid='staff_id', tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS staff_search_ai AFTER INSERT ON staff_search BEGIN
+        INSERT INTO staff_search_fts(rowid, name, content, enterprise_id)
+        VALUES (new.staff_id, new.name, new.content, new.enterprise_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS staff_search_ad AFTER DELETE ON staff_search BEGIN
+        INSERT INTO staff_search_fts(staff_search_fts, rowid, name, content, enterprise_id)
+        VALUES ('delete', old.staff_id, old.name, old.content, old.enterprise_id);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS staff_search_au AFTER UPDATE ON staff_search BEGIN
+        INSERT INTO staff_search_fts(staff_search_fts, rowid, name, content, enterprise_id)
+        VALUES ('delete', old.staff_id, old.name, old.content, old.enterprise_id);
+        INSERT INTO staff_search_fts(rowid, name, content, enterprise_id)
+        VALUES (new.staff_id, new.name, new.content, new.enterprise_id);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS staff_search_ai',
+    'DROP TRIGGER IF EXISTS staff_search_ad',
+    'DROP TRIGGER IF EXISTS staff_search_au',
+    'DROP TABLE IF EXISTS staff_search_fts',
+]
+
+POSTGRESQL_TRGM_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS staff_search_content_trgm ON staff_search USING gin (content gin_trgm_ops)',
+]
+
+POSTGRESQL_TRGM_DROP_SQL = [
+    'DROP INDEX IF EXISTS staff_search_content_trgm',
+]
+
+
+def build_content(username, first_name, enterprise_phone, work_phone, position):
+    """生成搜索文档的 (姓名, 搜索内容)，安装了pypinyin时包含姓名拼音全拼和首字母"""
+    try:
+        from pypinyin import Style, lazy_pinyin
+    except ImportError:
+        full_pinyin = initials = ''
+    else:
+        full_pinyin = ''.join(lazy_pinyin(first_name)) if first_name else ''
+        initials = ''.join(lazy_pinyin(first_name, style=Style.FIRST_LETTER)) if first_name else ''
+    parts = [first_name, username, full_pinyin, initials, enterprise_phone, work_phone, position]
+    return first_name or username, ' '.join(part for part in parts if part).lower()
+
+
+def install_search_index(apps, schema_editor):
+    """创建全文/三元组索引，并为已有员工生成搜索文档"""
+    statements = {'sqlite': SQLITE_FTS_SQL, 'postgresql': POSTGRESQL_TRGM_SQL}.get(schema_editor.connection.vendor, [])
+    try:
+        for statement in statements:
+            schema_editor.execute(statement)
+    except Exception:
+        # SQLite未编译FTS5三元组分词器（3.34以下）时跳过，搜索退回子串匹配
+        if schema_editor.connection.vendor != 'sqlite':
+            raise
+
+    Staff = apps.get_model('staff', 'Staff')
+    StaffSearchDocument = apps.get_model('staff', 'StaffSearchDocument')
+    documents = []
+    for staff in Staff.objects.select_related('user').iterator(chunk_size=1000):
+        name, content = build_content(
+            staff.user.username, staff.user.first_name, staff.enterprise_phone, staff.work_phone, staff.position
+        )
+        documents.append(StaffSearchDocument(
+            staff_id=staff.pk, enterprise_id=staff.enterprise_id, name=name, content=content
+        ))
+    StaffSearchDocument.objects.bulk_create(documents, batch_size=1000)
+
+
+def uninstall_search_index(apps, schema_editor):
+    statements = {'sqlite': SQLITE_FTS_DROP_SQL, 'postgresql': POSTGRESQL_TRGM_DROP_SQL}.get(
+        schema_editor.connection.vendor, []
+    )
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0006_department_materialized_path'),
+        ('staff', '0005_alter_staff_user'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StaffSearchDocument',
+            fields=[
+                ('staff', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='staff.staff', verbose_name='员工')),
+                ('name', models.CharField(blank=True, max_length=150, verbose_name='姓名')),
+                ('content', models.TextField(blank=True, verbose_name='搜索内容')),
+                ('enterprise', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='enterprises.enterprise', verbose_name='所属企业')),
+            ],
+            options={
+                'verbose_name': '员工搜索文档',
+                'verbose_name_plural': '员工搜索文档',
+                'db_table': 'staff_search',
+            },
+        ),
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
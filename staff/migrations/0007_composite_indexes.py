@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 13:58
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0007_composite_indexes'),
+        ('staff', '0006_staff_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['user', 'employment_status', 'enterprise'], name='staff_user_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['enterprise', 'created_at', 'id'], name='staff_enterprise_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['enterprise', 'department'], name='staff_enterprise_dept_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0008_autocomplete_indexes'),
+        ('staff', '0007_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staffsearchdocument',
+            index=models.Index(fields=['enterprise', 'name'], name='staff_search_name_idx'),
+        ),
+    ]
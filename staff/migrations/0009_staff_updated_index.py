@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 14:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('enterprises', '0008_autocomplete_indexes'),
+        ('staff', '0008_autocomplete_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='staff',
+            index=models.Index(fields=['enterprise', 'updated_at'], name='staff_enterprise_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+from django.db import migrations
+
+# 用户自动补全按姓名前缀匹配：PostgreSQL 下前缀范围条件和排序按 "C" 排序规则（见 JYXT.core.autocomplete.prefix_q），
+# 需要相同排序规则的表达式索引；SQLite 的 (enterprise, name) 索引本身即按字节序
+CREATE_SQL = 'CREATE INDEX IF NOT EXISTS staff_search_name_c_idx ON staff_search (enterprise_id, (name COLLATE "C"))'
+DROP_SQL = 'DROP INDEX IF EXISTS staff_search_name_c_idx'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_SQL)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff', '0009_staff_updated_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -67,6 +67,16 @@ class Staff(models.Model):
         verbose_name = '员工'
         verbose_name_plural = '员工管理'
         unique_together = ('user', 'enterprise')  # 确保一个用户在一个企业中只有一条记录
+        indexes = [
+            # 用户的在职企业（租户解析、登录、应用订阅检查）
+            models.Index(fields=['user', 'employment_status', 'enterprise'], name='staff_user_status_idx'),
+            # 企业员工列表（按创建时间键集分页）
+            models.Index(fields=['enterprise', 'created_at', 'id'], name='staff_enterprise_created_idx'),
+            # 接口的增量同步和 ETag（企业内最大更新时间）
+            models.Index(fields=['enterprise', 'updated_at'], name='staff_enterprise_updated_idx'),
+            # 企业内按部门筛选、统计员工
+            models.Index(fields=['enterprise', 'department'], name='staff_enterprise_dept_idx'),
+        ]
     
     def __str__(self):
         enterprise_name = self.enterprise.name if self.enterprise else '无企业'
@@ -113,6 +123,42 @@ class StaffRole(models.Model):
     def __str__(self):
         return f'{self.staff.user.username} - {self.staff.enterprise.name if self.staff.enterprise else "无企业"} - {self.get_role_type_display()}'
 
+class StaffSearchDocument(models.Model):
+    """员工搜索文档 - 每名员工一行的窄表，汇总姓名（含拼音）、手机号、职位等可搜索文本
+    
+    由 staff.search 在员工/用户保存时同步维护；SQLite下由触发器同步到FTS5三元组全文索引，
+    PostgreSQL下在 content 上建立 pg_trgm 三元组索引。
+    """
+    staff = models.OneToOneField(
+        Staff,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='search_document',
+        verbose_name='员工'
+    )
+    enterprise = models.ForeignKey(
+        'enterprises.Enterprise',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='+',
+        verbose_name='所属企业'
+    )
+    name = models.CharField('姓名', max_length=150, blank=True)
+    content = models.TextField('搜索内容', blank=True)
+    
+    class Meta:
+        db_table = 'staff_search'
+        verbose_name = '员工搜索文档'
+        verbose_name_plural = '员工搜索文档'
+        indexes = [
+            # 自动补全按姓名前缀查找
+            models.Index(fields=['enterprise', 'name'], name='staff_search_name_idx'),
+        ]
+    
+    def __str__(self):
+        return self.name
+
 # 添加信号处理，确保在创建用户时自动创建相关的staff profile
 from django.db.models.signals import post_save
 from django.dispatch import receiver
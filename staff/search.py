@@ -0,0 +1,255 @@
+# staff/search.py
+"""员工搜索索引
+
+每名员工在 staff_search 表中维护一行搜索文档（姓名、拼音全拼/首字母、用户名、手机号、职位），
+员工或用户保存时同步更新：
+- SQLite：触发器把搜索文档同步到 FTS5 三元组（trigram）全文索引，按bm25相关度排序；
+- PostgreSQL：content 列上建立 pg_trgm GIN 索引，LIKE '%关键词%' 可直接使用索引；
+- 三元组索引无法匹配少于3个字符的关键词（如两个字的中文姓名），此时退回到
+  按企业过滤的搜索文档表子串匹配，只扫描单个企业的窄表，不再关联用户表。
+
+拼音依赖可选的 pypinyin，未安装时只索引原始文本。
+"""
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, FloatField, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.expressions import RawSQL
+
+from .models import Staff, StaffSearchDocument
+
+try:
+    from pypinyin import Style, lazy_pinyin
+except ImportError:  # pragma: no cover - 可选依赖
+    lazy_pinyin = None
+
+FTS_TABLE = 'staff_search_fts'
+
+# 三元组索引能匹配的最短关键词长度
+MIN_TRIGRAM_LENGTH = 3
+
+# search_staff 默认返回的最大结果数（按相关度排序，列表页由 rank_staff 在数据库中分页，不受此限制）
+SEARCH_RESULT_LIMIT = 1000
+
+# 每批写入的搜索文档数量
+INDEX_BATCH_SIZE = 1000
+
+SQLITE_FTS_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, content, enterprise_id UNINDEXED,
+        content='staff_search', content_rowid='staff_id', tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS staff_search_ai AFTER INSERT ON staff_search BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, content, enterprise_id)
+        VALUES (new.staff_id, new.name, new.content, new.enterprise_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS staff_search_ad AFTER DELETE ON staff_search BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, content, enterprise_id)
+        VALUES ('delete', old.staff_id, old.name, old.content, old.enterprise_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS staff_search_au AFTER UPDATE ON staff_search BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, content, enterprise_id)
+        VALUES ('delete', old.staff_id, old.name, old.content, old.enterprise_id);
+        INSERT INTO {FTS_TABLE}(rowid, name, content, enterprise_id)
+        VALUES (new.staff_id, new.name, new.content, new.enterprise_id);
+    END
+    """,
+]
+
+SQLITE_FTS_DROP_SQL = [
+    'DROP TRIGGER IF EXISTS staff_search_ai',
+    'DROP TRIGGER IF EXISTS staff_search_ad',
+    'DROP TRIGGER IF EXISTS staff_search_au',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+POSTGRESQL_TRGM_SQL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX IF NOT EXISTS staff_search_content_trgm ON staff_search USING gin (content gin_trgm_ops)',
+]
+
+POSTGRESQL_TRGM_DROP_SQL = [
+    'DROP INDEX IF EXISTS staff_search_content_trgm',
+]
+
+
+def _pinyin(name):
+    """返回姓名的 (拼音全拼, 拼音首字母)，未安装pypinyin时返回空字符串"""
+    if lazy_pinyin is None or not name:
+        return '', ''
+    return ''.join(lazy_pinyin(name)), ''.join(lazy_pinyin(name, style=Style.FIRST_LETTER))
+
+
+def build_content(username, first_name, enterprise_phone='', work_phone='', position=''):
+    """生成搜索文档的 (姓名, 搜索内容)，内容统一转为小写"""
+    full_pinyin, initials = _pinyin(first_name)
+    parts = [first_name, username, full_pinyin, initials, enterprise_phone, work_phone, position]
+    return first_name or username, ' '.join(part for part in parts if part).lower()
+
+
+def build_document(staff):
+    """根据员工（及其用户）生成搜索文档"""
+    name, content = build_content(
+        staff.user.username, staff.user.first_name, staff.enterprise_phone, staff.work_phone, staff.position
+    )
+    return StaffSearchDocument(staff_id=staff.pk, enterprise_id=staff.enterprise_id, name=name, content=content)
+
+
+def index_staff(staff_list):
+    """写入或更新一组员工（需已加载user）的搜索文档"""
+    documents = [build_document(staff) for staff in staff_list]
+    if documents:
+        StaffSearchDocument.objects.bulk_create(
+            documents,
+            batch_size=INDEX_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['staff'],
+            update_fields=['enterprise', 'name', 'content'],
+        )
+
+
+def rebuild_index(queryset=None):
+    """重建搜索文档（默认全部员工），返回处理的员工数"""
+    if queryset is None:
+        queryset = Staff.objects.all()
+    count = 0
+    batch = []
+    for staff in queryset.select_related('user').iterator(chunk_size=INDEX_BATCH_SIZE):
+        batch.append(staff)
+        if len(batch) >= INDEX_BATCH_SIZE:
+            index_staff(batch)
+            count += len(batch)
+            batch = []
+    index_staff(batch)
+    count += len(batch)
+
+    if _fts_available():
+        with connection.cursor() as cursor:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return count
+
+
+def install(schema_editor):
+    """为当前数据库创建全文/三元组索引（迁移中调用）"""
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        statements = SQLITE_FTS_SQL
+    elif vendor == 'postgresql':
+        statements = POSTGRESQL_TRGM_SQL
+    else:
+        return
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def uninstall(schema_editor):
+    vendor = schema_editor.connection.vendor
+    statements = {'sqlite': SQLITE_FTS_DROP_SQL, 'postgresql': POSTGRESQL_TRGM_DROP_SQL}.get(vendor, [])
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+# 已确认存在FTS5索引的数据库连接别名（索引只会在迁移时创建，结果可以缓存）
+_fts_aliases = set()
+
+
+def _fts_available():
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _fts_aliases:
+        if FTS_TABLE not in connection.introspection.table_names():
+            return False
+        _fts_aliases.add(connection.alias)
+    return True
+
+
+def _terms(query):
+    return [term for term in query.lower().split() if term]
+
+
+def _fts_match_expression(terms):
+    # 每个关键词作为短语匹配（双引号转义），多个关键词之间为AND
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+
+def _use_fts(terms):
+    return all(len(term) >= MIN_TRIGRAM_LENGTH for term in terms) and _fts_available()
+
+
+def _fts_sql(enterprise, terms):
+    sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND enterprise_id = %s'
+    return sql, [_fts_match_expression(terms), enterprise.pk]
+
+
+def _matching_documents(enterprise, terms):
+    documents = StaffSearchDocument.objects.filter(enterprise=enterprise)
+    for term in terms:
+        documents = documents.filter(content__contains=term)
+    return documents
+
+
+def _fallback_rank(keyword):
+    # 子串匹配时的相关度：姓名完全匹配优先，其次姓名前缀匹配
+    return Case(
+        When(name=keyword, then=Value(0)),
+        When(name__startswith=keyword, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+
+def search_staff(enterprise, query, limit=None):
+    """在企业内搜索员工，返回按相关度排序的员工ID列表（最多 limit 个）"""
+    if limit is None:
+        limit = getattr(settings, 'STAFF_SEARCH_RESULT_LIMIT', SEARCH_RESULT_LIMIT)
+    terms = _terms(query)
+    if not terms:
+        return []
+
+    if _use_fts(terms):
+        sql, params = _fts_sql(enterprise, terms)
+        with connection.cursor() as cursor:
+            cursor.execute(f'{sql} ORDER BY bm25({FTS_TABLE}, 10.0, 1.0), rowid LIMIT %s', params + [limit])
+            return [row[0] for row in cursor.fetchall()]
+
+    documents = _matching_documents(enterprise, terms).annotate(rank=_fallback_rank(query.strip()))
+    return list(documents.order_by('rank', 'staff_id').values_list('staff_id', flat=True)[:limit])
+
+
+def rank_staff(queryset, enterprise, query):
+    """把员工查询集限定为全部搜索结果，并附加相关度 search_rank（越小越相关）
+
+    相关度在同一条查询中计算（FTS5 为 bm25，子串匹配为姓名匹配程度），由数据库排序和分页，
+    不限制结果数量，与导出使用的 matching_staff_ids 范围一致。
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.none()
+    queryset = queryset.filter(pk__in=matching_staff_ids(enterprise, query))
+    if _use_fts(terms):
+        staff_id = f'{connection.ops.quote_name(Staff._meta.db_table)}.{connection.ops.quote_name("id")}'
+        rank = RawSQL(
+            f'SELECT bm25({FTS_TABLE}, 10.0, 1.0) FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {staff_id}',
+            [_fts_match_expression(terms)],
+            output_field=FloatField(),
+        )
+        return queryset.annotate(search_rank=rank)
+    return queryset.annotate(search_rank=Subquery(
+        StaffSearchDocument.objects.filter(staff=OuterRef('pk')).annotate(
+            rank=_fallback_rank(query.strip())
+        ).values('rank')
+    ))
+
+
+def matching_staff_ids(enterprise, query):
+    """匹配的员工ID子查询（不排序、不限数量），用于 pk__in 过滤全部搜索结果（如导出）"""
+    terms = _terms(query)
+    if _use_fts(terms):
+        return RawSQL(*_fts_sql(enterprise, terms))
+    return _matching_documents(enterprise, terms).values('staff_id')
@@ -0,0 +1,35 @@
+# staff/signals.py
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from accounts.models import User
+from . import search
+from .models import Staff
+
+# 用户表中参与员工搜索的字段
+USER_SEARCH_FIELDS = {'username', 'first_name'}
+
+
+@receiver(post_save, sender=Staff)
+def index_staff_search_document(sender, instance, raw=False, **kwargs):
+    """员工保存时同步搜索文档（删除时由级联删除处理）"""
+    if raw:
+        return
+    search.index_staff([instance])
+
+
+@receiver(post_save, sender=User)
+def index_user_staff_search_documents(sender, instance, raw=False, update_fields=None, **kwargs):
+    """用户姓名或用户名变更时，同步该用户在各企业的员工搜索文档
+
+    员工接口返回用户的姓名和用户名，同时更新员工记录的更新时间，使接口的 ETag 随之变化。
+    """
+    if raw or (update_fields is not None and not USER_SEARCH_FIELDS & set(update_fields)):
+        return
+    staff_list = list(Staff.objects.filter(user=instance))
+    for staff in staff_list:
+        staff.user = instance
+    search.index_staff(staff_list)
+    if staff_list and not kwargs.get('created'):
+        Staff.objects.filter(pk__in=[staff.pk for staff in staff_list]).update(updated_at=timezone.now())
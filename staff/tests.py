@@ -1,3 +1,328 @@
-from django.test import TestCase
+import io
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+
+from accounts.models import User
+from JYXT.core.testing import TenantTestMixin
+from enterprises.models import Department
+from .importers import StaffImporter, StaffImportError, read_rows
+from .models import Staff, StaffRole
+from .search import rebuild_index, search_staff
+
+# 测试中使用快速的密码加密算法
+FAST_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+def _csv(text):
+    return io.BytesIO(text.encode('utf-8-sig'))
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHERS)
+class StaffImporterTests(TenantTestMixin, TestCase):
+    """员工批量导入测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        cls.root = Department.objects.create(name='总部', enterprise=cls.enterprise)
+        cls.tech = Department.objects.create(name='技术部', enterprise=cls.enterprise, parent=cls.root)
+
+    def _import(self, text, chunk_size=500):
+        importer = StaffImporter(self.enterprise, chunk_size=chunk_size, workers=0)
+        return importer.run(read_rows(_csv(text), 'staff.csv'))
+
+    def test_import_creates_users_staff_and_roles(self):
+        result = self._import(
+            '姓名,手机号,部门,职位\n'
+            '张三,13800000001,技术部,工程师\n'
+            '李四,13800000002,总部 - 技术部,\n'
+        )
+        self.assertEqual((result.created_users, result.created_staff, result.errors), (2, 2, []))
+        staff = Staff.objects.get(user__username='13800000001')
+        self.assertEqual(staff.department, self.tech)
+        self.assertEqual(staff.position, '工程师')
+        self.assertEqual(staff.role.role_type, StaffRole.REGULAR_STAFF)
+        self.assertTrue(staff.user.check_password('000001'))
+
+    def test_existing_user_is_reused(self):
+        User.objects.create_user(username='13800000001', password='secret')
+        result = self._import('姓名,手机号\n张三,13800000001\n')
+        self.assertEqual((result.created_users, result.created_staff), (0, 1))
+        self.assertTrue(User.objects.get(username='13800000001').check_password('secret'))
+
+    def test_row_errors_do_not_abort_batch(self):
+        result = self._import(
+            '姓名,手机号,部门,企业邮箱\n'
+            ',13800000001,,\n'
+            '王五,13800000002,不存在的部门,\n'
+            '赵六,13800000003,,not-an-email\n'
+            '孙七,13800000004,,\n'
+            '周八,13800000004,,\n',
+            chunk_size=2,
+        )
+        self.assertEqual(result.created_staff, 1)
+        self.assertEqual([line for line, _ in result.errors], [2, 3, 4, 6])
+
+    def test_invalid_phone_is_rejected(self):
+        result = self._import('姓名,手机号\n张三,1.38E+10\n李四,138-0000-0002\n王五,+8613800000003\n')
+        self.assertEqual(result.errors, [(2, '手机号格式不正确'), (3, '手机号格式不正确')])
+        self.assertEqual(result.created_staff, 1)
+
+    def test_xlsx_numeric_phone(self):
+        from openpyxl import Workbook
+
+        workbook = Workbook()
+        workbook.active.append(['姓名', '手机号', '办公电话'])
+        workbook.active.append(['张三', 13800000001, 88886666.0])
+        workbook.active.append(['李四', 13800000002.0, None])
+        file = io.BytesIO()
+        workbook.save(file)
+        file.seek(0)
+
+        rows = list(read_rows(file, 'staff.xlsx'))
+        self.assertEqual(
+            [(row['enterprise_phone'], row['work_phone']) for _, row in rows],
+            [('13800000001', '88886666'), ('13800000002', '')],
+        )
+        result = StaffImporter(self.enterprise, workers=0).run(rows)
+        self.assertEqual((result.created_staff, result.errors), (2, []))
+        self.assertTrue(User.objects.get(username='13800000002').check_password('000002'))
+
+    def test_query_count_per_chunk_is_constant(self):
+        rows = '姓名,手机号\n' + ''.join(f'员工{i},1380000{i:04d}\n' for i in range(50))
+        # 部门查询1次 + 每批次8次（查用户、保存点、插入用户、查员工、插入员工、插入角色、写入搜索文档、释放保存点）
+        with self.assertNumQueries(1 + 2 * 8):
+            result = self._import(rows, chunk_size=25)
+        self.assertEqual(result.created_staff, 50)
+
+    def test_reimport_query_count_is_constant(self):
+        rows = '姓名,手机号\n' + ''.join(f'员工{i},1380000{i:04d}\n' for i in range(30))
+        self._import(rows)
+        # 部门查询1次 + 查用户、保存点、更新用户、查其他企业员工、查员工、更新员工、写入搜索文档、释放保存点
+        # （搜索文档使用本批次已加载的用户，不逐个查询）
+        with self.assertNumQueries(1 + 8):
+            result = self._import(rows)
+        self.assertEqual(result.updated_staff, 30)
+
+    def test_reimport_touches_updated_at(self):
+        self._import('姓名,手机号\n张三,13800000001\n')
+        other = self.create_enterprise('企业B')
+        self.create_staff(User.objects.get(username='13800000001'), other)
+        Staff.objects.update(updated_at='2000-01-01T00:00:00Z')
+        self._import('姓名,手机号\n张三丰,13800000001\n')
+        # 员工接口的ETag依赖更新时间：本企业和其他企业的员工记录都随用户改名更新
+        self.assertFalse(Staff.objects.filter(updated_at__year=2000).exists())
+
+    def test_missing_required_column(self):
+        with self.assertRaises(StaffImportError):
+            self._import('姓名,职位\n张三,工程师\n')
+
+    def test_upload_view(self):
+        admin = self.create_admin(self.enterprise)
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('staff.csv', '姓名,手机号\n张三,13800000001\n'.encode('utf-8'))
+        response = self.client.post('/staff/import/', {'file': upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['result'].created_staff, 1)
+
+    @override_settings(STAFF_IMPORT_MAX_ROWS=1)
+    def test_upload_view_rejects_large_files(self):
+        admin = self.create_admin(self.enterprise)
+        self.client.force_login(admin)
+        upload = SimpleUploadedFile('staff.csv', '姓名,手机号\n张三,13800000001\n李四,13800000002\n'.encode('utf-8'))
+        response = self.client.post('/staff/import/', {'file': upload})
+        self.assertIn('import_staff', response.context['form'].errors['file'][0])
+        self.assertFalse(Staff.objects.filter(enterprise_phone='13800000001').exists())
+
+    def test_export_honors_search(self):
+        admin = self.create_admin(self.enterprise)
+        self._import('姓名,手机号,部门,职位\n张三,13800000001,技术部,工程师\n李四,13800000002,,销售\n')
+        self.client.force_login(admin)
+        response = self.client.get('/staff/export/', {'format': 'csv', 'search': '工程师'})
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8-sig').splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn('总部 - 技术部', lines[1])
+
+    def test_export_escapes_formulas(self):
+        import csv
+
+        from openpyxl import load_workbook
+
+        admin = self.create_admin(self.enterprise)
+        self._import('姓名,手机号,职位\n"=HYPERLINK(""http://evil.example"",""点击"")",13800000001,@SUM(1)\n')
+        self.client.force_login(admin)
+
+        response = self.client.get('/staff/export/', {'format': 'csv', 'search': '13800000001'})
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        row = list(csv.reader(io.StringIO(content)))[1]
+        self.assertIn('\'=HYPERLINK("http://evil.example","点击")', row)
+        self.assertIn("'@SUM(1)", row)
+
+        response = self.client.get('/staff/export/', {'format': 'xlsx', 'search': '13800000001'})
+        workbook = load_workbook(io.BytesIO(b''.join(response.streaming_content)), read_only=True)
+        values = list(workbook.active.iter_rows(values_only=True))[1]
+        self.assertIn('\'=HYPERLINK("http://evil.example","点击")', values)
+
+
+class StaffSearchTests(TenantTestMixin, TestCase):
+    """员工搜索索引测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        cls.other = cls.create_enterprise('企业B')
+        cls.zhang = Staff.objects.create(
+            user=User.objects.create(username='13800000001', first_name='张三'),
+            enterprise=cls.enterprise, position='高级工程师', enterprise_phone='13800000001',
+        )
+        cls.li = Staff.objects.create(
+            user=User.objects.create(username='13800000002', first_name='李四'),
+            enterprise=cls.enterprise, position='销售经理', work_phone='010-88886666',
+        )
+        Staff.objects.create(
+            user=User.objects.create(username='13800000003', first_name='张三丰'),
+            enterprise=cls.other, position='高级工程师',
+        )
+
+    def test_search_by_name_phone_and_position(self):
+        self.assertEqual(search_staff(self.enterprise, '张三'), [self.zhang.pk])
+        self.assertEqual(search_staff(self.enterprise, '88886666'), [self.li.pk])
+        self.assertEqual(search_staff(self.enterprise, '高级工程师'), [self.zhang.pk])
+        self.assertEqual(search_staff(self.enterprise, '不存在'), [])
+
+    def test_index_follows_user_and_staff_changes(self):
+        self.zhang.user.first_name = '王五'
+        self.zhang.user.save()
+        self.li.position = '架构师'
+        self.li.save()
+        self.assertEqual(search_staff(self.enterprise, '王五'), [self.zhang.pk])
+        self.assertEqual(search_staff(self.enterprise, '张三'), [])
+        self.assertEqual(search_staff(self.enterprise, '架构师'), [self.li.pk])
+        self.li.delete()
+        self.assertEqual(search_staff(self.enterprise, '架构师'), [])
+
+    def test_list_view_uses_index(self):
+        self.client.force_login(self.create_admin(self.enterprise))
+        response = self.client.get('/staff/', {'search': '13800000001'})
+        self.assertEqual(list(response.context['staff_list']), [self.zhang])
+
+    async def test_search_endpoint(self):
+        await self.async_client.aforce_login(await sync_to_async(self.create_admin)(self.enterprise))
+        response = await self.async_client.get('/staff/search/', {'q': '高级工程师'})
+        self.assertEqual(response.json()['results'], [{
+            'id': self.zhang.pk, 'name': '张三', 'username': '13800000001',
+            'position': '高级工程师', 'department': '',
+        }])
+        response = await self.async_client.get('/staff/search/', {'q': ''})
+        self.assertEqual(response.json()['results'], [])
+
+        # 普通员工不能搜索
+        await self.async_client.aforce_login(self.li.user)
+        response = await self.async_client.get('/staff/search/', {'q': '张三'})
+        self.assertEqual(response.status_code, 403)
+
+
+class StaffListPaginationTests(TenantTestMixin, TestCase):
+    """员工列表键集分页测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise('企业A')
+        cls.admin = cls.create_admin(cls.enterprise)
+        users = User.objects.bulk_create([User(username=f'user{i}', first_name=f'员工{i}') for i in range(45)])
+        Staff.objects.bulk_create([Staff(user=user, enterprise=cls.enterprise) for user in users])
+        # 创建时间相同，由id保证顺序稳定
+        Staff.objects.update(created_at=Staff.objects.first().created_at)
+        rebuild_index()
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def _page(self, cursor='', search=''):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        params = {'cursor': cursor} if cursor else {}
+        if search:
+            params['search'] = search
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/staff/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.context['page_obj'], len(queries)
+
+    def test_walk_forward_and_back(self):
+        self._page()  # 预热订阅、租户等缓存
+        page, first_queries = self._page()
+        seen = [staff.pk for staff in page]
+        pages = [seen[:]]
+        while page.has_next() and len(pages) < 5:
+            page, queries = self._page(page.next_cursor)
+            self.assertEqual(queries, first_queries)
+            pages.append([staff.pk for staff in page])
+            seen.extend(pages[-1])
+        self.assertEqual(seen, list(Staff.objects.order_by('created_at', 'id').values_list('pk', flat=True)))
+        self.assertEqual(len(pages), 3)
+
+        page, _ = self._page(page.previous_cursor)
+        self.assertEqual([staff.pk for staff in page], pages[1])
+        page, _ = self._page(page.previous_cursor)
+        self.assertEqual([staff.pk for staff in page], pages[0])
+        self.assertFalse(page.has_previous())
+
+    @override_settings(STAFF_SEARCH_RESULT_LIMIT=5)
+    def test_search_pages_through_all_results(self):
+        # 两个字（子串匹配）和三个字（FTS5 bm25）的关键词都在数据库中排序分页，不受结果数上限截断
+        for query, expected in (('员工', 45), ('员工1', 11)):
+            with self.subTest(query=query):
+                page, _ = self._page(search=query)
+                seen = [staff.pk for staff in page]
+                while page.has_next():
+                    page, _ = self._page(page.next_cursor, search=query)
+                    seen.extend(staff.pk for staff in page)
+                self.assertEqual(len(seen), expected)
+                self.assertEqual(seen, search_staff(self.enterprise, query, limit=100))
+
+        page, _ = self._page(search='员工1')
+        self.assertEqual(page[0].user.first_name, '员工1')
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/staff/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class StaffApiTests(TenantTestMixin, TestCase):
+    """员工只读JSON接口测试"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.enterprise = cls.create_enterprise()
+        cls.admin = cls.create_admin(cls.enterprise)
+        cls.member = cls.create_user('13800000001', first_name='张三')
+        cls.member_staff = cls.create_staff(cls.member, cls.enterprise)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_detail_conditional_get_and_user_rename(self):
+        url = f'/api/v1/staff/{self.member_staff.pk}/'
+        response = self.client.get(url, {'fields': 'name,username'})
+        self.assertEqual(response.json(), {'id': self.member_staff.pk, 'name': '张三', 'username': '13800000001'})
+        etag = response['ETag']
+        self.assertEqual(self.client.get(url, {'fields': 'name,username'}, headers={'if-none-match': etag}).status_code, 304)
+
+        # 用户改名后员工记录的更新时间随之变化
+        self.member.first_name = '张三丰'
+        self.member.save()
+        response = self.client.get(url, {'fields': 'name,username'}, headers={'if-none-match': etag})
+        self.assertEqual(response.json()['name'], '张三丰')
+        self.assertEqual(self.client.get('/api/v1/staff/999999/').status_code, 404)
+
+    def test_requires_enterprise_admin(self):
+        self.assertEqual(self.client.get('/api/v1/staff/').status_code, 200)
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.get('/api/v1/staff/').status_code, 403)
@@ -6,6 +6,9 @@ app_name = 'staff'
 urlpatterns = [
     path('', views.StaffListView.as_view(), name='staff_list'),
     path('create/', views.StaffCreateView.as_view(), name='staff_create'),
+    path('export/', views.StaffExportView.as_view(), name='staff_export'),
+    path('search/', views.StaffSearchView.as_view(), name='staff_search'),
+    path('import/', views.StaffImportView.as_view(), name='staff_import'),
     path('update/<int:pk>/', views.StaffUpdateView.as_view(), name='staff_update'),
     path('detail/<int:pk>/', views.StaffDetailView.as_view(), name='staff_detail'),
     path('delete/<int:pk>/', views.StaffDeleteView.as_view(), name='staff_delete'),
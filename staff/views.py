@@ -1,80 +1,142 @@
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.views import View
-from django.views.generic import ListView, CreateView, UpdateView, DetailView, DeleteView
+from django.views.generic import ListView, CreateView, UpdateView, DetailView, DeleteView, FormView
 from django.urls import reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.utils import timezone
 
 from accounts.models import User
 from .models import Staff, StaffRole
-from .forms import StaffCreateForm, StaffUpdateForm, StaffProfileForm
+from .forms import StaffCreateForm, StaffUpdateForm, StaffProfileForm, StaffImportForm
+from .importers import DEFAULT_WEB_MAX_ROWS, StaffImporter, StaffImportError, read_rows
+from . import search
 from enterprises.models import Department
+from JYXT.core import authz
+from JYXT.core.exports import EXPORT_CHUNK_SIZE, ExportError, export_response
+from JYXT.core.pagination import KeysetPaginationMixin
+from JYXT.core.tenant import aget_enterprise
+from JYXT.core.views import AsyncLoginRequiredMixin
+from JYXT.core.permissions import EnterpriseAdminRequiredMixin as BaseEnterpriseAdminRequiredMixin
 
-class EnterpriseAdminRequiredMixin(LoginRequiredMixin):
-    """企业管理员权限验证混入类"""
-    def dispatch(self, request, *args, **kwargs):
-        # 检查用户是否登录
-        if not request.user.is_authenticated:
-            return self.handle_no_permission()
-        
-        # 检查用户是否为企业管理员
-        if not hasattr(request.user, 'staff') or not request.user.staff:
-            messages.error(request, "您没有访问此页面的权限")
-            return redirect('dashboard')
-        
-        # 获取用户的企业
-        staff = request.user.staff
-        if not staff.enterprise:
-            messages.error(request, "您尚未关联到任何企业")
-            return redirect('dashboard')
-        
-        # 检查用户是否为企业管理员角色
-        try:
-            staff_role = StaffRole.objects.get(staff=staff)
-            if staff_role.role_type != 'enterprise_admin':
-                messages.error(request, "只有企业管理员可以访问此页面")
-                return redirect('dashboard')
-        except StaffRole.DoesNotExist:
-            messages.error(request, "您的企业角色信息不存在")
-            return redirect('dashboard')
-        
-        return super().dispatch(request, *args, **kwargs)
+class EnterpriseAdminRequiredMixin(BaseEnterpriseAdminRequiredMixin):
+    """企业管理员权限验证混入类（员工管理在当前企业内进行，需要有当前企业）"""
+    
+    def test_func(self):
+        return bool(getattr(self.request, 'enterprise', None)) and super().test_func()
 
-class StaffListView(EnterpriseAdminRequiredMixin, ListView):
+class StaffListView(EnterpriseAdminRequiredMixin, KeysetPaginationMixin, ListView):
     """员工列表视图 - 显示企业的所有员工"""
     model = Staff
     template_name = 'staff/staff_list.html'
     context_object_name = 'staff_list'
     paginate_by = 20
+    keyset_ordering = ('created_at', 'id')
+    # 大企业员工数很多，不统计总数
+    paginate_count = False
+    
+    def get_keyset_ordering(self):
+        # 搜索时按相关度排序
+        if self.request.GET.get('search', '').strip():
+            return ('search_rank', 'id')
+        return self.keyset_ordering
     
     def get_queryset(self):
-        # 获取当前用户的企业
-        enterprise = self.request.user.staff.enterprise
+        # 当前企业
+        enterprise = self.request.enterprise
         # 只显示当前企业的员工
-        queryset = Staff.objects.filter(enterprise=enterprise).order_by('created_at')
+        queryset = Staff.objects.filter(enterprise=enterprise).select_related('user', 'department').order_by('created_at', 'id')
         
         # 搜索功能
-        search_query = self.request.GET.get('search', '')
+        search_query = self.request.GET.get('search', '').strip()
         if search_query:
-            queryset = queryset.filter(
-                Q(user__username__icontains=search_query) |
-                Q(user__first_name__icontains=search_query) |
-                Q(enterprise_phone__icontains=search_query) |
-                Q(work_phone__icontains=search_query) |
-                Q(position__icontains=search_query)
-            )
+            queryset = self.filter_search(queryset, enterprise, search_query)
         
         return queryset
     
+    def filter_search(self, queryset, enterprise, search_query):
+        """通过搜索索引筛选员工，相关度在同一条查询中计算并排序（不再逐行关联用户表做模糊匹配）"""
+        return search.rank_staff(queryset, enterprise, search_query).order_by('search_rank', 'id')
+    
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 添加当前企业信息到上下文
-        context['current_enterprise'] = self.request.user.staff.enterprise
+        context['current_enterprise'] = self.request.enterprise
         # 添加搜索查询到上下文
         context['search_query'] = self.request.GET.get('search', '')
         return context
 
+class StaffExportView(StaffListView):
+    """员工导出视图 - 按列表页相同的搜索条件流式导出全部员工"""
+    
+    def filter_search(self, queryset, enterprise, search_query):
+        # 导出全部匹配的员工，按列表默认顺序排列
+        return queryset.filter(pk__in=search.matching_staff_ids(enterprise, search_query))
+    
+    def get(self, request, *args, **kwargs):
+        queryset = self.get_queryset()
+        header = ['用户名', '姓名', '手机号', '办公电话', '企业邮箱', '部门', '职位', '状态', '入职时间']
+        rows = (
+            [
+                staff.user.username,
+                staff.user.first_name,
+                staff.enterprise_phone,
+                staff.work_phone,
+                staff.enterprise_email,
+                staff.department.full_path if staff.department else '',
+                staff.position,
+                staff.get_employment_status_display(),
+                timezone.localtime(staff.created_at).strftime('%Y-%m-%d'),
+            ]
+            for staff in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+        try:
+            return export_response(request.GET.get('format', 'csv'), '员工列表', header, rows)
+        except ExportError as e:
+            messages.error(request, str(e))
+            return redirect('staff:staff_list')
+
+class StaffSearchView(AsyncLoginRequiredMixin, View):
+    """员工搜索（异步视图，供页面搜索框自动补全）
+    
+    GET ?q=关键词&limit=数量，返回 {'results': [{id, name, username, position, department}]}，
+    按相关度排序。
+    """
+    replica_reads = True
+    default_limit = 20
+    max_limit = 50
+    
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        return max(1, min(limit, self.max_limit))
+    
+    async def get(self, request, *args, **kwargs):
+        enterprise = await aget_enterprise(request)
+        if not enterprise or not await sync_to_async(authz.is_enterprise_admin)(request, enterprise):
+            return JsonResponse({'error': '您没有权限搜索员工'}, status=403)
+        
+        query = request.GET.get('q', '').strip()
+        staff_ids = await sync_to_async(search.search_staff)(enterprise, query, self.get_limit()) if query else []
+        if not staff_ids:
+            return JsonResponse({'results': []})
+        
+        rows = Staff.objects.filter(pk__in=staff_ids, enterprise=enterprise).values_list(
+            'id', 'user__first_name', 'user__username', 'position', 'department__name',
+        )
+        found = {
+            pk: {'id': pk, 'name': name or username, 'username': username, 'position': position, 'department': department or ''}
+            async for pk, name, username, position, department in rows
+        }
+        return JsonResponse({'results': [found[pk] for pk in staff_ids if pk in found]})
+
 class StaffProfileView(LoginRequiredMixin, UpdateView):
     """员工个人资料视图 - 用于用户编辑自己的个人资料"""
     template_name = 'staff/staff_profile.html'
@@ -95,10 +157,12 @@ class StaffProfileView(LoginRequiredMixin, UpdateView):
             return Staff.objects.get(user=self.request.user)
         except Staff.DoesNotExist:
             # 如果staff记录不存在，创建一个新的关联到当前用户
-            return Staff.objects.create(
+            staff = Staff.objects.create(
                 user=self.request.user,
                 enterprise=None
             )
+            self.request.user.clear_staff_cache()
+            return staff
     
     def form_valid(self, form):
         # 更新用户信息
@@ -129,8 +193,7 @@ class StaffProfileView(LoginRequiredMixin, UpdateView):
         # 添加页面标题
         context['page_title'] = '个人资料'
         # 添加当前企业信息到上下文（如果有）
-        if hasattr(self.request.user, 'staff') and self.request.user.staff.enterprise:
-            context['current_enterprise'] = self.request.user.staff.enterprise
+        context['current_enterprise'] = self.request.enterprise
         return context
 
 class StaffCreateView(EnterpriseAdminRequiredMixin, CreateView):
@@ -147,11 +210,8 @@ class StaffCreateView(EnterpriseAdminRequiredMixin, CreateView):
         return kwargs
     
     def form_valid(self, form):
-        # 获取当前登录用户的企业
-        current_user = self.request.user
-        enterprise = None
-        if hasattr(current_user, 'staff') and current_user.staff and current_user.staff.enterprise:
-            enterprise = current_user.staff.enterprise
+        # 当前企业
+        enterprise = self.request.enterprise
         
         # 获取手机号（用作用户名）
         enterprise_phone = form.cleaned_data['enterprise_phone']
@@ -242,7 +302,7 @@ class StaffCreateView(EnterpriseAdminRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 添加当前企业信息到上下文
-        context['current_enterprise'] = self.request.user.staff.enterprise
+        context['current_enterprise'] = self.request.enterprise
         return context
 
 class StaffDetailView(EnterpriseAdminRequiredMixin, DetailView):
@@ -254,7 +314,7 @@ class StaffDetailView(EnterpriseAdminRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 添加当前企业信息到上下文
-        context['current_enterprise'] = self.request.user.staff.enterprise
+        context['current_enterprise'] = self.request.enterprise
         # 获取员工角色信息
         try:
             context['staff_role'] = StaffRole.objects.get(staff=self.object)
@@ -271,7 +331,7 @@ class StaffDeleteView(EnterpriseAdminRequiredMixin, DeleteView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 添加当前企业信息到上下文
-        context['current_enterprise'] = self.request.user.staff.enterprise
+        context['current_enterprise'] = self.request.enterprise
         return context
     
     def delete(self, request, *args, **kwargs):
@@ -280,7 +340,7 @@ class StaffDeleteView(EnterpriseAdminRequiredMixin, DeleteView):
         staff_name = staff.user.first_name
         
         # 验证员工是否属于当前企业
-        enterprise = request.user.staff.enterprise
+        enterprise = request.enterprise
         if staff.enterprise != enterprise:
             messages.error(request, "您只能删除本企业的员工")
             return redirect(self.success_url)
@@ -307,9 +367,8 @@ class StaffUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
         return kwargs
     
     def form_valid(self, form):
-        # 获取当前登录用户的企业
-        current_user = self.request.user
-        enterprise = current_user.staff.enterprise
+        # 当前企业
+        enterprise = self.request.enterprise
         
         # 获取要更新的员工
         staff = self.get_object()
@@ -360,5 +419,40 @@ class StaffUpdateView(EnterpriseAdminRequiredMixin, UpdateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # 添加当前企业信息到上下文
-        context['current_enterprise'] = self.request.user.staff.enterprise
+        context['current_enterprise'] = self.request.enterprise
+        return context
+
+class StaffImportView(EnterpriseAdminRequiredMixin, FormView):
+    """员工批量导入视图 - 上传CSV/XLSX文件批量添加或更新员工"""
+    template_name = 'staff/staff_import.html'
+    form_class = StaffImportForm
+    
+    def form_valid(self, form):
+        upload = form.cleaned_data['file']
+        # 页面中同步导入，行数受限；更大的文件由管理员在后台执行 manage.py import_staff
+        max_rows = getattr(settings, 'STAFF_IMPORT_MAX_ROWS', DEFAULT_WEB_MAX_ROWS)
+        try:
+            rows = list(islice(read_rows(upload, upload.name), max_rows + 1))
+            if len(rows) > max_rows:
+                raise StaffImportError(
+                    f'每次最多导入{max_rows}行，更多数据请分批导入，或联系系统管理员使用 import_staff 命令导入'
+                )
+            result = StaffImporter(self.request.enterprise).run(rows)
+        except StaffImportError as error:
+            form.add_error('file', str(error))
+            return self.form_invalid(form)
+        
+        if result.success_count:
+            messages.success(
+                self.request,
+                f"导入完成：新增员工 {result.created_staff} 名，更新员工 {result.updated_staff} 名"
+            )
+        if result.errors:
+            messages.warning(self.request, f"有 {len(result.errors)} 行数据导入失败，详见下方列表")
+        return self.render_to_response(self.get_context_data(form=StaffImportForm(), result=result))
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # 添加当前企业信息到上下文
+        context['current_enterprise'] = self.request.enterprise
         return context
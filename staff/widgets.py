@@ -0,0 +1,39 @@
+# staff/widgets.py
+"""首页仪表盘小部件"""
+from enterprises.models import Department
+from JYXT.core.widgets import CountWidget, widget_registry
+
+from .models import Staff
+
+
+@widget_registry.register
+class EmployedStaffCountWidget(CountWidget):
+    """在职员工数量（大企业统计较慢，延迟加载）"""
+    code = 'staff.employed'
+    dashboard = 'home'
+    title = '在职员工'
+    order = 10
+    depends_on = ['staff.Staff']
+    lazy = True
+    icon = 'fas fa-users'
+    color = 'info'
+    url_name = 'staff:staff_list'
+
+    def get_queryset(self, enterprise):
+        return Staff.objects.filter(enterprise=enterprise, employment_status=Staff.EMPLOYED)
+
+
+@widget_registry.register
+class DepartmentCountWidget(CountWidget):
+    """部门数量"""
+    code = 'enterprises.departments'
+    dashboard = 'home'
+    title = '部门'
+    order = 20
+    depends_on = ['enterprises.Department']
+    icon = 'fas fa-sitemap'
+    color = 'success'
+    url_name = 'enterprises:department_list'
+
+    def get_queryset(self, enterprise):
+        return Department.objects.filter(enterprise=enterprise, is_active=True)